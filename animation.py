@@ -0,0 +1,297 @@
+"""
+Animation Module
+Composable display effects: timelines of frames with sequencing, cancellation and frame budgets
+"""
+
+from collections import namedtuple
+
+# A hardware-scroll frame: full DDRAM lines plus the display shift to apply.
+# Plain frames are tuples of visible line strings.
+Marquee = namedtuple('Marquee', ['lines', 'offset'])
+
+# Frames an effect may advance in one tick before it skips ahead instead
+DEFAULT_FRAME_BUDGET = 4
+
+# Slack when comparing a tick to a frame deadline, so a wake-up scheduled for
+# an accumulated float deadline never lands a rounding error short of it
+TIME_TOLERANCE = 1e-9
+
+class AnimationContext:
+    """What effects draw with: the display width and the current content.
+
+    Content is updated in place for minor changes (the clock's seconds),
+    so running effects pick it up without being restarted.
+    """
+
+    def __init__(self, width=16, lines=('', '')):
+        self.width = width
+        self.lines = tuple(lines)
+        self.sink = None
+        # Frames that came due but were never shown because a tick ran late
+        self.frames_dropped = 0
+
+    def padded(self):
+        """Current content as a plain frame, cut or padded to the width"""
+        return tuple(line[:self.width].ljust(self.width) for line in self.lines)
+
+class Effect:
+    """A timeline of frames.
+
+    start() anchors the effect at a monotonic time. Each tick, frame(now)
+    returns the frame that is due, or None if nothing new is due, and
+    deadline() tells the scheduler when the next frame is. An effect is
+    finished once `finished` is set; `end_time` is when it ended, so a
+    sequence can start the next effect exactly on time.
+    """
+
+    name = 'effect'
+
+    def __init__(self):
+        self.ctx = None
+        self.started = None
+        self.finished = False
+        self.end_time = None
+
+    def start(self, now, ctx):
+        self.ctx = ctx
+        self.started = now
+        self.finished = False
+        self.end_time = None
+
+    def frame(self, now):
+        raise NotImplementedError
+
+    def deadline(self):
+        """Monotonic time of the next frame, or None while static"""
+        return None
+
+    def is_static(self, ctx):
+        """Whether frames for this context only change when the content does"""
+        return False
+
+    def cancel(self):
+        """Stop the effect; it produces no further frames"""
+        self._finish(self.started)
+
+    def _finish(self, end_time):
+        self.finished = True
+        self.end_time = end_time
+
+class StepEffect(Effect):
+    """Effect written as a generator function of the context.
+
+    The generator yields (frame, hold) pairs: the frame to show and how many
+    seconds to hold it. If a tick arrives late, the due frames are stepped
+    through but only the newest one is returned, so nothing stale is
+    written. At most `budget` steps are taken per tick; a longer stall
+    drops the backlog and continues from now, keeping every tick bounded.
+    """
+
+    def __init__(self, steps, name='step', budget=DEFAULT_FRAME_BUDGET, **kwargs):
+        super().__init__()
+        self.name = name
+        self.budget = budget
+        self._steps = steps
+        self._kwargs = kwargs
+        self._gen = None
+        self._due = None
+
+    def start(self, now, ctx):
+        super().start(now, ctx)
+        self._gen = self._steps(ctx, **self._kwargs)
+        self._due = now
+
+    def frame(self, now):
+        frame = None
+        stepped = 0
+        for _ in range(self.budget):
+            if self.finished or now + TIME_TOLERANCE < self._due:
+                break
+            try:
+                frame, hold = next(self._gen)
+            except StopIteration:
+                self._finish(self._due)
+                break
+            stepped += 1
+            self._due += hold
+        else:
+            if now + TIME_TOLERANCE >= self._due:
+                # Over budget: skip the backlog rather than replaying it
+                self._due = now
+        if stepped > 1:
+            self.ctx.frames_dropped += stepped - 1
+        return frame
+
+    def deadline(self):
+        return None if self.finished else self._due
+
+    def cancel(self):
+        if self._gen is not None:
+            self._gen.close()
+        self._finish(self._due)
+
+class Pause(Effect):
+    """Hold the current content still for a fixed time"""
+
+    name = 'pause'
+
+    def __init__(self, seconds):
+        super().__init__()
+        self.seconds = seconds
+        self._shown = None
+
+    def start(self, now, ctx):
+        super().start(now, ctx)
+        self._shown = None
+
+    def frame(self, now):
+        if now + TIME_TOLERANCE >= self.started + self.seconds:
+            self._finish(self.started + self.seconds)
+        if self._shown is self.ctx.lines:
+            return None
+        self._shown = self.ctx.lines
+        return self.ctx.padded()
+
+    def deadline(self):
+        return None if self.finished else self.started + self.seconds
+
+    def is_static(self, ctx):
+        return True
+
+class Sequence(Effect):
+    """Run effects one after another, each starting when the previous ends"""
+
+    def __init__(self, *effects):
+        super().__init__()
+        self.effects = list(effects)
+        self._index = 0
+
+    @property
+    def name(self):
+        current = self.current
+        return current.name if current else 'sequence'
+
+    @property
+    def current(self):
+        return self.effects[self._index] if self._index < len(self.effects) else None
+
+    def start(self, now, ctx):
+        super().start(now, ctx)
+        self._index = 0
+        if self.effects:
+            self.effects[0].start(now, ctx)
+        else:
+            self._finish(now)
+
+    def frame(self, now):
+        frame = None
+        while not self.finished:
+            effect = self.effects[self._index]
+            produced = effect.frame(now)
+            if produced is not None:
+                frame = produced
+            if not effect.finished:
+                break
+            self._index += 1
+            if self._index == len(self.effects):
+                self._finish(effect.end_time)
+            else:
+                self.effects[self._index].start(effect.end_time, self.ctx)
+        return frame
+
+    def deadline(self):
+        current = self.current
+        if current is None or self.finished:
+            return None
+        # Nothing left that moves on its own (e.g. a pause before a scroll of
+        # text that fits): no need to wake just to step between effects
+        if all(effect.is_static(self.ctx) for effect in self.effects[self._index:]):
+            return None
+        return current.deadline()
+
+    def cancel(self):
+        current = self.current
+        if current is not None:
+            current.cancel()
+        self._finish(self.started)
+
+class Animator:
+    """Plays one effect at a time and writes its frames to a display sink.
+
+    Frames equal to the last one written are dropped, so the sink only sees
+    real changes. play() cancels whatever was running.
+    """
+
+    def __init__(self, width=16):
+        self.ctx = AnimationContext(width)
+        self.effect = None
+        self.last_frame = None
+        self.stats = {'ticks': 0, 'frames_written': 0, 'frames_unchanged': 0, 'frames_dropped': 0}
+
+    def set_content(self, lines):
+        lines = tuple(lines)
+        if lines != self.ctx.lines:
+            self.ctx.lines = lines
+
+    def play(self, effect, now):
+        self.cancel()
+        self.effect = effect
+        effect.start(now, self.ctx)
+
+    def cancel(self):
+        if self.effect is not None and not self.effect.finished:
+            self.effect.cancel()
+        self.effect = None
+
+    def is_playing(self, name):
+        """Whether the running effect (or sequence step) has this name"""
+        return self.effect is not None and not self.effect.finished and self.effect.name == name
+
+    def visible_lines(self):
+        """What the last written frame shows, as plain visible lines"""
+        frame = self.last_frame
+        if frame is None:
+            return tuple(' ' * self.ctx.width for _ in self.ctx.lines)
+        if isinstance(frame, Marquee):
+            width = self.ctx.width
+            return tuple(line[frame.offset:frame.offset + width].ljust(width) for line in frame.lines)
+        return frame
+
+    def forget_frame(self):
+        """The sink was cleared or redrawn elsewhere: write the next frame in full"""
+        self.last_frame = None
+
+    def render(self, sink, now):
+        """Advance the effect to `now`; returns True if a frame was written"""
+        self.stats['ticks'] += 1
+        if self.effect is None:
+            return False
+        self.ctx.sink = sink
+        frame = self.effect.frame(now)
+        self.stats['frames_dropped'] = self.ctx.frames_dropped
+        if frame is None or frame == self.last_frame:
+            self.stats['frames_unchanged'] += 1
+            return False
+        write_frame(sink, frame)
+        self.last_frame = frame
+        self.stats['frames_written'] += 1
+        return True
+
+    def next_deadline(self):
+        if self.effect is None or self.effect.finished:
+            return None
+        return self.effect.deadline()
+
+def write_frame(sink, frame):
+    """Stage a frame on a display sink (LCD, LCD writer or test double)"""
+    if isinstance(frame, Marquee):
+        sink.load_marquee(frame.lines)
+        sink.set_display_offset(frame.offset)
+        return
+    for row, text in enumerate(frame):
+        if hasattr(sink, 'write_line'):
+            sink.write_line(text, line=row)
+        else:
+            # Headless doubles without a framebuffer take raw RPLCD-style writes
+            sink.lcd.cursor_pos = (row, 0)
+            sink.lcd.write_string(text)
@@ -0,0 +1,182 @@
+"""
+API Guard Module
+Spotify call budget with command priority, Retry-After, jittered backoff and a circuit breaker
+"""
+
+import math
+import os
+import random
+import threading
+from collections import deque
+from contextlib import contextmanager
+import requests
+from clock import get_clock
+
+# Calls allowed per rolling window (override with SPOTIFY_CALL_BUDGET); Spotify
+# rate-limits each app over a rolling 30 s window
+DEFAULT_CALL_BUDGET = 30
+BUDGET_WINDOW = 30.0
+# Share of the budget background polls may not use, so a button press always gets through
+COMMAND_RESERVE = 5
+
+DEFAULT_RETRY_AFTER = 5.0   # seconds, when a 429 carries no usable Retry-After
+BACKOFF_BASE = 2.0          # seconds after the first failure, doubling per failure
+BACKOFF_MAX = 120.0
+BREAKER_THRESHOLD = 3       # consecutive failures before commands are held back too
+
+COMMAND = 'command'
+POLL = 'poll'
+
+class _Priority(threading.local):
+    value = COMMAND  # class default: calls are user commands unless marked
+    sent = 0         # calls any guard has let out from this thread
+
+_priority = _Priority()
+
+@contextmanager
+def poll_priority():
+    """Spotify calls made inside (on this thread) count as background polls"""
+    previous, _priority.value = _priority.value, POLL
+    try:
+        yield
+    finally:
+        _priority.value = previous
+
+def calls_sent():
+    """Spotify calls let out from this thread so far (refused calls don't count)"""
+    return _priority.sent
+
+class ApiGuard:
+    """Decides whether a Spotify call may go out now.
+
+    - Budget: at most `budget` calls per BUDGET_WINDOW seconds; background
+      polls stop COMMAND_RESERVE calls short of it, commands may use it all
+    - 429: nothing is sent until its Retry-After has passed
+    - 5xx and network errors: polls back off exponentially with jitter;
+      after BREAKER_THRESHOLD in a row the breaker opens and commands wait
+      too, then a single trial call decides whether it closes again
+
+    Callers serve the last good track while a call is refused, so the
+    display keeps working and nothing hammers an unhealthy API.
+    """
+
+    def __init__(self, budget=None, window=BUDGET_WINDOW, reserve=COMMAND_RESERVE, clock=None, jitter=None):
+        self.budget = budget or int(os.getenv('SPOTIFY_CALL_BUDGET', DEFAULT_CALL_BUDGET))
+        self.window = window
+        self.reserve = min(reserve, self.budget - 1)
+        self.clock = clock or get_clock()
+        self._jitter = jitter or random.random  # 0 <= x < 1
+        self._lock = threading.Lock()
+        self._calls = deque()  # monotonic send times within the window
+        self.failures = 0      # consecutive
+        self.blocked_until = 0.0
+        self.retry_after = False  # whether blocked_until came from a 429
+        self.breaker_open = False
+        self._trial = False
+        self.stats = {'allowed': 0, 'over_budget': 0, 'held_back': 0, 'rate_limited': 0,
+                      'failures': 0, 'breaker_opened': 0}
+
+    def allow(self, priority=None):
+        """Reserve a call for `priority` (the thread's by default); False if it must not be sent"""
+        priority = priority or _priority.value
+        now = self.clock.monotonic()
+        with self._lock:
+            if now < self.blocked_until:
+                # A backoff alone holds back polls only
+                if self.retry_after or self.breaker_open or priority == POLL:
+                    self.stats['held_back'] += 1
+                    return False
+            elif self.breaker_open and self._trial:
+                self.stats['held_back'] += 1
+                return False  # the trial call is still out
+            while self._calls and self._calls[0] <= now - self.window:
+                self._calls.popleft()
+            if len(self._calls) >= self._limit(priority):
+                self.stats['over_budget'] += 1
+                return False
+            if self.breaker_open:
+                self._trial = True  # half-open: this call finds out
+            self._calls.append(now)
+            self.stats['allowed'] += 1
+            _priority.sent += 1
+            return True
+
+    def succeeded(self):
+        """The API answered: close the breaker and forget past failures"""
+        with self._lock:
+            if self.breaker_open:
+                print("✅ Spotify API healthy again - circuit breaker closed")
+            self.failures = 0
+            self.breaker_open = False
+            self._trial = False
+            if not self.retry_after or self.clock.monotonic() >= self.blocked_until:
+                self.blocked_until = 0.0
+                self.retry_after = False
+
+    def failed(self, error):
+        """Record a failed call; returns True if it says the API is unhealthy (429, 5xx, network)"""
+        status = getattr(error, 'http_status', None)
+        now = self.clock.monotonic()
+        with self._lock:
+            self._trial = False
+            if status == 429:
+                wait = _retry_after(error)
+                self.blocked_until = max(self.blocked_until, now + wait)
+                self.retry_after = True
+                self.stats['rate_limited'] += 1
+                print(f"⏳ Spotify rate limit: no calls for {wait:.0f}s (Retry-After)")
+                return True
+            if not ((status is not None and status >= 500)
+                    or isinstance(error, (requests.RequestException, ConnectionError, TimeoutError))):
+                # e.g. no active device: the API answered, so it is healthy
+                self.failures = 0
+                self.breaker_open = False
+                return False
+            self.failures += 1
+            self.stats['failures'] += 1
+            delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (self.failures - 1))
+            # Jitter so retries after an outage don't all land together
+            delay *= 0.5 + self._jitter() / 2
+            if now + delay > self.blocked_until:
+                self.blocked_until = now + delay
+                self.retry_after = False
+            if self.failures >= BREAKER_THRESHOLD and not self.breaker_open:
+                self.breaker_open = True
+                self.stats['breaker_opened'] += 1
+                print(f"🔌 Spotify API failing ({self.failures} in a row) - circuit breaker open, "
+                      f"showing the last good track")
+            return True
+
+    def headroom(self, priority=COMMAND):
+        """Calls `priority` could still make in the current window"""
+        now = self.clock.monotonic()
+        with self._lock:
+            recent = sum(1 for sent in self._calls if sent > now - self.window)
+            return max(0, self._limit(priority) - recent)
+
+    def status_text(self):
+        """Short state for the debug page: '27/30 free', '429 wait 12s' or 'down 40s'"""
+        wait = self.blocked_until - self.clock.monotonic()
+        if wait > 0 and self.retry_after:
+            return f"429 wait {math.ceil(wait)}s"
+        if self.breaker_open:
+            return f"down {max(0, math.ceil(wait))}s"
+        return f"{self.headroom()}/{self.budget} free"
+
+    def report(self):
+        """Budget use and refusals since startup"""
+        s = self.stats
+        return (f"🚦 Spotify API budget {self.budget}/{self.window:.0f}s: {s['allowed']} calls sent, "
+                f"{s['over_budget']} over budget, {s['held_back']} held back, {s['rate_limited']} rate limited, "
+                f"{s['failures']} failures, breaker opened {s['breaker_opened']}x")
+
+    def _limit(self, priority):
+        return self.budget if priority == COMMAND else self.budget - self.reserve
+
+def _retry_after(error):
+    """Seconds from a 429's Retry-After header (spotipy keeps the response headers)"""
+    headers = getattr(error, 'headers', None) or {}
+    try:
+        return max(0.0, float(headers.get('Retry-After')))
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER
@@ -3,6 +3,8 @@ Application State Management
 Centralized state for the Spotify LCD Player
 """
 
+import os
+
 # Display modes
 DISPLAY_MODES = ['welcome', 'now_playing', 'clock', 'debug']
 
@@ -24,43 +26,38 @@ japanese_settings = {
     'processor_available': False  # Set at runtime based on pykakasi availability
 }
 
-# Display rendering state
+# Display rendering options
+display_settings = {
+    # Scroll with the HD44780 display shift when both lines can move together
+    'hardware_scroll': True,
+    # Clock page in 2-row digits drawn with CGRAM bar glyphs (text clock
+    # while CGRAM is busy); HH:MM only, so off unless LCD_BIG_CLOCK=1
+    'big_clock': False,
+    # now_playing: 'Title - Artist' on line 1, elapsed time and a progress
+    # bar on line 2 (for tracks with a known duration); LCD_PROGRESS_BAR=1
+    'progress_bar': False,
+    # Pages whose long lines loop as a continuous marquee instead of the
+    # pendulum scroll, one flag per line, e.g. {'now_playing': (True, False)}
+    # (LCD_MARQUEE_PAGES=now_playing:1)
+    'marquee': {},
+}
+
+# Display rendering state (animation progress lives in display_effects.animator)
 display_state = {
     'mode': 0,
     'content_line1': '',
     'content_line2': '',
-    'scroll_pos1': 0,
-    'scroll_pos2': 0,
-    'scroll_dir1': 1,
-    'scroll_dir2': 1,
-    'pause_until1': 0,
-    'pause_until2': 0,
-    'last_update': 0,
-    'wave_complete': False,
-    # --- New slide-transition state ---
+    # --- Slide-transition state ---
     'transition_active': False,
-    'transition_step': 0,
     'transition_speed': 0.06,  # seconds per frame
-    'transition_last_update': 0,
-    'prev_visible_line1': ' ' * 16,
-    'prev_visible_line2': ' ' * 16,
 }
 
 def reset_display_state():
     """Reset display state for new mode or content"""
     global display_state
     display_state.update({
-        'scroll_pos1': 0,
-        'scroll_pos2': 0,
-        'scroll_dir1': 1,
-        'scroll_dir2': 1,
-        'pause_until1': 0,
-        'pause_until2': 0,
-        'wave_complete': False,
         # Reset any in-progress transitions on mode/content reset
         'transition_active': False,
-        'transition_step': 0,
-        'transition_last_update': 0,
     })
 
 def get_current_mode():
@@ -98,4 +95,33 @@ def is_japanese_romanization_enabled():
 def set_japanese_processor_availability(available):
     """Set Japanese processor availability status"""
     global japanese_settings
-    japanese_settings['processor_available'] = available
\ No newline at end of file
+    japanese_settings['processor_available'] = available
+
+def _env_flag(name, default):
+    """Read an on/off environment switch (1/true/yes/on)"""
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+def _parse_marquee_pages(value):
+    """'page[:lines],...' -> {page: (line1, line2)}; no lines means both"""
+    marquee = {}
+    for entry in value.split(','):
+        page, _, lines = entry.strip().partition(':')
+        if not page:
+            continue
+        if page not in DISPLAY_MODES or not set(lines) <= {'1', '2'}:
+            print(f"⚠️ Ignoring LCD_MARQUEE_PAGES entry: {entry.strip()}")
+            continue
+        lines = lines or '12'
+        marquee[page] = ('1' in lines, '2' in lines)
+    return marquee
+
+def load_display_settings():
+    """Apply the optional LCD_* display switches from the environment"""
+    display_settings['big_clock'] = _env_flag('LCD_BIG_CLOCK', display_settings['big_clock'])
+    display_settings['progress_bar'] = _env_flag('LCD_PROGRESS_BAR', display_settings['progress_bar'])
+    marquee_pages = os.getenv('LCD_MARQUEE_PAGES')
+    if marquee_pages is not None:
+        display_settings['marquee'] = _parse_marquee_pages(marquee_pages)
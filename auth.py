@@ -8,6 +8,7 @@ import os
 import spotipy
 from spotipy.oauth2 import SpotifyOAuth
 from dotenv import load_dotenv
+from token_cache import LockedFileCacheHandler
 
 # Load environment variables
 load_dotenv()
@@ -41,7 +42,8 @@ def authenticate():
             client_secret=client_secret, 
             redirect_uri=redirect_uri,
             scope=scope,
-            cache_path=".spotify_cache",
+            # Same locked, atomic cache writes as the running player
+            cache_handler=LockedFileCacheHandler(".spotify_cache"),
             open_browser=True
         )
         
@@ -3,60 +3,98 @@ Background Tasks Module
 Handles background monitoring and auto-sleep functionality
 """
 
-import time
 import threading
 import app_state
+from api_guard import calls_sent, poll_priority
+from clock import get_clock
+from frame_scheduler import wake_render_loop
+from poll_scheduler import ERROR_RETRY_INTERVAL, IDLE_POLL_INTERVAL, get_poll_scheduler
+from profiler import get_profile_capture
+from progress_bar import get_playback_progress
+
+def poll_once(spotify, scheduler=None):
+    """Run one background check; returns the seconds to wait before the next.
+
+    Split out of the thread loop so the same logic can be stepped by a
+    virtual clock in tests and benchmarks. On now_playing the poll
+    scheduler plans the next check from the track's progress and length.
+    """
+    clock = get_clock()
+    scheduler = scheduler or get_poll_scheduler()
+    try:
+        # Only poll API when on now_playing display
+        if app_state.get_current_mode() == 'now_playing':
+            # The scheduler sets the pace, so every poll asks Spotify (at poll
+            # priority: button commands keep a share of the call budget)
+            sent = calls_sent()
+            with poll_priority():
+                new_track = spotify.get_current_track(force_refresh=True)
+            # Refused by the guard (or answered by a request already in flight)
+            issued = calls_sent() > sent
+            # Re-sync the locally interpolated progress bar from this poll
+            get_playback_progress().sync(new_track)
+
+            # Track music playback state
+            is_currently_playing = new_track and new_track.get('is_playing', False)
+
+            if is_currently_playing != app_state.music_state['is_playing']:
+                app_state.music_state['is_playing'] = is_currently_playing
+                if is_currently_playing:
+                    print("🎵 Music resumed - staying on now_playing")
+                    app_state.music_state['last_playing_time'] = clock.monotonic()
+                    app_state.music_state['stopped_duration'] = 0
+                else:
+                    print("⏸️  Music paused/stopped - starting sleep timer")
+                    app_state.music_state['stopped_duration'] = 0
+
+            # Check for track changes
+            track_changed = spotify.has_track_changed(app_state.current_track, new_track)
+            if track_changed:
+                print(f"🔄 Track change: {new_track['title']} - {new_track['artist']}")
+                app_state.current_track = new_track
+                app_state.music_state['last_playing_time'] = clock.monotonic()
+                wake_render_loop()
+
+            # Auto-sleep logic: switch to clock if music stopped for too long
+            if not is_currently_playing:
+                app_state.music_state['stopped_duration'] = clock.monotonic() - app_state.music_state['last_playing_time']
+                if app_state.music_state['stopped_duration'] > app_state.music_state['auto_sleep_threshold']:
+                    print(f"😴 Auto-sleep: Music stopped for {app_state.music_state['stopped_duration']:.0f}s, switching to clock")
+                    app_state.set_display_mode(app_state.DISPLAY_MODES.index('clock'))
+                    wake_render_loop()
+                    app_state.music_state['stopped_duration'] = 0  # Reset to avoid repeated switches
+
+            return scheduler.polled(new_track, track_changed, issued)
+
+        # Not on now_playing display - sleep longer, no API calls
+        print(f"💤 Sleeping - on {app_state.get_current_mode()} display, no API polling")
+        return IDLE_POLL_INTERVAL
+
+    except Exception as e:
+        print(f"Background check error: {e}")
+        return ERROR_RETRY_INTERVAL
+
+def request_poll(delay=0.0, command=False):
+    """Have the background poller check playback within `delay` seconds.
+
+    With command=True (after a button command) polls stay frequent for a
+    few seconds so the display catches up quickly.
+    """
+    get_poll_scheduler().request(delay, command)
 
 def check_for_track_changes():
-    """Smart background thread - only polls when on now_playing display"""
+    """Smart background thread - only polls when on now_playing display, paced by the track"""
     from spotify_manager import get_spotify_manager
     spotify = get_spotify_manager()
-    
+    capture = get_profile_capture()
+    scheduler = get_poll_scheduler()
+
     while True:
-        try:
-            # Only poll API when on now_playing display
-            if app_state.get_current_mode() == 'now_playing':
-                new_track = spotify.get_current_track()
-                
-                # Track music playback state
-                is_currently_playing = new_track and new_track.get('is_playing', False)
-                
-                if is_currently_playing != app_state.music_state['is_playing']:
-                    app_state.music_state['is_playing'] = is_currently_playing
-                    if is_currently_playing:
-                        print("🎵 Music resumed - staying on now_playing")
-                        app_state.music_state['last_playing_time'] = time.time()
-                        app_state.music_state['stopped_duration'] = 0
-                    else:
-                        print("⏸️  Music paused/stopped - starting sleep timer")
-                        app_state.music_state['stopped_duration'] = 0
-                
-                # Check for track changes
-                if spotify.has_track_changed(app_state.current_track, new_track):
-                    print(f"🔄 Track change: {new_track['title']} - {new_track['artist']}")
-                    app_state.current_track = new_track
-                    app_state.music_state['last_playing_time'] = time.time()
-                
-                # Auto-sleep logic: switch to clock if music stopped for too long
-                if not is_currently_playing:
-                    app_state.music_state['stopped_duration'] = time.time() - app_state.music_state['last_playing_time']
-                    if app_state.music_state['stopped_duration'] > app_state.music_state['auto_sleep_threshold']:
-                        print(f"😴 Auto-sleep: Music stopped for {app_state.music_state['stopped_duration']:.0f}s, switching to clock")
-                        app_state.set_display_mode(app_state.DISPLAY_MODES.index('clock'))
-                        app_state.music_state['stopped_duration'] = 0  # Reset to avoid repeated switches
-                
-                time.sleep(8)  # Poll every 8 seconds when on now_playing
-            else:
-                # Not on now_playing display - sleep longer, no API calls
-                print(f"💤 Sleeping - on {app_state.get_current_mode()} display, no API polling")
-                time.sleep(30)  # Much longer sleep when not on now_playing
-            
-        except Exception as e:
-            print(f"Background check error: {e}")
-            time.sleep(10)
+        capture.checkpoint()
+        scheduler.wait(poll_once(spotify, scheduler))
 
 def start_background_monitoring():
     """Start the background thread for track change monitoring"""
     bg_thread = threading.Thread(target=check_for_track_changes, daemon=True)
     bg_thread.start()
-    return bg_thread
\ No newline at end of file
+    return bg_thread
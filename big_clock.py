@@ -0,0 +1,124 @@
+"""
+Big Clock Module
+Two-row HH:MM clock drawn with a few CGRAM bar glyphs
+"""
+
+from animation import Effect
+
+# Segment glyphs (5x8): bars at the top, at the bottom, and at both edges of
+# a cell. Solid cells use the ROM full block where the ROM has one.
+BAR_GLYPHS = {
+    'bar_top': (0b11111, 0b11111, 0b11111, 0b00000, 0b00000, 0b00000, 0b00000, 0b00000),
+    'bar_bottom': (0b00000, 0b00000, 0b00000, 0b00000, 0b00000, 0b11111, 0b11111, 0b11111),
+    'bar_both': (0b11111, 0b11111, 0b00000, 0b00000, 0b00000, 0b00000, 0b11111, 0b11111),
+}
+FULL_GLYPH = ('full', (0b11111,) * 8)
+A00_FULL_BLOCK = '\xff'
+
+# Each digit is 3 cells wide and 2 rows tall: T = bar_top, B = bar_bottom,
+# M = bar_both, F = full block, space = blank
+DIGIT_CELLS = {
+    '0': ('FTF', 'FBF'),
+    '1': ('TF ', 'BFB'),
+    '2': ('MMF', 'FBB'),
+    '3': ('MMF', 'BBF'),
+    '4': ('FBF', '  F'),
+    '5': ('FMM', 'BBF'),
+    '6': ('FMM', 'FBF'),
+    '7': ('TTF', '  F'),
+    '8': ('FMF', 'FBF'),
+    '9': ('FMF', 'BBF'),
+}
+_CELL_GLYPHS = {'T': 'bar_top', 'B': 'bar_bottom', 'M': 'bar_both', 'F': 'full'}
+
+# HH:MM is 13 cells wide; one blank column on the left centres it on 16
+LEFT_MARGIN = 1
+
+class BigClockEffect(Effect):
+    """Shows the clock page's HH:MM in big digits.
+
+    The bar glyphs are acquired from the display's CGRAM manager once (all
+    or nothing) and released when the effect is cancelled. Digit blocks are
+    built once per glyph set and cached, so a frame is a few string joins,
+    and since it only changes once a minute the framebuffer sends just the
+    cells of the digits that changed. While CGRAM is busy (other glyphs in
+    use) the text clock is shown instead, and the glyphs are retried on the
+    next frame.
+    """
+
+    name = 'big_clock'
+
+    def __init__(self):
+        super().__init__()
+        self._cgram = None
+        self._glyphs = None
+        self._digits = None
+        self._colon = ':'
+        self._shown = None
+
+    def start(self, now, ctx):
+        super().start(now, ctx)
+        self._shown = None
+
+    def frame(self, now):
+        lines = self.ctx.lines
+        if self._digits is None and not self._acquire():
+            # CGRAM busy: plain text clock
+            return self._show(lines, self.ctx.padded)
+        # 'HH:MM:SS' - only the hours and minutes are drawn
+        return self._show(lines[0][:5], self._render)
+
+    def _show(self, key, build):
+        if key == self._shown:
+            return None
+        self._shown = key
+        return build()
+
+    def _render(self):
+        time_text = self._shown
+        blocks = [self._digits.get(ch) for ch in time_text[:2] + time_text[3:5]]
+        if None in blocks:
+            return self.ctx.padded()  # not a time (e.g. before the first tick)
+        width = self.ctx.width
+        rows = []
+        for row in range(2):
+            cells = ' ' * LEFT_MARGIN + blocks[0][row] + blocks[1][row] + self._colon + blocks[2][row] + blocks[3][row]
+            rows.append(cells.ljust(width)[:width])
+        return tuple(rows)
+
+    def _acquire(self):
+        sink = self.ctx.sink
+        cgram = getattr(sink, 'cgram', None)
+        if cgram is None or not hasattr(sink, 'encode'):
+            return False
+        glyphs = dict(BAR_GLYPHS)
+        full = sink.encode('█')
+        if full != A00_FULL_BLOCK:
+            # Only the A00 ROM has a full block cell
+            glyphs[FULL_GLYPH[0]] = FULL_GLYPH[1]
+        # Check first so a failed attempt never evicts or uploads anything
+        if cgram.free_slots() < len(glyphs):
+            return False
+        codes = cgram.acquire_all(glyphs)
+        if codes is None:
+            return False
+        cells = {key: chr(codes[name]) if name in codes else full for key, name in _CELL_GLYPHS.items()}
+        cells[' '] = ' '
+        self._digits = {
+            digit: tuple(''.join(cells[c] for c in row) for row in rows)
+            for digit, rows in DIGIT_CELLS.items()
+        }
+        self._colon = sink.encode('·')
+        self._cgram = cgram
+        self._glyphs = glyphs
+        self._shown = None
+        return True
+
+    def cancel(self):
+        """Stop and hand the glyph slots back"""
+        if self._cgram is not None:
+            for name in self._glyphs:
+                self._cgram.release(name)
+            self._cgram = None
+            self._digits = None
+        super().cancel()
@@ -3,7 +3,8 @@ Button Handler Module
 Manages GPIO button configuration and event handling
 """
 
-import time
+from clock import get_clock
+from playback_state import SETTLE_SECONDS
 import RPi.GPIO as GPIO
 import app_state
 import os
@@ -20,49 +21,95 @@ BUTTON_PINS = {
 }
 DEBOUNCE = 0.3
 HOLD_DURATION = 5.0  # 5 seconds for reboot
+POLL_INTERVAL = 0.05  # Button polling rate when edge detection is unavailable
+
+# Set by setup_buttons(): whether GPIO edges wake the render loop
+edge_detection = False
+
+def _on_button_edge(channel):
+    """GPIO callback: wake the main loop so check_buttons() runs immediately"""
+    from frame_scheduler import wake_render_loop
+    wake_render_loop()
 
 def setup_buttons():
     """Initialize GPIO for buttons"""
+    global edge_detection
     GPIO.setmode(GPIO.BCM)
     for pin in BUTTON_PINS.values():
         GPIO.setup(pin, GPIO.IN, pull_up_down=GPIO.PUD_DOWN)
+    try:
+        for pin in BUTTON_PINS.values():
+            GPIO.add_event_detect(pin, GPIO.BOTH, callback=_on_button_edge)
+        edge_detection = True
+    except RuntimeError as e:
+        print(f"⚠️ GPIO edge detection unavailable ({e}) - polling buttons every {POLL_INTERVAL * 1000:.0f}ms")
+        edge_detection = False
+
+def next_button_deadline():
+    """Monotonic time the main loop must next check the buttons, or None.
+
+    With edge detection presses wake the loop, so only a button settling
+    after an edge or a CYCLE hold in progress needs a timed check; without
+    it the buttons are polled.
+    """
+    now = get_clock().monotonic()
+    if not edge_detection:
+        return now + POLL_INTERVAL
+    # A button still debouncing is read again once it has settled
+    deadlines = [until for until in getattr(check_buttons, 'settle_until', {}).values() if until > now]
+    hold_start = getattr(check_buttons, 'hold_start_times', {}).get('CYCLE')
+    if hold_start and not check_buttons.hold_triggered['CYCLE']:
+        deadlines.append(hold_start + HOLD_DURATION)
+    return min(deadlines, default=None)
+
+def _show_playback(spotify):
+    """Show the playback state a command left behind (served locally, no API call).
+
+    Also runs on the command thread when Spotify refuses a command, to show it undone.
+    """
+    from frame_scheduler import wake_render_loop
+    track = spotify.get_current_track()
+    if spotify.has_track_changed(app_state.current_track, track):
+        app_state.current_track = track
+    app_state.music_state['is_playing'] = bool(track and track.get('is_playing'))
+    if app_state.music_state['is_playing']:
+        app_state.music_state['last_playing_time'] = get_clock().monotonic()
+        app_state.music_state['stopped_duration'] = 0
+    wake_render_loop()
 
 def handle_prev_button():
     """Handle previous track button press"""
     from spotify_manager import get_spotify_manager
     spotify = get_spotify_manager()
-    spotify.previous_track()
+    # Shown at once; the write call goes out on the command thread
+    spotify.previous_track(on_rejected=lambda: _show_playback(spotify))
     
     # Auto-wake: switch to now_playing when playback buttons pressed
     if app_state.get_current_mode() != 'now_playing':
         print("🎵 Auto-wake: Playback button pressed, switching to now_playing")
         app_state.set_display_mode(app_state.DISPLAY_MODES.index('now_playing'))
     
-    time.sleep(1)  # Give Spotify time to change track
-    new_track = spotify.get_current_track(force_refresh=True)
-    if spotify.has_track_changed(app_state.current_track, new_track):
-        app_state.current_track = new_track
-    
-    app_state.music_state['is_playing'] = True
-    app_state.music_state['last_playing_time'] = time.time()
-    app_state.music_state['stopped_duration'] = 0
+    # No waiting here: the poller fetches the new track once Spotify has switched
+    from background_tasks import request_poll
+    request_poll(SETTLE_SECONDS, command=True)
+    _show_playback(spotify)
 
 def handle_play_button():
     """Handle play/pause button press"""
     from spotify_manager import get_spotify_manager
     spotify = get_spotify_manager()
-    spotify.play_pause()
+    # Shown at once; the write call goes out on the command thread
+    spotify.play_pause(on_rejected=lambda: _show_playback(spotify))
     
     # Auto-wake: switch to now_playing when playback buttons pressed
     if app_state.get_current_mode() != 'now_playing':
         print("🎵 Auto-wake: Play/Pause pressed, switching to now_playing")
         app_state.set_display_mode(app_state.DISPLAY_MODES.index('now_playing'))
     
-    # Update music state
-    app_state.music_state['is_playing'] = not app_state.music_state['is_playing']  # Toggle
-    if app_state.music_state['is_playing']:
-        app_state.music_state['last_playing_time'] = time.time()
-        app_state.music_state['stopped_duration'] = 0
+    # Show the new state now; a poll confirms it once Spotify has settled
+    from background_tasks import request_poll
+    request_poll(SETTLE_SECONDS, command=True)
+    _show_playback(spotify)
     
     print(f"⏯️  Play/Pause - Music {'playing' if app_state.music_state['is_playing'] else 'paused'}")
 
@@ -70,21 +117,18 @@ def handle_next_button():
     """Handle next track button press"""
     from spotify_manager import get_spotify_manager
     spotify = get_spotify_manager()
-    spotify.next_track()
+    # Shown at once; the write call goes out on the command thread
+    spotify.next_track(on_rejected=lambda: _show_playback(spotify))
     
     # Auto-wake: switch to now_playing when playback buttons pressed
     if app_state.get_current_mode() != 'now_playing':
         print("🎵 Auto-wake: Playback button pressed, switching to now_playing")
         app_state.set_display_mode(app_state.DISPLAY_MODES.index('now_playing'))
     
-    time.sleep(1)  # Give Spotify time to change track
-    new_track = spotify.get_current_track(force_refresh=True)
-    if spotify.has_track_changed(app_state.current_track, new_track):
-        app_state.current_track = new_track
-    
-    app_state.music_state['is_playing'] = True
-    app_state.music_state['last_playing_time'] = time.time()
-    app_state.music_state['stopped_duration'] = 0
+    # No waiting here: the poller fetches the new track once Spotify has switched
+    from background_tasks import request_poll
+    request_poll(SETTLE_SECONDS, command=True)
+    _show_playback(spotify)
 
 def handle_cycle_button():
     """Handle display cycle button press"""
@@ -99,7 +143,7 @@ def handle_cycle_button():
         if app_state.current_track and app_state.current_track.get('is_playing', False):
             print("🎵 Auto-wake: Switched to now_playing with active music")
             app_state.music_state['is_playing'] = True
-            app_state.music_state['last_playing_time'] = time.time()
+            app_state.music_state['last_playing_time'] = get_clock().monotonic()
             app_state.music_state['stopped_duration'] = 0
 
 def handle_cycle_hold():
@@ -120,16 +164,19 @@ def handle_cycle_hold():
     line1 = "Restarting app" if restart_mode == "process" else (
         "Restarting svc" if restart_mode == "service" else "Rebooting OS...")
 
-    # Clear display to show status
-    from lcd import LCD
+    # Show status through the LCD writer so it stays the only hardware owner
+    from lcd_writer import get_lcd_writer
     try:
-        lcd = LCD()
-        lcd.clear()
-        lcd.lcd.cursor_pos = (0, 0)
-        lcd.lcd.write_string((line1 + "...")[:16].ljust(16))
-        lcd.lcd.cursor_pos = (1, 0)
-        lcd.lcd.write_string("Please wait...".ljust(16))
-        time.sleep(0.5)
+        lcd = get_lcd_writer()
+        if lcd is None:
+            from lcd import LCD
+            lcd = LCD()
+        lcd.write_line(line1 + "...", 0)
+        lcd.write_line("Please wait...", 1)
+        lcd.commit()
+        if hasattr(lcd, 'flush'):
+            lcd.flush(0.5)
+        get_clock().sleep(0.5)
     except Exception as e:
         print(f"LCD error during restart message: {e}")
 
@@ -167,7 +214,7 @@ def handle_cycle_hold():
                     subprocess.run(["systemctl", "restart", svc], check=False, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
                 except Exception as svc_err:
                     print(f"Service restart error for {svc}: {svc_err}")
-            time.sleep(0.5)
+            get_clock().sleep(0.5)
             # Exit so the manager (systemd) fully takes over
             sys.exit(0)
 
@@ -178,7 +225,7 @@ def handle_cycle_hold():
             else:
                 subprocess.run(["reboot"], check=False)
             # If reboot command returns (permissions?), fall back
-            time.sleep(1)
+            get_clock().sleep(1)
             return restart_process()
 
         else:
@@ -207,12 +254,20 @@ def check_buttons():
         check_buttons.last_button_states = {name: GPIO.LOW for name in BUTTON_PINS}
         check_buttons.hold_start_times = {name: None for name in BUTTON_PINS}
         check_buttons.hold_triggered = {name: False for name in BUTTON_PINS}
+        check_buttons.settle_until = {name: 0.0 for name in BUTTON_PINS}
     
-    current_time = time.time()
+    current_time = get_clock().monotonic()
     
     for name, pin in BUTTON_PINS.items():
         state = GPIO.input(pin)
         
+        # Debounce: ignore contact bounce for DEBOUNCE after an edge, without
+        # sleeping, so the frame a press produced is drawn right away
+        if state != check_buttons.last_button_states[name]:
+            if current_time < check_buttons.settle_until[name]:
+                continue
+            check_buttons.settle_until[name] = current_time + DEBOUNCE
+        
         # Button press detection (rising edge)
         if state == GPIO.HIGH and check_buttons.last_button_states[name] == GPIO.LOW:
             print(f"🎮 Button {name} pressed!")
@@ -226,7 +281,6 @@ def check_buttons():
             if name in BUTTON_HANDLERS and name != 'CYCLE':
                 BUTTON_HANDLERS[name]()
             
-            time.sleep(DEBOUNCE)  # Debounce
             button_pressed = True
         
         # Button release detection (falling edge)
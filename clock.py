@@ -0,0 +1,76 @@
+"""
+Clock Module
+Injectable time source: monotonic for intervals, wall clock only for display
+"""
+
+import time
+from datetime import datetime
+
+class SystemClock:
+    """Real time. Intervals use the monotonic clock, so NTP jumps on a freshly
+    booted Pi cannot stretch scroll pauses or expire caches early."""
+
+    def monotonic(self):
+        return time.monotonic()
+
+    def wall(self):
+        """Seconds since the epoch - for showing the time, never for intervals"""
+        return time.time()
+
+    def now(self):
+        """Local wall-clock datetime for the clock page"""
+        return datetime.now()
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def wait(self, event, timeout):
+        """Wait for a threading.Event; returns True if it was set"""
+        return event.wait(timeout)
+
+class VirtualClock:
+    """Clock that only moves when told to.
+
+    sleep() and timed-out waits advance time instantly, so a benchmark or
+    test can run an hour of scrolling, polling and auto-sleep logic in a
+    fraction of a second. Not meant to be shared between threads.
+    """
+
+    def __init__(self, start=1000.0, wall_start=None):
+        self._monotonic = start
+        # Wall time tracks the monotonic time from a fixed origin
+        self._wall_offset = (wall_start if wall_start is not None else time.time()) - start
+
+    def monotonic(self):
+        return self._monotonic
+
+    def wall(self):
+        return self._monotonic + self._wall_offset
+
+    def now(self):
+        return datetime.fromtimestamp(self.wall())
+
+    def advance(self, seconds):
+        self._monotonic += max(0.0, seconds)
+
+    def sleep(self, seconds):
+        self.advance(seconds)
+
+    def wait(self, event, timeout):
+        if not event.is_set() and timeout is not None:
+            self.advance(timeout)
+        return event.is_set()
+
+# Global clock instance
+clock = SystemClock()
+
+def get_clock():
+    """Get the clock used by the render and polling stack"""
+    return clock
+
+def set_clock(new_clock):
+    """Swap the global clock (e.g. for a VirtualClock in benchmarks and tests)"""
+    global clock
+    previous, clock = clock, new_clock
+    return previous
@@ -5,233 +5,273 @@ Handles complex display animations like wave effects and scrolling
 
 import time
 import app_state
+from animation import Animator, Effect, Marquee, Pause, Sequence, StepEffect
+from big_clock import BigClockEffect
+from clock import get_clock
+from progress_bar import ProgressOverlay, progress_shown
+from render_stats import get_render_stats
+from scroll_frames import MarqueeTable, ScrollTable
+
+# Animation timing (seconds)
+DISPLAY_WIDTH = 16
+SCROLL_SPEED = 0.3
+SCROLL_PAUSE = 4.0
+WAVE_SPEED = 0.15
+SLIDE_HOLD = 1.0  # new track text rests this long before it starts scrolling
+
+# Plays the effect for the current content and writes its frames
+animator = Animator(DISPLAY_WIDTH)
+
+# Content version the animator is showing, and the lines it produced. Ticks
+# with the same version (and untouched display_state lines) skip content work.
+_shown_content = {'version': None, 'line1': None, 'line2': None}
+
+def _encode(lcd, text):
+    """Translate text to the display's character ROM once per content string"""
+    if hasattr(lcd, 'encode'):
+        return lcd.encode(text)
+    return text
+
+def _retain_glyphs(lcd, lines):
+    """Let the display release symbol glyphs no longer on show"""
+    if hasattr(lcd, 'retain_glyphs'):
+        lcd.retain_glyphs(lines)
+
+def _commit(lcd):
+    """Flush staged lines, sending only the cells that changed"""
+    if hasattr(lcd, 'commit'):
+        lcd.commit()
 
 def update_display_with_effects(lcd):
     """Non-blocking display update with pendulum scrolling and wave effects"""
-    from display_manager import get_display_content, has_significant_content_change
-    
-    line1, line2 = get_display_content()
-    
+    started = time.perf_counter()
+    dropped = animator.stats['frames_dropped']
+    content_changed, written = _update_display(lcd)
+    if written:
+        _commit(lcd)
+    stats = get_render_stats()
+    stats.record_frame(time.perf_counter() - started, written)
+    if animator.stats['frames_dropped'] > dropped:
+        stats.record_dropped(animator.stats['frames_dropped'] - dropped)
+    return content_changed
+
+def next_frame_deadline():
+    """Monotonic time the display next needs an update, or None when static.
+
+    Covers the running effect (slide, wave, scroll steps) and periodic
+    content such as the clock. Track changes and button presses are not
+    predictable and wake the loop themselves.
+    """
+    from display_manager import time_to_next_content_change
+
+    content_wait = time_to_next_content_change()
+    deadlines = [animator.next_deadline()]
+    if content_wait is not None:
+        deadlines.append(get_clock().monotonic() + content_wait)
+    deadlines = [d for d in deadlines if d is not None]
+    return min(deadlines) if deadlines else None
+
+# --- Effects ---
+
+def slide_steps(ctx, old_lines, speed):
+    """Slide old content out to the left while new content slides in from the
+    right, as a sliding window over old_line + new_line so the text never
+    stalls mid-screen."""
+    width = ctx.width
+    old = [line[:width].ljust(width) for line in old_lines]
+    # step 0..width inclusive ends on the new content left-justified
+    for step in range(width + 1):
+        # New content is read each frame so minor updates show immediately
+        yield tuple((o + n)[step:step + width] for o, n in zip(old, ctx.padded())), speed
+
+def wave_steps(ctx, speed):
+    """Progressive text reveal for new content"""
+    width = ctx.width
+    for revealed in range(width + 1):
+        yield tuple(line[:revealed].ljust(width) for line in ctx.lines), speed
+    print("✨ Wave effect complete, starting scroll mode")
+
+class ScrollEffect(Effect):
+    """Pendulum (or marquee) scrolling for overflowing lines; runs until replaced.
+
+    Frames are looked up from the time elapsed since the effect started, so
+    a late tick shows the frame that is due rather than the next one. When
+    both lines move together the HD44780 display shift replaces rewrites.
+    Lines flagged in display_settings['marquee'] loop as a continuous
+    marquee instead; those are always software frames, since the display
+    shift wraps at the end of the 40-cell DDRAM line, not the text.
+    """
+
+    name = 'scroll'
+
+    def __init__(self, step=SCROLL_SPEED, pause=SCROLL_PAUSE, hardware=True, loops=None):
+        super().__init__()
+        self.step = step
+        self.pause = pause
+        # False when another row is drawn over this effect's frames
+        self.hardware = hardware
+        # Per line: continuous marquee instead of pendulum (None: the page's setting)
+        self.loops = loops
+        self._tables = ()
+        self._scrolls = False
+        # (tables, positions, elapsed) of the last frame, for step timing
+        self._shown = None
+
+    def start(self, now, ctx):
+        super().start(now, ctx)
+        if self.loops is None:
+            self.loops = marquee_lines(app_state.get_current_mode())
+
+    def _compile(self):
+        """Frame tables for the current content, rebuilt only for lines that changed"""
+        ctx = self.ctx
+        tables = self._tables
+        if len(tables) != len(ctx.lines) or any(table.text != text for table, text in zip(tables, ctx.lines)):
+            # e.g. only the clock's time line changes each second; the date keeps its table
+            previous = {table.text: table for table in tables}
+            self._tables = tuple(
+                previous.get(text) or self._table(text, row)
+                for row, text in enumerate(ctx.lines))
+            self._scrolls = any(table.scrolls for table in self._tables)
+        return self._tables
+
+    def _table(self, text, row):
+        if row < len(self.loops) and self.loops[row]:
+            return MarqueeTable(text, self.ctx.width, self.step, self.pause)
+        return ScrollTable(text, self.ctx.width, self.step, self.pause)
+
+    def frame(self, now):
+        tables = self._compile()
+        if self._shown is not None and self._shown[0] is tables and not self._scrolls:
+            return None  # text that fits: nothing moves until the content changes
+        elapsed = now - self.started
+        positions = tuple(table.position_at(elapsed) for table in tables)
+        if self._shown is not None and self._shown[0] is tables and self._shown[1] != positions:
+            self._record_step(tables, self._shown[2], elapsed)
+        self._shown = (tables, positions, elapsed)
+        if self.hardware and not any(table.loops for table in tables) and _can_hardware_scroll(self.ctx.sink, self.ctx.lines, self.ctx.width):
+            # One-time DDRAM load per content; afterwards each step is a single shift byte
+            offset = next(pos for table, pos in zip(tables, positions) if table.scrolls)
+            return Marquee(self.ctx.lines, offset)
+        return tuple(table.frames[pos] for table, pos in zip(tables, positions))
+
+    def _record_step(self, tables, previous, elapsed):
+        """Time a scroll step against its slot on the step grid"""
+        changes = [table.change_times(previous, elapsed) for table in tables if table.scrolls]
+        changes = [times for times in changes if times]
+        if not changes:
+            return
+        get_render_stats().record_scroll_step(min(elapsed - times[-1] for times in changes))
+        # Steps that came due between two ticks were never shown
+        self.ctx.frames_dropped += max(len(times) for times in changes) - 1
+
+    def deadline(self):
+        now = get_clock().monotonic()
+        if tuple(t.text for t in self._tables) != self.ctx.lines:
+            return now  # tables not compiled for this content yet
+        waits = [t.time_to_next_change(now - self.started) for t in self._tables]
+        waits = [w for w in waits if w is not None]
+        return now + min(waits) if waits else None
+
+    def is_static(self, ctx):
+        # Nothing overflows: frames only change with the content
+        return all(len(line) <= ctx.width for line in ctx.lines)
+
+def marquee_lines(mode):
+    """Per-line continuous-marquee flags for a page, from display_settings"""
+    return tuple(app_state.display_settings['marquee'].get(mode, ()))
+
+def _can_hardware_scroll(lcd, lines, width):
+    """Check whether the HD44780 display shift can replace software scrolling.
+
+    The shift moves both lines at once, so every non-blank line must overflow
+    by the same amount (keeping the pendulums in lockstep) and fit within the
+    controller's DDRAM line.
+    """
+    if not app_state.display_settings['hardware_scroll'] or not hasattr(lcd, 'load_marquee'):
+        return False
+    lines = [line for line in lines if line.strip()]
+    if not lines or any(len(line) <= width for line in lines):
+        return False
+    if len({len(line) for line in lines}) != 1:
+        return False
+    return all(lcd.can_hardware_scroll(line) for line in lines)
+
+def slide_then_scroll(old_lines, hardware=True):
+    """Track change: slide the new text in, hold it, then scroll"""
+    speed = app_state.display_state.get('transition_speed', 0.06)
+    return Sequence(
+        StepEffect(slide_steps, name='slide', old_lines=old_lines, speed=speed),
+        Pause(SLIDE_HOLD),
+        ScrollEffect(hardware=hardware),
+    )
+
+def now_playing_effect(old_lines):
+    """Track change on now_playing, with the progress line under the title when known"""
+    if progress_shown(app_state.current_track):
+        return ProgressOverlay(slide_then_scroll(old_lines, hardware=False))
+    return slide_then_scroll(old_lines)
+
+def wave_then_scroll():
+    """New page content: wave reveal, then scroll"""
+    return Sequence(StepEffect(wave_steps, name='wave', speed=WAVE_SPEED), ScrollEffect())
+
+# --- Render tick ---
+
+def _update_display(lcd):
+    """Start an effect for new content and render the frame that is due.
+
+    Returns (content_changed, frame_written).
+    """
+    from display_manager import get_content_version, get_display_content, has_significant_content_change
+
+    now = get_clock().monotonic()
+    state = app_state.display_state
+    version = get_content_version()
+    if (version == _shown_content['version'] and animator.effect is not None
+            and state['content_line1'] is _shown_content['line1']
+            and state['content_line2'] is _shown_content['line2']):
+        # Nothing the content depends on changed: skip generation and change detection
+        written = animator.render(lcd, now)
+        state['transition_active'] = animator.is_playing('slide')
+        return False, written
+
+    text1, text2 = get_display_content()
+    # Encoding is cached, so scroll ticks reuse the translated strings
+    line1, line2 = _encode(lcd, text1), _encode(lcd, text2)
+
     # Check if content significantly changed
-    if has_significant_content_change(line1, line2):
+    content_changed = has_significant_content_change(line1, line2)
+    if content_changed:
         # Content changed - trigger slide transition for now_playing, wave for others
-        print(f"🔄 Display content changed: '{line1}' | '{line2}'")
+        # Logged as text: the encoded lines hold ROM codes and glyph slots
+        print(f"🔄 Display content changed: '{text1}' | '{text2}'")
+        # Slide from what is on screen, even mid-scroll, to avoid a jump
+        previous = animator.visible_lines()
+        animator.set_content((line1, line2))
         mode = app_state.get_current_mode()
         if mode == 'now_playing':
-            # Capture what is currently visible to avoid jump when text was scrolling
-            prev1 = app_state.display_state.get('prev_visible_line1', ' ' * 16)
-            prev2 = app_state.display_state.get('prev_visible_line2', ' ' * 16)
-            # Read last written content from state if available
-            try:
-                # If we were in scrolling mode, reconstruct the visible window
-                width = 16
-                if len(app_state.display_state['content_line1']) > width:
-                    pos = max(0, min(app_state.display_state['scroll_pos1'], len(app_state.display_state['content_line1']) - width))
-                    prev1 = app_state.display_state['content_line1'][pos:pos+width].ljust(width)
-                else:
-                    prev1 = app_state.display_state['content_line1'][:width].ljust(width)
-                if len(app_state.display_state['content_line2']) > width:
-                    pos2 = max(0, min(app_state.display_state['scroll_pos2'], len(app_state.display_state['content_line2']) - width))
-                    prev2 = app_state.display_state['content_line2'][pos2:pos2+width].ljust(width)
-                else:
-                    prev2 = app_state.display_state['content_line2'][:width].ljust(width)
-            except Exception:
-                pass
-            
-            app_state.display_state.update({
-                'content_line1': line1,
-                'content_line2': line2,
-                'scroll_pos1': 0,
-                'scroll_pos2': 0,
-                'scroll_dir1': 1,
-                'scroll_dir2': 1,
-                'pause_until1': 0,
-                'pause_until2': 0,
-                # Start slide transition
-                'transition_active': True,
-                'transition_step': 0,
-                'transition_last_update': time.time(),
-                'prev_visible_line1': prev1,
-                'prev_visible_line2': prev2,
-                # Skip wave for transitions; we'll slide instead, then go to scroll
-                'wave_complete': True,
-                'last_update': time.time()
-            })
-            # Do not clear here; slide uses current buffer as the base
-            return True  # Content changed
+            animator.play(now_playing_effect(previous), now)
         else:
-            # Non-now_playing: use wave effect like before
-            app_state.display_state.update({
-                'content_line1': line1,
-                'content_line2': line2,
-                'scroll_pos1': 0,
-                'scroll_pos2': 0,
-                'scroll_dir1': 1,
-                'scroll_dir2': 1,
-                'pause_until1': 0,
-                'pause_until2': 0,
-                'transition_active': False,
-                'transition_step': 0,
-                'wave_complete': False,
-                'last_update': time.time()
-            })
             lcd.clear()
-            return True
-    
-    # Update content silently for minor changes (like clock seconds)
-    app_state.display_state['content_line1'] = line1
-    app_state.display_state['content_line2'] = line2
-    
-    now = time.time()
-    width = 16
-    scroll_speed = 0.3
-    pause_time = 4.0
-    wave_speed = 0.15
-    
-    # If a transition is active, run it first
-    if app_state.display_state.get('transition_active'):
-        if _update_slide_transition(lcd, line1, line2, now, width):
-            # Transition still in progress
-            return False
-        # Transition finished – fallthrough to scrolling
-    
-    # Show wave effect first for new content (only if not overridden by transition)
-    if not app_state.display_state['wave_complete']:
-        return _update_wave_effect(lcd, line1, line2, now, width, wave_speed)
-    
-    # Scrolling mode for overflow text
-    if now - app_state.display_state['last_update'] >= scroll_speed:
-        _update_scrolling(lcd, line1, line2, now, width, pause_time)
-        app_state.display_state['last_update'] = now
-    
-    return False  # No content change
-
-def _update_slide_transition(lcd, line1, line2, now, width):
-    """Slide old content left out while new content slides in from right using
-    a sliding window over old_line + new_line to avoid mid-screen stalling.
-    Returns True while transition is active, False when finished."""
-    step = app_state.display_state.get('transition_step', 0)
-    speed = app_state.display_state.get('transition_speed', 0.06)
-    last = app_state.display_state.get('transition_last_update', 0)
-    if now - last < speed:
-        return True  # wait for next frame
-
-    old1 = app_state.display_state.get('prev_visible_line1', ' ' * width)
-    old2 = app_state.display_state.get('prev_visible_line2', ' ' * width)
-    new1 = (line1 or '')
-    new2 = (line2 or '')
-
-    # Build composite buffers: old (exactly width) + new (left-justified to width)
-    old1 = old1[:width].ljust(width)
-    old2 = old2[:width].ljust(width)
-    new1_padded = new1[:width].ljust(width)
-    new2_padded = new2[:width].ljust(width)
-
-    composite1 = old1 + new1_padded
-    composite2 = old2 + new2_padded
-
-    max_steps = width  # step 0..width inclusive yields final state at step==width
-
-    # Clamp step within range and compute window
-    s = min(step, max_steps)
-    window1 = composite1[s:s+width]
-    window2 = composite2[s:s+width]
-
-    lcd.lcd.cursor_pos = (0, 0)
-    lcd.lcd.write_string(window1)
-    lcd.lcd.cursor_pos = (1, 0)
-    lcd.lcd.write_string(window2)
-
-    # Advance or finish
-    if step < max_steps:
-        app_state.display_state['transition_step'] = step + 1
-        app_state.display_state['transition_last_update'] = now
-        return True
-
-    # Transition complete
-    app_state.display_state['transition_active'] = False
-    app_state.display_state['transition_step'] = 0
-    app_state.display_state['last_update'] = now  # start scroll timer after slide
-    app_state.display_state['pause_until1'] = now + 1.0
-    app_state.display_state['pause_until2'] = now + 1.0
-
-    # Ensure final frame is the new content left-justified
-    lcd.lcd.cursor_pos = (0, 0)
-    lcd.lcd.write_string(new1_padded)
-    lcd.lcd.cursor_pos = (1, 0)
-    lcd.lcd.write_string(new2_padded)
-    return False
-
-def _update_wave_effect(lcd, line1, line2, now, width, wave_speed):
-    """Handle wave effect animation for new content"""
-    if now - app_state.display_state['last_update'] >= wave_speed:
-        wave_pos1 = app_state.display_state['scroll_pos1']
-        wave_pos2 = app_state.display_state['scroll_pos2']
-        
-        # Show progressive text reveal
-        if wave_pos1 <= width:
-            text_to_show1 = line1[:wave_pos1].ljust(width) 
-            lcd.lcd.cursor_pos = (0, 0)
-            lcd.lcd.write_string(text_to_show1)
-            app_state.display_state['scroll_pos1'] += 1
-        
-        if wave_pos2 <= width:
-            text_to_show2 = line2[:wave_pos2].ljust(width)
-            lcd.lcd.cursor_pos = (1, 0)
-            lcd.lcd.write_string(text_to_show2)
-            app_state.display_state['scroll_pos2'] += 1
-            
-        app_state.display_state['last_update'] = now
-        
-        # Wave complete when both lines fully revealed
-        if app_state.display_state['scroll_pos1'] > width and app_state.display_state['scroll_pos2'] > width:
-            app_state.display_state['wave_complete'] = True
-            app_state.display_state['scroll_pos1'] = 0
-            app_state.display_state['scroll_pos2'] = 0
-            print("✨ Wave effect complete, starting scroll mode")
-    
-    return False  # Still in wave mode
-
-def _update_scrolling(lcd, line1, line2, now, width, pause_time):
-    """Handle scrolling animation for long text"""
-    # Line 1 scrolling
-    if len(line1) > width:
-        _scroll_line(lcd, line1, 0, 1, now, width, pause_time)
+            animator.forget_frame()
+            if mode == 'clock' and app_state.display_settings['big_clock']:
+                animator.play(BigClockEffect(), now)
+            else:
+                animator.play(wave_then_scroll(), now)
     else:
-        # Short text - just display it
-        lcd.lcd.cursor_pos = (0, 0)
-        lcd.lcd.write_string(line1.ljust(width))
-    
-    # Line 2 scrolling (same logic)
-    if len(line2) > width:
-        _scroll_line(lcd, line2, 1, 2, now, width, pause_time)
-    else:
-        lcd.lcd.cursor_pos = (1, 0)
-        lcd.lcd.write_string(line2.ljust(width))
-
-def _scroll_line(lcd, text, lcd_line, state_line, now, width, pause_time):
-    """Handle scrolling for a single line"""
-    pos_key = f'scroll_pos{state_line}'
-    dir_key = f'scroll_dir{state_line}'
-    pause_key = f'pause_until{state_line}'
-    
-    if app_state.display_state[pause_key] <= now:
-        # Ensure position stays within valid bounds
-        max_pos = len(text) - width
-        pos = max(0, min(app_state.display_state[pos_key], max_pos))
-        segment = text[pos:pos + width]
-        lcd.lcd.cursor_pos = (lcd_line, 0)
-        lcd.lcd.write_string(segment.ljust(width))
-        
-        # Check boundaries BEFORE moving position
-        if app_state.display_state[pos_key] >= max_pos and app_state.display_state[dir_key] == 1:
-            app_state.display_state[dir_key] = -1
-            app_state.display_state[pause_key] = now + pause_time
-            print(f"📜 Line {state_line} reached end (pos={pos}), reversing direction")
-        elif app_state.display_state[pos_key] <= 0 and app_state.display_state[dir_key] == -1:
-            app_state.display_state[dir_key] = 1
-            app_state.display_state[pause_key] = now + pause_time  
-            print(f"📜 Line {state_line} reached start (pos={pos}), reversing direction")
-        else:
-            # Only move position if not pausing
-            app_state.display_state[pos_key] += app_state.display_state[dir_key]
\ No newline at end of file
+        # Minor changes (like clock seconds) flow into the running effect
+        animator.set_content((line1, line2))
+        if animator.effect is None:
+            animator.play(ScrollEffect(), now)
+
+    # Glyphs stay held while the content or what is still on screen (a slide's old text) uses them
+    _retain_glyphs(lcd, (line1, line2) + tuple(animator.visible_lines()))
+
+    state['content_line1'] = line1
+    state['content_line2'] = line2
+    _shown_content.update({'version': version, 'line1': line1, 'line2': line2})
+
+    written = animator.render(lcd, now)
+    state['transition_active'] = animator.is_playing('slide')
+    return content_changed, written
@@ -3,61 +3,126 @@ Display Manager Module
 Handles display content generation and mode management
 """
 
+import time
+from datetime import datetime, timedelta
 import app_state
+from clock import get_clock
 from japanese_processor import get_japanese_processor
+from progress_bar import progress_shown
+from render_stats import get_render_stats
 
 # Cache for Japanese processing to avoid repeated romanization
 _japanese_cache = {}
 
-def get_display_content():
-    """Get content based on current display mode"""
-    mode = app_state.get_current_mode()
-    
-    if mode == 'welcome':
+class ContentProvider:
+    """Display lines for one mode, with a version bumped only when its inputs change.
+
+    inputs() is a cheap snapshot of what the lines depend on (the track
+    object, a time bucket, counters). The render loop compares versions
+    instead of regenerating and string-comparing the lines every tick.
+    State is replaced, never mutated in place, so an equal snapshot means
+    equal lines.
+    """
+
+    def __init__(self):
+        self._version = 0
+        self._inputs = None
+        self._lines = None
+        self._lines_version = None
+
+    def inputs(self):
+        return None
+
+    def render(self):
+        raise NotImplementedError
+
+    def version(self):
+        inputs = self.inputs()
+        if inputs != self._inputs:
+            self._inputs = inputs
+            self._version += 1
+        return self._version
+
+    def lines(self):
+        """Current lines, regenerated only when the version moved"""
+        version = self.version()
+        if version != self._lines_version:
+            self._lines = self.render()
+            self._lines_version = version
+        return self._lines
+
+class WelcomeContent(ContentProvider):
+    def render(self):
         return "Welcome :)", "Starting up..."
-    
-    elif mode == 'now_playing':
-        if app_state.current_track:
-            title = app_state.current_track['title']
-            artist = app_state.current_track['artist']
-            
-            # Process Japanese text if processor is available
-            if app_state.is_japanese_romanization_enabled():
-                # Create cache key from original title and artist
-                cache_key = f"{title}|{artist}"
-                
-                # Check if we already processed this content
-                if cache_key in _japanese_cache:
-                    return _japanese_cache[cache_key]
-                
-                # Process Japanese text
-                japanese_proc = get_japanese_processor()
-                track_info = {'title': title, 'artist': artist}
-                processed = japanese_proc.process_track_info(track_info, romanize_enabled=True)
-                
-                # Log romanization only if it occurred and wasn't cached
-                if title != processed['title'] or artist != processed['artist']:
-                    print(f"🈳 Display romanized: '{title}' -> '{processed['title']}'")
-                    print(f"🈳 Display romanized: '{artist}' -> '{processed['artist']}'")
-                
-                # Cache the result
-                result = (processed['title'], processed['artist'])
-                _japanese_cache[cache_key] = result
-                
-                return result
-            
-            return title, artist
-        return "No track", "Connect Spotify"
-    
-    elif mode == 'clock':
-        from datetime import datetime
-        now = datetime.now()
-        return now.strftime("%H:%M:%S"), now.strftime("%a %b %d")
-    
-    elif mode == 'debug':
-        from spotify_manager import get_spotify_manager
-        spotify = get_spotify_manager()
-        api_calls = spotify.get_api_call_count()
+
+class NowPlayingContent(ContentProvider):
+    def inputs(self):
+        return (app_state.current_track, app_state.is_japanese_romanization_enabled(),
+                app_state.display_settings['progress_bar'])
+
+    def render(self):
+        if not app_state.current_track:
+            return "No track", "Connect Spotify"
+        title, artist = self._title_artist()
+        if progress_shown(app_state.current_track):
+            # Line 2 belongs to the progress bar (drawn by the display effect)
+            return f"{title} - {artist}", ""
+        return title, artist
+
+    def _title_artist(self):
+        title = app_state.current_track['title']
+        artist = app_state.current_track['artist']
+
+        # Process Japanese text if processor is available
+        if app_state.is_japanese_romanization_enabled():
+            # Create cache key from original title and artist
+            cache_key = f"{title}|{artist}"
+
+            # Check if we already processed this content
+            if cache_key in _japanese_cache:
+                return _japanese_cache[cache_key]
+
+            # Process Japanese text
+            japanese_proc = get_japanese_processor()
+            track_info = {'title': title, 'artist': artist}
+            processed = japanese_proc.process_track_info(track_info, romanize_enabled=True)
+
+            # Log romanization only if it occurred and wasn't cached
+            if title != processed['title'] or artist != processed['artist']:
+                print(f"🈳 Display romanized: '{title}' -> '{processed['title']}'")
+                print(f"🈳 Display romanized: '{artist}' -> '{processed['artist']}'")
+
+            # Cache the result
+            result = (processed['title'], processed['artist'])
+            _japanese_cache[cache_key] = result
+            return result
+
+        return title, artist
+
+class ClockPageContent(ContentProvider):
+    def inputs(self):
+        # Wall clock is only used here, for showing the time
+        return int(get_clock().wall())
+
+    def render(self):
+        return clock_content.lines(self._inputs)
+
+class DebugContent(ContentProvider):
+    def __init__(self):
+        super().__init__()
+        self._spotify = None
+
+    def inputs(self):
+        if self._spotify is None:
+            from spotify_manager import get_spotify_manager
+            self._spotify = get_spotify_manager()
+        music = app_state.music_state
+        # Render stats, the sleep countdown and API budget headroom refresh once a second
+        return (int(get_clock().monotonic()), self._spotify.get_api_call_count(),
+                music['is_playing'], music['stopped_duration'], self._spotify.get_api_headroom())
+
+    def render(self):
+        api_calls, headroom = self._inputs[1], self._inputs[4]
         if app_state.music_state['is_playing']:
             status = "Playing"
         elif app_state.music_state['stopped_duration'] > 0:
@@ -65,9 +130,74 @@ def get_display_content():
             status = f"Sleep in {remaining:.0f}s" if remaining > 0 else "Sleeping"
         else:
             status = "Ready"
-        return f"API: {api_calls} | {status}", f"Mode: {mode}"
-    
-    return "Unknown", "Mode"
+        return f"API: {api_calls} ({headroom}) | {status}", get_render_stats().debug_line()
+
+def get_content_provider(mode=None):
+    """Provider for a display mode (the current one by default), or None"""
+    return content_providers.get(mode or app_state.get_current_mode())
+
+def get_content_version():
+    """Hashable version of the current display content: (mode index, version)"""
+    provider = get_content_provider()
+    return app_state.current_display_mode, provider.version() if provider else 0
+
+def get_display_content():
+    """Get content based on current display mode"""
+    provider = get_content_provider()
+    if provider is None:
+        return "Unknown", "Mode"
+    return provider.lines()
+
+class ClockContent:
+    """Clock page strings, formatted at most once per second.
+
+    Ticks within the same second get the cached lines back. The date only
+    changes at local midnight, so it is formatted once a day.
+    """
+
+    def __init__(self):
+        self._second = None
+        self._lines = None
+        self._date = None
+        # Wall times of the local midnights around the cached date
+        self._date_start = None
+        self._date_until = None
+
+    def lines(self, wall):
+        second = int(wall)
+        if second != self._second:
+            self._second = second
+            local = time.localtime(second)
+            if self._date_until is None or not self._date_start <= second < self._date_until:
+                self._date = time.strftime("%a %b %d", local)
+                midnight = datetime(local.tm_year, local.tm_mon, local.tm_mday)
+                self._date_start = midnight.timestamp()
+                self._date_until = (midnight + timedelta(days=1)).timestamp()
+            self._lines = (f"{local.tm_hour:02d}:{local.tm_min:02d}:{local.tm_sec:02d}", self._date)
+        return self._lines
+
+clock_content = ClockContent()
+
+content_providers = {
+    'welcome': WelcomeContent(),
+    'now_playing': NowPlayingContent(),
+    'clock': ClockPageContent(),
+    'debug': DebugContent(),
+}
+
+def time_to_next_content_change():
+    """Seconds until get_display_content() can return something new on its own.
+
+    Returns None for modes that only change on external events (track
+    changes, button presses), which wake the render loop themselves.
+    """
+    mode = app_state.get_current_mode()
+    if mode == 'clock':
+        # Wall clock: the seconds digit rolls over on the whole second
+        return 1.0 - (get_clock().wall() % 1.0)
+    if mode == 'debug':
+        return 1.0
+    return None
 
 def has_significant_content_change(line1, line2):
     """Check if content change is significant enough to trigger wave effect"""
@@ -79,10 +209,13 @@ def has_significant_content_change(line1, line2):
                 line2 != app_state.display_state['content_line2'])
     
     elif mode in ['clock', 'debug']:
-        # Only restart wave effect on major changes, not every second
+        # Only restart wave effect on major changes, not every second:
+        # values after the first ':' (time, counters) update silently
         old_line1_base = app_state.display_state['content_line1'].split(':')[0] if ':' in app_state.display_state['content_line1'] else app_state.display_state['content_line1']
         new_line1_base = line1.split(':')[0] if ':' in line1 else line1
-        return (old_line1_base != new_line1_base or line2 != app_state.display_state['content_line2'])
+        old_line2_base = app_state.display_state['content_line2'].split(':')[0] if ':' in app_state.display_state['content_line2'] else app_state.display_state['content_line2']
+        new_line2_base = line2.split(':')[0] if ':' in line2 else line2
+        return (old_line1_base != new_line1_base or old_line2_base != new_line2_base)
     else:
         # For now_playing, any change is significant
         return (line1 != app_state.display_state['content_line1'] or line2 != app_state.display_state['content_line2'])
\ No newline at end of file
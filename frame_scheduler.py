@@ -0,0 +1,85 @@
+"""
+Frame Scheduler Module
+Sleeps the main loop until the next display deadline or an input event
+"""
+
+import threading
+import time
+from clock import get_clock
+
+# Upper bound on a single sleep, so a missed wake-up never stalls the display
+MAX_SLEEP = 1.0
+
+class FrameScheduler:
+    """Deadline-driven replacement for a fixed-interval main loop sleep.
+
+    Callers collect the monotonic deadlines of whatever is active (slide
+    and wave frames, the next scroll step, clock ticks, button holds) and
+    the loop sleeps until the earliest one. Button edges and background
+    updates call wake() to cut the sleep short.
+
+    wake() also bumps a counter, so a wake that lands while the loop is
+    rendering (or just as a sleep times out) still cuts the next sleep
+    short instead of being cleared away unseen.
+    """
+
+    def __init__(self, max_sleep=MAX_SLEEP, clock=None):
+        self.max_sleep = max_sleep
+        self.clock = clock or get_clock()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._wakes = 0
+        self._seen = 0
+        self._started = self.clock.monotonic()
+        self._cpu_started = time.process_time()
+        self.stats = {'wakeups': 0, 'event_wakeups': 0, 'slept': 0.0}
+
+    def wake(self):
+        """Wake the loop now (safe to call from any thread or GPIO callback)"""
+        with self._lock:
+            self._wakes += 1
+        self._wake.set()
+
+    def sleep_until(self, *deadlines):
+        """Sleep until the earliest monotonic deadline (None entries are ignored)"""
+        now = self.clock.monotonic()
+        # Clear before waiting: a wake() from here on sets it again, and one
+        # since the last sleep returned shows in the counter
+        self._wake.clear()
+        pending = [d for d in deadlines if d is not None]
+        timeout = min(pending) - now if pending else self.max_sleep
+        timeout = max(0.0, min(timeout, self.max_sleep))
+        if timeout > 0 and self._wakes == self._seen:
+            self.clock.wait(self._wake, timeout)
+        wakes = self._wakes
+        woken = wakes != self._seen
+        self._seen = wakes
+        self.stats['wakeups'] += 1
+        self.stats['slept'] += self.clock.monotonic() - now
+        if woken:
+            self.stats['event_wakeups'] += 1
+        return woken
+
+    def report(self):
+        """Wakeups per second and CPU% of this process since the scheduler started"""
+        elapsed = max(self.clock.monotonic() - self._started, 1e-9)
+        cpu = time.process_time() - self._cpu_started
+        return {
+            'wakeups_per_sec': self.stats['wakeups'] / elapsed,
+            'event_wakeups': self.stats['event_wakeups'],
+            'cpu_percent': 100.0 * cpu / elapsed,
+        }
+
+# Global scheduler instance
+frame_scheduler = None
+
+def get_frame_scheduler():
+    """Get or create the global frame scheduler"""
+    global frame_scheduler
+    if frame_scheduler is None:
+        frame_scheduler = FrameScheduler()
+    return frame_scheduler
+
+def wake_render_loop():
+    """Ask the main loop to redraw now, e.g. after a track change"""
+    get_frame_scheduler().wake()
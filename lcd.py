@@ -1,30 +1,347 @@
-from RPLCD.i2c import CharLCD
+from collections import OrderedDict
+import os
 import time
+from lcd_charmap import LCDEncoder
+from render_stats import get_render_stats
+
+# Bus cost model for the frame statistics: one HD44780 byte per character
+# written plus one for every set-cursor command.
+CURSOR_COMMAND_BYTES = 1
+
+# Each line of a 1- or 2-line HD44780 has 40 DDRAM cells, of which only the
+# first `cols` are visible until the display is shifted
+DDRAM_COLS = 40
+
+# Cursor/display shift instructions: move the visible window by one cell
+SHIFT_DISPLAY_LEFT = 0x18
+SHIFT_DISPLAY_RIGHT = 0x1C
+RETURN_HOME = 0x02
+
+# The HD44780 has 64 bytes of CGRAM: eight 5x8 user-defined characters
+CGRAM_SLOTS = 8
+CGRAM_UPLOAD_BYTES = 1 + 8  # set-CGRAM-address command plus 8 pattern rows
+
+# Shared glyph library for the main app (5x8 patterns)
+GLYPHS = {
+    'heart': (0b00000, 0b01010, 0b11111, 0b11111, 0b11111, 0b01110, 0b00100, 0b00000),
+    'play': (0b01000, 0b01100, 0b01110, 0b01111, 0b01110, 0b01100, 0b01000, 0b00000),
+    'pause': (0b00000, 0b11011, 0b11011, 0b11011, 0b11011, 0b11011, 0b00000, 0b00000),
+    'note': (0b00010, 0b00011, 0b00010, 0b00010, 0b01110, 0b11110, 0b01100, 0b00000),
+    'speaker': (0b00100, 0b01100, 0b11100, 0b11111, 0b11111, 0b11100, 0b01100, 0b00100),
+}
+
+class CGRAMManager:
+    """Allocates the 8 CGRAM slots to named glyphs.
+
+    Glyphs are reference counted while in use and stay resident after the
+    last release, so re-acquiring them later costs no upload. When all
+    slots are taken, the least recently used unreferenced glyph is evicted.
+    Uploads are queued and sent by the display owner at its next commit.
+    """
+
+    def __init__(self, slots=CGRAM_SLOTS):
+        self.slot_count = slots
+        self._bitmaps = [None] * slots
+        self._refcounts = {}
+        # name -> slot, least recently used first
+        self._resident = OrderedDict()
+        self._pending = {}
+        self.stats = {'uploads': 0, 'uploads_avoided': 0, 'evictions': 0}
+
+    def acquire(self, name, bitmap=None):
+        """Make a glyph resident and return its character code.
+
+        Returns None if every slot is held by a glyph still in use.
+        """
+        bitmap = tuple(bitmap if bitmap is not None else GLYPHS[name])
+        slot = self._resident.get(name)
+        if slot is not None:
+            self._resident.move_to_end(name)
+            if self._bitmaps[slot] == bitmap:
+                self.stats['uploads_avoided'] += 1
+            else:
+                self._upload(slot, bitmap)
+        else:
+            slot = self._free_slot()
+            if slot is None:
+                return None
+            self._resident[name] = slot
+            self._upload(slot, bitmap)
+        self._refcounts[name] = self._refcounts.get(name, 0) + 1
+        return slot
+
+    def acquire_all(self, glyphs):
+        """Acquire several glyphs at once: {name: bitmap} -> {name: code}.
+
+        Either every glyph is made resident or none is (returns None), so a
+        caller never ends up drawing with half a glyph set.
+        """
+        codes = {}
+        for name, bitmap in glyphs.items():
+            code = self.acquire(name, bitmap)
+            if code is None:
+                for acquired in codes:
+                    self.release(acquired)
+                return None
+            codes[name] = code
+        return codes
+
+    def release(self, name):
+        """Drop one reference; the glyph stays cached until evicted"""
+        if self._refcounts.get(name, 0) > 0:
+            self._refcounts[name] -= 1
+
+    def code(self, name):
+        """Character code of a resident glyph, or None"""
+        return self._resident.get(name)
+
+    def free_slots(self):
+        """Number of slots that could be given to a new glyph"""
+        in_use = sum(1 for name in self._resident if self._refcounts.get(name, 0) > 0)
+        return self.slot_count - in_use
+
+    def take_uploads(self):
+        """Return and forget the queued {slot: bitmap} uploads"""
+        pending, self._pending = self._pending, {}
+        return pending
+
+    def reupload_all(self):
+        """Queue every resident glyph again (CGRAM contents are unknown after a bus error)"""
+        for slot, bitmap in enumerate(self._bitmaps):
+            if bitmap is not None:
+                self._pending[slot] = bitmap
+
+    def _upload(self, slot, bitmap):
+        self._bitmaps[slot] = bitmap
+        self._pending[slot] = bitmap
+        self.stats['uploads'] += 1
+
+    def _free_slot(self):
+        used = set(self._resident.values())
+        for slot in range(self.slot_count):
+            if slot not in used:
+                return slot
+        # Evict the least recently used glyph nobody is displaying
+        for name, slot in self._resident.items():
+            if self._refcounts.get(name, 0) == 0:
+                del self._resident[name]
+                self._refcounts.pop(name, None)
+                self.stats['evictions'] += 1
+                return slot
+        return None
 
 class LCD:
-    def __init__(self, address=0x27, cols=16, rows=2):
-        self.lcd = CharLCD('PCF8574', address, cols=cols, rows=rows)
+    def __init__(self, address=0x27, cols=16, rows=2, transport=None, wait_strategy=None, rom=None, backend=None):
+        self.cols = cols
+        self.rows = rows
+        # Off-screen DDRAM is only addressable linearly on 1- and 2-line modules
+        self.ddram_cols = DDRAM_COLS if rows <= 2 else cols
+        # 'rplcd' (default), 'packed' for one I2C transaction per write, or
+        # 'emulator' for a headless HD44780 that records the bus traffic
+        transport = transport or os.getenv('LCD_TRANSPORT', 'rplcd').strip().lower()
+        # 'timed' (default) or 'busy_flag'; readback needs the packed transport
+        wait_strategy = wait_strategy or os.getenv('LCD_WAIT', 'timed').strip().lower()
+        if backend is not None:
+            # Any object with RPLCD's CharLCD interface (cursor_pos, write,
+            # command, clear, create_char)
+            self.lcd = backend
+            transport = 'custom'
+        elif transport in ('packed', 'emulator'):
+            from lcd_transport import PackedPCF8574
+            bus = None
+            if transport == 'emulator':
+                from lcd_emulator import EmulatedBus
+                bus = EmulatedBus(address)
+            self.lcd = PackedPCF8574(address, cols=cols, rows=rows, bus=bus, wait_strategy=wait_strategy)
+        else:
+            from RPLCD.i2c import CharLCD
+            if wait_strategy != 'timed':
+                print("⚠️ LCD busy-flag polling requires LCD_TRANSPORT=packed - using RPLCD timed waits")
+            # RPLCD is told about the full DDRAM line so it can address the
+            # off-screen cells used for hardware scrolling
+            self.lcd = CharLCD('PCF8574', address, cols=self.ddram_cols, rows=rows)
+        self.transport = transport
+        # Shadow framebuffer: what the controller's DDRAM currently holds,
+        # and the frame staged by write_line() for the next commit()
+        self._shadow = self._blank_frame()
+        self._staged = self._blank_frame()
+        # Hardware display shift: the applied offset and the one staged by
+        # set_display_offset() for the next commit()
+        self._display_offset = 0
+        self._staged_offset = 0
+        self.cgram = CGRAMManager()
+        # Character ROM of the module: 'A00' (Japanese, most common) or 'A02'
+        self.encoder = LCDEncoder(rom or os.getenv('LCD_ROM', 'A00').strip(), cgram=self.cgram)
+        self.stats = {
+            'frames': 0,
+            'bytes_sent': 0,
+            'glyph_bytes_sent': 0,  # CGRAM uploads, included in bytes_sent
+            'bytes_saved': 0,
+            'last_frame_sent': 0,
+            'last_frame_saved': 0,
+        }
         self.lcd.clear()
 
+    def _blank_frame(self):
+        return [[' '] * self.ddram_cols for _ in range(self.rows)]
+
     def clear(self):
+        # The clear instruction also undoes any display shift
         self.lcd.clear()
+        self._shadow = self._blank_frame()
+        self._staged = self._blank_frame()
+        self._display_offset = 0
+        self._staged_offset = 0
+
+    def invalidate(self):
+        """Forget the shadow contents so the next commit rewrites every cell and glyph"""
+        self._shadow = [[None] * self.ddram_cols for _ in range(self.rows)]
+        self._display_offset = None
+        self.cgram.reupload_all()
+
+    def write_line(self, text, line=0):
+        """Stage a full line for the next commit().
+
+        Regular lines are drawn in the unshifted window, so this also stages
+        a return from any hardware scroll offset.
+        """
+        self._staged[line][:self.cols] = list(text[:self.cols].ljust(self.cols))
+        self._staged_offset = 0
+
+    def load_marquee(self, lines):
+        """Stage full-length lines into DDRAM for hardware scrolling.
+
+        Up to ddram_cols characters per line are stored, including the cells
+        beyond the visible window; set_display_offset() then brings them into
+        view with single-byte shift instructions. Reloading unchanged text
+        costs nothing thanks to the shadow diff.
+        """
+        for row, text in enumerate(lines[:self.rows]):
+            self._staged[row] = list(text[:self.ddram_cols].ljust(self.ddram_cols))
+
+    def set_display_offset(self, offset):
+        """Stage the hardware display shift applied at the next commit()"""
+        self._staged_offset = max(0, min(offset, self.ddram_cols - self.cols))
+
+    def can_hardware_scroll(self, text):
+        """Whether text fits the DDRAM window used for hardware scrolling"""
+        return self.cols < len(text) <= self.ddram_cols
+
+    def _dirty_runs(self, row):
+        """Yield (start, end) spans of cells that differ from the shadow.
+
+        Runs separated by a gap no longer than a set-cursor command are merged,
+        since rewriting the unchanged cells costs no more than re-addressing.
+        """
+        staged = self._staged[row]
+        shadow = self._shadow[row]
+        start = end = None
+        for col in range(self.ddram_cols):
+            if staged[col] == shadow[col]:
+                continue
+            if start is None:
+                start = col
+            elif col - end - 1 > CURSOR_COMMAND_BYTES:
+                yield start, end + 1
+                start = col
+            end = col
+        if start is not None:
+            yield start, end + 1
+
+    def _apply_display_offset(self):
+        """Shift the visible window to the staged offset, one byte per cell"""
+        sent = 0
+        if self._display_offset is None:
+            # Unknown shift after a bus error: return home resets it
+            self.lcd.command(RETURN_HOME)
+            self._display_offset = 0
+            sent += 1
+        delta = self._staged_offset - self._display_offset
+        shift = SHIFT_DISPLAY_LEFT if delta > 0 else SHIFT_DISPLAY_RIGHT
+        for _ in range(abs(delta)):
+            self.lcd.command(shift)
+        self._display_offset = self._staged_offset
+        return sent + abs(delta)
+
+    def encode(self, text):
+        """Translate Unicode text to this module's ROM codes (cached per string)"""
+        return self.encoder.encode(text)
+
+    def retain_glyphs(self, lines):
+        """Release symbol glyphs (♪, ♥, ▶) that none of these encoded lines use"""
+        self.encoder.retain(lines)
+
+    def _write_codes(self, text):
+        """Write a run of ROM codes at the cursor, bypassing RPLCD's charmap"""
+        if hasattr(self.lcd, 'write_codes'):
+            # Packed transport: the whole run in one I2C transaction
+            self.lcd.write_codes([ord(ch) if ord(ch) < 256 else 0x3F for ch in text])
+            return
+        for ch in text:
+            code = ord(ch)
+            self.lcd.write(code if code < 256 else 0x3F)
+
+    def upload_glyphs(self, uploads):
+        """Write queued {slot: bitmap} CGRAM uploads; returns bytes sent"""
+        for slot, bitmap in uploads.items():
+            self.lcd.create_char(slot, bitmap)
+        return len(uploads) * CGRAM_UPLOAD_BYTES
+
+    def commit(self):
+        """Send only the changed cells of the staged frame to the display.
+
+        Each dirty run is written with one cursor command followed by the
+        characters, relying on the controller's auto-increment. Returns the
+        number of bytes sent for this frame.
+        """
+        started = time.perf_counter()
+        # Glyphs go first so new codes never show a stale pattern
+        try:
+            uploaded = self.upload_glyphs(self.cgram.take_uploads())
+        except Exception:
+            # Some may not have arrived: send them all again next time
+            self.cgram.reupload_all()
+            raise
+        sent = uploaded
+        for row in range(self.rows):
+            for start, end in list(self._dirty_runs(row)):
+                self.lcd.cursor_pos = (row, start)
+                self._write_codes(''.join(self._staged[row][start:end]))
+                self._shadow[row][start:end] = self._staged[row][start:end]
+                sent += CURSOR_COMMAND_BYTES + (end - start)
+        sent += self._apply_display_offset()
+
+        # Saved against rewriting every visible cell. Glyph uploads have no
+        # full-frame equivalent, and a marquee load writes cells beyond the
+        # window, so such a frame saves nothing rather than a negative amount
+        full_frame = self.rows * (CURSOR_COMMAND_BYTES + self.cols)
+        saved = max(0, full_frame - (sent - uploaded))
+        self.stats['frames'] += 1
+        self.stats['bytes_sent'] += sent
+        self.stats['glyph_bytes_sent'] += uploaded
+        self.stats['bytes_saved'] += saved
+        self.stats['last_frame_sent'] = sent
+        self.stats['last_frame_saved'] = saved
+        if sent:
+            get_render_stats().record_bus_write(time.perf_counter() - started)
+        return sent
 
     def write_line_wave(self, text, line=0, speed=0.1, interrupt_callback=None):
         """Typewriter effect for first appearance."""
-        self.lcd.cursor_pos = (line, 0)
-        self.lcd.write_string(' ' * 16)
-        self.lcd.cursor_pos = (line, 0)
+        self.write_line('', line)
+        self.commit()
         for i in range(1, min(len(text), 16) + 1):
             # Check for interrupt before each character
             if interrupt_callback and interrupt_callback():
                 return  # Stop wave animation if interrupted
             
-            self.lcd.cursor_pos = (line, 0)
-            self.lcd.write_string(text[:i].ljust(16))
+            # Only the newly revealed character differs from the shadow
+            self.write_line(text[:i], line)
+            self.commit()
             if speed > 0:
                 time.sleep(speed)
-        self.lcd.cursor_pos = (line, 0)
-        self.lcd.write_string(text[:16].ljust(16))
+        self.write_line(text[:16], line)
+        self.commit()
 
     def scroll_both(self, line1, line2, width=16, scroll_speed=0.25, pause=5, button_pin=None, interrupt_callback=None):
         import RPi.GPIO as GPIO
@@ -69,8 +386,7 @@ class LCD:
                     pass  # still paused
                 else:
                     seg = l1['text'][l1['idx']:l1['idx']+width]
-                    self.lcd.cursor_pos = (0, 0)
-                    self.lcd.write_string(seg.ljust(width))
+                    self.write_line(seg, 0)
                     # Next frame: move index
                     if l1['dir'] == 1 and l1['idx'] >= len(l1['text']) - width:
                         l1['dir'] = -1
@@ -82,8 +398,7 @@ class LCD:
                         l1['idx'] += l1['dir']
                     last_update1 = now
             elif not l1['over']:
-                self.lcd.cursor_pos = (0, 0)
-                self.lcd.write_string(l1['text'].ljust(width))
+                self.write_line(l1['text'], 0)
 
             # --- LINE 2 ---
             if l2['over'] and (now - last_update2) >= scroll_speed:
@@ -91,8 +406,7 @@ class LCD:
                     pass
                 else:
                     seg = l2['text'][l2['idx']:l2['idx']+width]
-                    self.lcd.cursor_pos = (1, 0)
-                    self.lcd.write_string(seg.ljust(width))
+                    self.write_line(seg, 1)
                     if l2['dir'] == 1 and l2['idx'] >= len(l2['text']) - width:
                         l2['dir'] = -1
                         l2['pause_until'] = now + pause
@@ -103,8 +417,10 @@ class LCD:
                         l2['idx'] += l2['dir']
                     last_update2 = now
             elif not l2['over']:
-                self.lcd.cursor_pos = (1, 0)
-                self.lcd.write_string(l2['text'].ljust(width))
+                self.write_line(l2['text'], 1)
+
+            # Static lines no longer cost any bus traffic once committed
+            self.commit()
 
             time.sleep(0.05)  # Small sleep to prevent excessive CPU usage
 
@@ -0,0 +1,202 @@
+"""
+LCD Character Map Module
+Encodes Unicode text to HD44780 character ROM codes with precomputed translation tables
+"""
+
+import unicodedata
+
+# Strings handed back by encode() are made of ROM codes: chr(code) for each
+# character cell, ready to be written to the controller byte for byte.
+
+# Full-width katakana in A00 ROM order (0xA6-0xDD)
+_KATAKANA_A00 = (
+    'ヲァィゥェォャュョッー'
+    'アイウエオカキクケコサシスセソタチツテトナニヌネノ'
+    'ハヒフヘホマミムメモヤユヨラリルレロワン'
+)
+_DAKUTEN = 0xDE
+_HANDAKUTEN = 0xDF
+
+# Voiced kana are the base kana followed by a (han)dakuten cell
+_VOICED = {
+    'ガ': 'カ', 'ギ': 'キ', 'グ': 'ク', 'ゲ': 'ケ', 'ゴ': 'コ',
+    'ザ': 'サ', 'ジ': 'シ', 'ズ': 'ス', 'ゼ': 'セ', 'ゾ': 'ソ',
+    'ダ': 'タ', 'ヂ': 'チ', 'ヅ': 'ツ', 'デ': 'テ', 'ド': 'ト',
+    'バ': 'ハ', 'ビ': 'ヒ', 'ブ': 'フ', 'ベ': 'ヘ', 'ボ': 'ホ',
+    'ヴ': 'ウ',
+}
+_SEMI_VOICED = {'パ': 'ハ', 'ピ': 'ヒ', 'プ': 'フ', 'ペ': 'ヘ', 'ポ': 'ホ'}
+
+# A00 (Japanese) ROM symbols outside ASCII
+_A00_SYMBOLS = {
+    '¥': 0x5C, '→': 0x7E, '←': 0x7F,
+    '。': 0xA1, '「': 0xA2, '」': 0xA3, '、': 0xA4, '・': 0xA5, '·': 0xA5, '•': 0xA5,
+    '°': 0xDF, 'α': 0xE0, 'ä': 0xE1, 'β': 0xE2, 'ß': 0xE2, 'ε': 0xE3, 'μ': 0xE4,
+    'σ': 0xE5, 'ρ': 0xE6, '√': 0xE8, '¢': 0xEC, 'ñ': 0xEE, 'ö': 0xEF, 'θ': 0xF2,
+    '∞': 0xF3, 'Ω': 0xF4, 'ü': 0xF5, 'Σ': 0xF6, 'π': 0xF7, '÷': 0xFD, '█': 0xFF,
+}
+
+# Punctuation that has no ROM cell but a clear ASCII spelling
+_PUNCTUATION = {
+    '‘': "'", '’': "'", '‚': "'", '′': "'", '“': '"', '”': '"', '„': '"', '″': '"',
+    '–': '-', '—': '-', '―': '-', '‐': '-', '−': '-', '…': '...',
+    ' ': ' ', '　': ' ', '×': 'x', '«': '<<', '»': '>>',
+    'æ': 'ae', 'Æ': 'AE', 'œ': 'oe', 'Œ': 'OE', 'ø': 'o', 'Ø': 'O', 'ł': 'l', 'Ł': 'L',
+}
+
+# Symbols drawn with custom characters when a CGRAM slot is available,
+# else with the ASCII fallback
+CGRAM_SYMBOLS = {
+    '♪': ('note', '#'),
+    '♫': ('note', '#'),
+    '♩': ('note', '#'),
+    '♥': ('heart', '*'),
+    '❤': ('heart', '*'),
+    '▶': ('play', '>'),
+}
+
+UNKNOWN = '?'
+
+def _ascii_table(skip=()):
+    table = {code: code for code in range(0x20, 0x7F) if code not in skip}
+    # CGRAM codes pass straight through
+    table.update({code: code for code in range(8)})
+    return table
+
+def _build_a00():
+    # 0x5C is ¥ and 0x7E/0x7F are arrows on the A00 ROM
+    table = _ascii_table(skip=(0x5C, 0x7E))
+    table[ord('\\')] = '/'
+    table[ord('~')] = '-'
+    for char, code in _A00_SYMBOLS.items():
+        table[ord(char)] = code
+    for offset, kana in enumerate(_KATAKANA_A00):
+        table[ord(kana)] = 0xA6 + offset
+    # Half-width katakana block is laid out exactly like A00 0xA1-0xDF
+    for code in range(0xA1, 0xE0):
+        table[0xFF61 + code - 0xA1] = code
+    for voiced, base in _VOICED.items():
+        table[ord(voiced)] = chr(table[ord(base)]) + chr(_DAKUTEN)
+    for voiced, base in _SEMI_VOICED.items():
+        table[ord(voiced)] = chr(table[ord(base)]) + chr(_HANDAKUTEN)
+    # Hiragana share the katakana cells (hiragana = katakana - 0x60)
+    for katakana in list(table):
+        if 0x30A1 <= katakana <= 0x30F6:
+            table.setdefault(katakana - 0x60, table[katakana])
+    return table
+
+def _build_a02():
+    # A02 (European) ROM: full ASCII plus Latin-1 letters and symbols at 0xA0-0xFF
+    table = _ascii_table()
+    table.update({code: code for code in range(0xA1, 0x100)})
+    return table
+
+ROM_TABLES = {
+    'A00': _build_a00(),
+    'A02': _build_a02(),
+}
+
+class _TranslationTable(dict):
+    """str.translate table that fills in unmapped characters on first use.
+
+    Every codepoint seen is resolved once (ROM code or ASCII fallback) and
+    stored, so later lookups are plain dict hits. CGRAM symbols are looked
+    up on every encode instead: their cell depends on which glyphs are
+    resident at the time.
+    """
+
+    def __init__(self, base, encoder):
+        super().__init__(base)
+        self._encoder = encoder
+
+    def __missing__(self, codepoint):
+        char = chr(codepoint)
+        if char in CGRAM_SYMBOLS:
+            return self._encoder._symbol(char)
+        value = self._encoder._resolve(char)
+        self[codepoint] = value
+        return value
+
+class LCDEncoder:
+    """Converts Unicode text into HD44780 ROM codes.
+
+    Encoded strings are cached, so a title is translated once when it first
+    appears rather than on every scroll tick.
+
+    Symbols with a CGRAM glyph (♪, ♥, ▶) hold their glyph only while text
+    using it is on show: the display owner calls retain() with the current
+    lines and the rest are released. A string that fell back to ASCII
+    because CGRAM was full is not kept, so the glyph appears once a slot
+    frees up.
+    """
+
+    CACHE_SIZE = 256
+
+    def __init__(self, rom='A00', cgram=None):
+        rom = rom.upper()
+        if rom not in ROM_TABLES:
+            raise ValueError(f"Unknown LCD character ROM: {rom}")
+        self.rom = rom
+        self.cgram = cgram
+        self._table = _TranslationTable(ROM_TABLES[rom], self)
+        self._cache = {}  # text -> (encoded, glyph names it uses)
+        self._held = {}   # glyph name -> code, acquired by this encoder
+        self.stats = {'encoded': 0, 'cache_hits': 0}
+
+    def encode(self, text):
+        """Return text as a string of ROM codes"""
+        cached = self._cache.get(text)
+        if cached is not None:
+            encoded, glyphs = cached
+            if all(name in self._held for name in glyphs):
+                self.stats['cache_hits'] += 1
+                return encoded
+        if len(self._cache) >= self.CACHE_SIZE:
+            self._cache.clear()
+        glyphs = self._glyphs_for(text)
+        encoded = text.translate(self._table)
+        self.stats['encoded'] += 1
+        if all(name in self._held for name in glyphs):
+            self._cache[text] = (encoded, glyphs)
+        return encoded
+
+    def retain(self, lines):
+        """Release glyphs that none of the given encoded lines show any more"""
+        if not self._held:
+            return
+        codes = {ord(ch) for line in lines for ch in line if ord(ch) < 8}
+        for name, code in list(self._held.items()):
+            if code not in codes:
+                self.cgram.release(name)
+                del self._held[name]
+
+    def _glyphs_for(self, text):
+        """Acquire the CGRAM glyphs text needs; returns their names"""
+        if self.cgram is None:
+            return ()
+        glyphs = tuple(sorted({CGRAM_SYMBOLS[ch][0] for ch in text if ch in CGRAM_SYMBOLS}))
+        for name in glyphs:
+            if name not in self._held:
+                code = self.cgram.acquire(name)
+                if code is not None:
+                    self._held[name] = code
+        return glyphs
+
+    def _symbol(self, char):
+        glyph, fallback = CGRAM_SYMBOLS[char]
+        code = self._held.get(glyph)
+        return code if code is not None else fallback
+
+    def _resolve(self, char):
+        """Pick a cell for a character the ROM table does not cover"""
+        base_table = ROM_TABLES[self.rom]
+        if char in _PUNCTUATION:
+            return _PUNCTUATION[char].translate(base_table)
+        # Accented Latin: drop the diacritics if the base letter is in ROM
+        stripped = ''.join(c for c in unicodedata.normalize('NFKD', char)
+                           if not unicodedata.combining(c))
+        if stripped and stripped != char and all(ord(c) in base_table for c in stripped):
+            return stripped.translate(base_table)
+        if char in ('\n', '\r', '\t'):
+            return ' '
+        return UNKNOWN
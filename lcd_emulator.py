@@ -0,0 +1,242 @@
+"""
+LCD Emulator Module
+Headless HD44780 + PCF8574 emulator for measuring the render pipeline off-device
+"""
+
+from lcd_transport import RS, RW, EN, I2C_M_RD
+
+# HD44780 execution times (seconds)
+SLOW_EXEC_TIME = 0.00152  # clear / home
+EXEC_TIME = 0.000037
+
+# DDRAM layout in 2-line mode: 40 cells at 0x00-0x27 and 0x40-0x67
+LINE_LENGTH = 40
+LINE_BASES = (0x00, 0x40)
+
+class HD44780Emulator:
+    """Instruction-level model of the HD44780 controller.
+
+    Keeps DDRAM, CGRAM, the address counter and the display shift, and
+    tracks how long the controller stays busy after each instruction.
+    """
+
+    def __init__(self):
+        self.ddram = bytearray(b' ' * 0x80)
+        self.cgram = bytearray(64)
+        self.address = 0
+        self.in_cgram = False
+        self.increment = 1
+        self.display_shift = 0
+        self.display_on = False
+        self.four_bit = False
+        self.two_line = False
+        self.busy_until = 0.0
+
+    def _advance_address(self):
+        if self.in_cgram:
+            self.address = (self.address + self.increment) & 0x3F
+            return
+        address = self.address + self.increment
+        # The two DDRAM lines are contiguous for the address counter
+        if address == LINE_BASES[0] + LINE_LENGTH:
+            address = LINE_BASES[1]
+        elif address == LINE_BASES[1] + LINE_LENGTH:
+            address = LINE_BASES[0]
+        elif address == LINE_BASES[1] - 1:
+            address = LINE_BASES[0] + LINE_LENGTH - 1
+        elif address < 0:
+            address = LINE_BASES[1] + LINE_LENGTH - 1
+        self.address = address
+
+    def instruction(self, value, now):
+        """Execute an instruction; returns its execution time"""
+        exec_time = EXEC_TIME
+        if value & 0x80:
+            self.address = value & 0x7F
+            self.in_cgram = False
+        elif value & 0x40:
+            self.address = value & 0x3F
+            self.in_cgram = True
+        elif value & 0x20:
+            self.four_bit = not value & 0x10
+            self.two_line = bool(value & 0x08)
+        elif value & 0x10:
+            if value & 0x08:
+                # Display shift: shifting left brings later cells into view
+                step = -1 if value & 0x04 else 1
+                self.display_shift = (self.display_shift + step) % LINE_LENGTH
+            else:
+                self.increment_cursor(1 if value & 0x04 else -1)
+        elif value & 0x08:
+            self.display_on = bool(value & 0x04)
+        elif value & 0x04:
+            self.increment = 1 if value & 0x02 else -1
+        elif value & 0x02:
+            self.address = 0
+            self.in_cgram = False
+            self.display_shift = 0
+            exec_time = SLOW_EXEC_TIME
+        elif value & 0x01:
+            self.ddram[:] = b' ' * len(self.ddram)
+            self.address = 0
+            self.in_cgram = False
+            self.display_shift = 0
+            self.increment = 1
+            exec_time = SLOW_EXEC_TIME
+        self.busy_until = now + exec_time
+        return exec_time
+
+    def increment_cursor(self, step):
+        saved = self.increment
+        self.increment = step
+        self._advance_address()
+        self.increment = saved
+
+    def write_data(self, value, now):
+        if self.in_cgram:
+            self.cgram[self.address] = value & 0x1F
+        else:
+            self.ddram[self.address] = value
+        self._advance_address()
+        self.busy_until = now + EXEC_TIME
+
+    def read_status(self, now):
+        busy = 0x80 if now < self.busy_until else 0
+        return busy | (self.address & 0x7F)
+
+    def read_data(self, now):
+        value = self.cgram[self.address] if self.in_cgram else self.ddram[self.address]
+        self._advance_address()
+        return value
+
+    # --- Inspection -------------------------------------------------------
+
+    def ddram_line(self, row):
+        """All 40 DDRAM cells of a line as a string of character codes"""
+        base = LINE_BASES[row]
+        return ''.join(chr(code) for code in self.ddram[base:base + LINE_LENGTH])
+
+    def visible_lines(self, cols=16, rows=2):
+        """What the glass shows, taking the display shift into account"""
+        lines = []
+        for row in range(rows):
+            line = self.ddram_line(row)
+            lines.append(''.join(line[(self.display_shift + col) % LINE_LENGTH] for col in range(cols)))
+        return lines
+
+    def glyph(self, slot):
+        """The 8 pattern rows stored in a CGRAM slot"""
+        return tuple(self.cgram[slot * 8:slot * 8 + 8])
+
+class EmulatedBus:
+    """I2C bus with a PCF8574 backpack and an HD44780 behind it.
+
+    Drop-in for smbus2.SMBus as used by PackedPCF8574 (i2c_rdwr). Every bus
+    byte is decoded the way the real backpack wires it: enable falling edges
+    latch a nibble into the controller, reads with RW high return the busy
+    flag or data. Time is simulated from the I2C clock, so runs are
+    repeatable and independent of the host.
+    """
+
+    # Start + address byte + stop, in bit times
+    TRANSACTION_OVERHEAD_BITS = 11
+    BITS_PER_BYTE = 9
+
+    def __init__(self, address=0x27, bus_hz=100_000, record_events=True, rw_grounded=False):
+        self.address = address
+        # Backpacks with RW strapped to GND: every cycle is a write, reads
+        # only see the PCF8574's own pins
+        self.rw_grounded = rw_grounded
+        self.bit_time = 1.0 / bus_hz
+        self.controller = HD44780Emulator()
+        self.sim_time = 0.0
+        self.record_events = record_events
+        self.bus_log = bytearray()
+        self.events = []
+        self.stats = {
+            'transactions': 0,
+            'bus_bytes': 0,
+            'commands': 0,
+            'data_writes': 0,
+            'reads': 0,
+        }
+        self._pins = 0xFF
+        self._nibble = None
+        self._read_nibble = 0
+
+    def _event(self, kind, value):
+        if self.record_events:
+            self.events.append((self.sim_time, kind, value))
+
+    def _latch(self, nibble, rs):
+        """Enable falling edge while writing: feed one nibble to the controller"""
+        controller = self.controller
+        if not controller.four_bit:
+            # 8-bit mode during initialisation: D0-D3 read as zero
+            value = nibble << 4
+        elif self._nibble is None:
+            self._nibble = nibble
+            return
+        else:
+            value = (self._nibble << 4) | nibble
+            self._nibble = None
+
+        if rs:
+            controller.write_data(value, self.sim_time)
+            self.stats['data_writes'] += 1
+            self._event('data', value)
+        else:
+            controller.instruction(value, self.sim_time)
+            self.stats['commands'] += 1
+            self._event('command', value)
+
+    def _write_pins(self, value):
+        self.bus_log.append(value)
+        if self.rw_grounded:
+            value &= ~RW
+        previous = self._pins
+        self._pins = value
+        self.stats['bus_bytes'] += 1
+        self.sim_time += self.BITS_PER_BYTE * self.bit_time
+
+        if value & RW:
+            if value & EN and not previous & EN:
+                # Controller drives D4-D7: high nibble first, then low nibble
+                if self._nibble is None:
+                    status = self.controller.read_status(self.sim_time) if not value & RS \
+                        else self.controller.read_data(self.sim_time)
+                    self._read_value = status
+                    self._read_nibble = status >> 4
+                    self._nibble = 'read'
+                else:
+                    self._read_nibble = self._read_value & 0x0F
+                    self._nibble = None
+            return
+        if previous & EN and not value & EN:
+            self._latch(value >> 4, value & RS)
+
+    def _read_pins(self):
+        self.stats['reads'] += 1
+        self.sim_time += self.BITS_PER_BYTE * self.bit_time
+        if self._pins & RW and self._pins & EN:
+            value = (self._pins & 0x0F) | (self._read_nibble << 4)
+        else:
+            value = self._pins
+        self._event('read', value)
+        return value
+
+    def i2c_rdwr(self, *msgs):
+        for msg in msgs:
+            if msg.addr != self.address:
+                raise OSError(f"No device at 0x{msg.addr:02x}")
+            self.stats['transactions'] += 1
+            self.sim_time += self.TRANSACTION_OVERHEAD_BITS * self.bit_time
+            if msg.flags & I2C_M_RD:
+                for i in range(msg.len):
+                    msg.buf[i] = bytes([self._read_pins()])
+            else:
+                for value in bytes(msg):
+                    self._write_pins(value)
+
+    def close(self):
+        pass
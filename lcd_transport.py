@@ -0,0 +1,262 @@
+"""
+LCD Transport Module
+Packed PCF8574 transport that sends whole nibble/enable sequences per I2C transaction
+"""
+
+import ctypes
+import time
+
+# I2C_M_RD flag marking read messages in an i2c_rdwr call
+I2C_M_RD = 0x0001
+
+try:
+    from smbus2 import SMBus, i2c_msg
+    SMBUS2_AVAILABLE = True
+except ImportError:
+    SMBUS2_AVAILABLE = False
+
+    class i2c_msg:
+        """Minimal stand-in for smbus2.i2c_msg, used with emulated buses"""
+
+        def __init__(self, addr, flags, data):
+            self.addr = addr
+            self.flags = flags
+            self.len = len(data)
+            self.buf = ctypes.create_string_buffer(bytes(data), self.len)
+
+        @classmethod
+        def write(cls, address, buf):
+            return cls(address, 0, bytes(buf))
+
+        @classmethod
+        def read(cls, address, length):
+            return cls(address, I2C_M_RD, bytes(length))
+
+        def __bytes__(self):
+            return self.buf.raw[:self.len]
+
+        def __iter__(self):
+            return iter(bytes(self))
+
+# PCF8574 backpack pin mapping (P0..P7)
+RS = 0x01
+RW = 0x02
+EN = 0x04
+BACKLIGHT = 0x08
+
+# HD44780 instructions
+CMD_CLEAR = 0x01
+CMD_HOME = 0x02
+CMD_ENTRY_MODE = 0x04
+CMD_DISPLAY_CONTROL = 0x08
+CMD_SHIFT = 0x10
+CMD_FUNCTION_SET = 0x20
+CMD_SET_CGRAM = 0x40
+CMD_SET_DDRAM = 0x80
+
+ENTRY_LEFT = 0x02
+DISPLAY_ON = 0x04
+FUNCTION_2LINE = 0x08
+
+# DDRAM start address of each row on 16x2/20x4 modules
+ROW_OFFSETS = (0x00, 0x40, 0x14, 0x54)
+
+# Execution times from the HD44780 datasheet (seconds)
+SLOW_COMMAND_DELAY = 0.00152  # clear / home
+
+# Give up on busy-flag readback if it never clears within this time
+BUSY_FLAG_TIMEOUT = 0.01
+BUSY_FLAG = 0x80
+
+# How to wait for the controller after slow instructions
+WAIT_TIMED = 'timed'
+WAIT_BUSY_FLAG = 'busy_flag'
+
+class PackedPCF8574:
+    """HD44780 over a PCF8574 backpack, one I2C transaction per transfer.
+
+    RPLCD issues a separate SMBus byte write (plus a sleep) for every state
+    change of the backpack: data, enable high, enable low for each nibble.
+    The PCF8574 latches every byte of a multi-byte write onto its outputs,
+    so the whole sequence for a command plus a run of characters can be
+    sent as a single i2c_rdwr message. The I2C clock itself then paces the
+    enable pulses.
+
+    Implements the subset of RPLCD's CharLCD interface that LCD uses, so it
+    is a drop-in replacement: cursor_pos, write_string, write, clear, home,
+    command and create_char.
+
+    With wait_strategy='busy_flag' the HD44780 busy flag is read back through
+    the PCF8574's quasi-bidirectional pins after slow instructions, so clear
+    and home return as soon as the controller is ready. Readback is probed
+    once during initialisation, before anything is on screen: on backpacks
+    with RW tied low (where a "read" clocks data into the controller) or if
+    the read fails, the datasheet delays are used instead.
+    """
+
+    def __init__(self, address=0x27, port=1, cols=16, rows=2, bus=None, wait_strategy=WAIT_TIMED):
+        if bus is None:
+            if not SMBUS2_AVAILABLE:
+                raise RuntimeError("smbus2 is required for the packed PCF8574 transport")
+            bus = SMBus(port)
+        self.bus = bus
+        self.address = address
+        self.cols = cols
+        self.rows = rows
+        self.backlight = BACKLIGHT
+        self._cursor = (0, 0)
+        self._pending_address = None
+        self.wait_strategy = wait_strategy
+        self.stats = {'transactions': 0, 'bus_bytes': 0, 'busy_polls': 0}
+        self._init_display()
+
+    # --- Byte sequence building -------------------------------------------
+
+    def _nibble_bytes(self, nibble, mode):
+        """Enable pulse for one nibble: data latched on the falling edge"""
+        value = (nibble << 4) | mode | self.backlight
+        return (value | EN, value)
+
+    def _byte_sequence(self, value, mode):
+        return self._nibble_bytes(value >> 4, mode) + self._nibble_bytes(value & 0x0F, mode)
+
+    def _transfer(self, payload):
+        """Send a prepared byte sequence in a single I2C transaction"""
+        if not payload:
+            return
+        data = bytes(payload)
+        self.bus.i2c_rdwr(i2c_msg.write(self.address, data))
+        self.stats['transactions'] += 1
+        self.stats['bus_bytes'] += len(data)
+
+    def _command_bytes(self, value):
+        # Leading setup byte settles RS low before the first enable pulse
+        return [self.backlight] + list(self._byte_sequence(value, 0))
+
+    def _data_bytes(self, codes):
+        payload = [RS | self.backlight]
+        for code in codes:
+            payload.extend(self._byte_sequence(code, RS))
+        return payload
+
+    def _flush_address(self, payload):
+        """Prepend a deferred set-DDRAM command to the next transfer"""
+        if self._pending_address is not None:
+            payload.extend(self._command_bytes(CMD_SET_DDRAM | self._pending_address))
+            self._pending_address = None
+        return payload
+
+    def _read_busy_flag(self):
+        """Read the busy flag: high nibble on the first enable pulse of a read"""
+        # Data pins written high act as inputs on the PCF8574
+        idle = 0xF0 | RW | self.backlight
+        read = i2c_msg.read(self.address, 1)
+        self.bus.i2c_rdwr(i2c_msg.write(self.address, bytes([idle, idle | EN])),
+                          read,
+                          # Finish the cycle: low nibble pulse is required in 4-bit mode
+                          i2c_msg.write(self.address, bytes([idle, idle | EN, idle])))
+        self.stats['busy_polls'] += 1
+        return bool(list(read)[0] & BUSY_FLAG)
+
+    def _wait_ready(self, delay):
+        """Wait for the controller after an instruction taking `delay` seconds"""
+        if self.wait_strategy == WAIT_BUSY_FLAG:
+            deadline = time.perf_counter() + BUSY_FLAG_TIMEOUT
+            try:
+                while self._read_busy_flag():
+                    if time.perf_counter() > deadline:
+                        raise OSError("busy flag never cleared")
+                return
+            except OSError as e:
+                print(f"LCD busy flag unavailable ({e}) - using timed waits")
+                self.wait_strategy = WAIT_TIMED
+        time.sleep(delay)
+
+    def _init_display(self):
+        # 4-bit initialisation by instruction (HD44780 datasheet figure 24)
+        time.sleep(0.05)
+        for delay in (0.0045, 0.0045, 0.00015):
+            self._transfer([self.backlight] + list(self._nibble_bytes(0x03, 0)))
+            time.sleep(delay)
+        self._transfer([self.backlight] + list(self._nibble_bytes(0x02, 0)))
+        self.command(CMD_FUNCTION_SET | FUNCTION_2LINE)
+        self.command(CMD_DISPLAY_CONTROL | DISPLAY_ON)
+        self.command(CMD_ENTRY_MODE | ENTRY_LEFT)
+        if self.wait_strategy == WAIT_BUSY_FLAG:
+            self._probe_busy_flag()
+        self.clear()
+
+    def _probe_busy_flag(self):
+        """Check that the busy flag can be read, while a stray write is still harmless.
+
+        With RW tied low the read cycle writes instruction 0xFF (set DDRAM
+        address) instead, which the clear() that follows undoes; the pins
+        then read back as written, so the flag looks stuck busy.
+        """
+        # Long past any instruction so far: a real readback shows not busy
+        time.sleep(SLOW_COMMAND_DELAY)
+        try:
+            readable = not self._read_busy_flag()
+        except OSError:
+            readable = False
+        if not readable:
+            print("LCD busy flag not readable (RW tied low?) - using timed waits")
+            self.wait_strategy = WAIT_TIMED
+
+    # --- CharLCD-compatible interface -------------------------------------
+
+    @property
+    def cursor_pos(self):
+        return self._cursor
+
+    @cursor_pos.setter
+    def cursor_pos(self, pos):
+        row, col = pos
+        # Deferred so it travels in the same transaction as the data after it
+        self._pending_address = ROW_OFFSETS[row] + col
+        self._cursor = (row, col)
+
+    def command(self, value):
+        """Send a raw HD44780 instruction"""
+        payload = self._flush_address([])
+        payload.extend(self._command_bytes(value))
+        self._transfer(payload)
+        if value in (CMD_CLEAR, CMD_HOME):
+            self._wait_ready(SLOW_COMMAND_DELAY)
+
+    def write(self, value):
+        """Write a single raw character code at the cursor"""
+        self.write_codes([value])
+
+    def write_codes(self, codes):
+        """Write raw character codes at the cursor in one transaction"""
+        payload = self._flush_address([])
+        payload.extend(self._data_bytes(codes))
+        self._transfer(payload)
+        row, col = self._cursor
+        self._cursor = (row, col + len(codes))
+
+    def write_string(self, text):
+        codes = [ord(ch) if ord(ch) < 256 else ord('?') for ch in text]
+        self.write_codes(codes)
+
+    def clear(self):
+        self._pending_address = None
+        self.command(CMD_CLEAR)
+        self._cursor = (0, 0)
+
+    def home(self):
+        self._pending_address = None
+        self.command(CMD_HOME)
+        self._cursor = (0, 0)
+
+    def create_char(self, location, bitmap):
+        """Upload an 8-row glyph to CGRAM slot 0-7 in one transaction"""
+        payload = self._command_bytes(CMD_SET_CGRAM | ((location & 0x07) << 3))
+        payload.extend(self._data_bytes(bitmap))
+        self._transfer(payload)
+        # Writing CGRAM moves the address counter out of DDRAM
+        self.cursor_pos = self._cursor
+
+    def close(self):
+        self.bus.close()
@@ -0,0 +1,207 @@
+"""
+LCD Writer Module
+Single owner thread for the LCD hardware with a latest-frame-wins mailbox
+"""
+
+import threading
+from clock import get_clock
+from lcd import CGRAMManager
+from lcd_charmap import LCDEncoder
+from profiler import get_profile_capture
+
+# Pause before retrying a frame the bus failed to write (seconds)
+WRITE_RETRY_DELAY = 0.5
+# While the bus keeps failing, repeat the error at most this often (seconds)
+ERROR_LOG_INTERVAL = 60.0
+
+class LCDWriter:
+    """Owns the LCD and writes frames on its own thread.
+
+    The render loop stages lines with write_line() and publishes them with
+    commit(), exactly like it would on an LCD. Frames are immutable
+    (lines, display offset) tuples held in a one-slot mailbox: if the bus
+    is slower than the render loop, stale frames are replaced by newer
+    ones instead of queueing up, so commit() never blocks on I2C.
+    """
+
+    def __init__(self, lcd):
+        self.lcd = lcd
+        self.cols = lcd.cols
+        self.rows = lcd.rows
+        self._staged = [' ' * self.cols for _ in range(self.rows)]
+        # None while drawing regular lines, else the hardware scroll offset
+        self._staged_offset = None
+        self._last_submitted = None
+        self._pending = None
+        # Glyph uploads accumulate across coalesced frames; none may be lost
+        self._pending_uploads = {}
+        # {slot: bitmap} as last sent, so a bus error can send them all again
+        self._uploaded = {}
+        self.cgram = CGRAMManager()
+        self.encoder = LCDEncoder(lcd.encoder.rom, cgram=self.cgram)
+        self._busy = False
+        self._running = False
+        self._cond = threading.Condition()
+        self._thread = None
+        self.stats = {
+            'submitted': 0,
+            'written': 0,
+            'coalesced': 0,
+            'errors': 0,
+        }
+
+    def start(self):
+        """Start the writer thread"""
+        if self._thread is not None:
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='lcd-writer', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=1.0):
+        """Write any pending frame and stop the writer thread"""
+        self.flush(timeout)
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def encode(self, text):
+        """Translate Unicode text to the LCD's ROM codes (cached per string)"""
+        return self.encoder.encode(text)
+
+    def retain_glyphs(self, lines):
+        """Release symbol glyphs (♪, ♥, ▶) that none of these encoded lines use"""
+        self.encoder.retain(lines)
+
+    def write_line(self, text, line=0):
+        """Stage a full line for the next commit()"""
+        self._staged[line] = text[:self.cols].ljust(self.cols)
+        self._staged_offset = None
+
+    def load_marquee(self, lines):
+        """Stage full-length lines for hardware scrolling (see LCD.load_marquee)"""
+        for row, text in enumerate(lines[:self.rows]):
+            self._staged[row] = text[:self.lcd.ddram_cols].ljust(self.lcd.ddram_cols)
+        if self._staged_offset is None:
+            self._staged_offset = 0
+
+    def set_display_offset(self, offset):
+        """Stage the hardware display shift for the next commit()"""
+        self._staged_offset = offset
+
+    def can_hardware_scroll(self, text):
+        return self.lcd.can_hardware_scroll(text)
+
+    def clear(self):
+        """Blank the display.
+
+        A blank frame is enough: the LCD's shadow framebuffer turns it into
+        writes of only the non-blank cells, which is cheaper than the
+        controller's clear command.
+        """
+        self._staged = [' ' * self.cols for _ in range(self.rows)]
+        self._staged_offset = None
+        self.commit()
+
+    def commit(self):
+        """Publish the staged frame to the writer thread without blocking"""
+        frame = (tuple(self._staged), self._staged_offset)
+        uploads = self.cgram.take_uploads()
+        if frame == self._last_submitted and not uploads:
+            return False
+        self.submit(frame, uploads)
+        return True
+
+    def submit(self, frame, uploads=None):
+        """Hand a frame to the writer, replacing any frame not yet written"""
+        with self._cond:
+            if self._pending is not None:
+                self.stats['coalesced'] += 1
+            self._pending = frame
+            self._pending_uploads.update(uploads or {})
+            self._last_submitted = frame
+            self.stats['submitted'] += 1
+            self._cond.notify_all()
+
+    def flush(self, timeout=1.0):
+        """Wait until the latest submitted frame is on the display"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending is None and not self._busy, timeout)
+
+    def _run(self):
+        capture = get_profile_capture()
+        failures = 0  # in a row
+        logged_at = None
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending is not None or not self._running)
+                # A stopped writer gives up on a bus that keeps failing
+                if self._pending is None or (failures and not self._running):
+                    return
+                frame = self._pending
+                uploads = self._pending_uploads
+                self._pending = None
+                self._pending_uploads = {}
+                self._busy = True
+
+            capture.checkpoint()
+            try:
+                self.lcd.upload_glyphs(uploads)
+                self._uploaded.update(uploads)
+                lines, offset = frame
+                if offset is None:
+                    for row, text in enumerate(lines):
+                        self.lcd.write_line(text, row)
+                else:
+                    self.lcd.load_marquee(lines)
+                    self.lcd.set_display_offset(offset)
+                self.lcd.commit()
+                self.stats['written'] += 1
+                if failures:
+                    print(f"✅ LCD writes recovered after {failures} failed attempts")
+                failures = 0
+            except Exception as e:
+                # Bus error mid-frame: the controller state is unknown, so the
+                # frame is written again in full, glyphs included. The render
+                # loop only commits changes, so a static page would otherwise
+                # stay garbled.
+                failures += 1
+                self.stats['errors'] += 1
+                now = get_clock().monotonic()
+                # A disconnected display fails every retry: log the first
+                # failure, then a reminder now and then
+                if failures == 1:
+                    print(f"LCD write error: {e}")
+                    logged_at = now
+                elif now - logged_at >= ERROR_LOG_INTERVAL:
+                    print(f"LCD write error: {e} ({failures} failed attempts so far)")
+                    logged_at = now
+                self.lcd.invalidate()
+                with self._cond:
+                    if self._pending is None:
+                        self._pending = frame
+                    # Newer uploads for a slot win over the ones being resent
+                    self._pending_uploads = {**self._uploaded, **uploads, **self._pending_uploads}
+                    self._cond.wait_for(lambda: not self._running, WRITE_RETRY_DELAY)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+# Global instance
+lcd_writer = None
+
+def start_lcd_writer(lcd):
+    """Create and start the global LCD writer that owns the given LCD"""
+    global lcd_writer
+    if lcd_writer is None:
+        lcd_writer = LCDWriter(lcd).start()
+    return lcd_writer
+
+def get_lcd_writer():
+    """Get the running LCD writer, or None if the display is not owned yet"""
+    return lcd_writer
@@ -9,24 +9,33 @@ Modularized version with clean separation of concerns:
 - display_manager: Display content generation
 - display_effects: Complex animations and scrolling
 - background_tasks: Background monitoring thread
+- frame_scheduler: Deadline-driven main loop sleeps
+- render_stats: Render loop counters and latency histograms
+- profiler: On-demand cProfile / tracemalloc captures via signals
+- lcd_writer: Single owner thread for LCD hardware writes
 """
 
-import time
 import RPi.GPIO as GPIO
+from clock import get_clock
 from spotify_manager import get_spotify_manager
 from lcd import LCD
+from lcd_writer import start_lcd_writer
 from japanese_processor import get_japanese_processor
 
 # Import modularized components
 import app_state
-from button_handler import setup_buttons, check_buttons
-from display_effects import update_display_with_effects
+from button_handler import setup_buttons, check_buttons, next_button_deadline
+from display_effects import update_display_with_effects, next_frame_deadline
 from background_tasks import start_background_monitoring
+from frame_scheduler import get_frame_scheduler
+from poll_scheduler import get_poll_scheduler
+from render_stats import get_render_stats
+from profiler import install_signal_handlers
 
 def main():
     print("🎵 Starting Smart Spotify LCD Player with 4 Buttons...")
     print("🎮 PREV (GPIO17) | PLAY (GPIO18) | NEXT (GPIO27) | CYCLE (GPIO22)")
-    print("🧠 Single-threaded with pendulum scrolling - no LCD corruption!")
+    print("🧠 Single LCD writer thread with pendulum scrolling - no LCD corruption!")
     print("💤 Smart sleep: Auto-switches to clock after 30s of no music")
     print("🌅 Auto-wake: Returns to now_playing when music resumes or buttons pressed")
     print("🔄 Hold CYCLE for 5s to reboot - robust recovery mechanism!")
@@ -34,7 +43,10 @@ def main():
     
     # Initialize components
     spotify = get_spotify_manager()
-    lcd = LCD()
+    app_state.load_display_settings()
+    # The writer thread is the only code that touches the LCD hardware; the
+    # render loop just hands it frames and never blocks on I2C
+    lcd = start_lcd_writer(LCD())
     japanese_proc = get_japanese_processor()
     
     # Initialize Japanese processor availability
@@ -49,6 +61,9 @@ def main():
         return
     
     setup_buttons()
+    scheduler = get_frame_scheduler()
+    # kill -USR1 / -USR2 <pid> to profile a sluggish unit without stopping it
+    capture = install_signal_handlers()
     
     # Start background thread for external device detection
     bg_thread = start_background_monitoring()
@@ -68,16 +83,16 @@ def main():
         lcd.clear()
         
         # Display welcome message with wave effect
-        welcome_start_time = time.time()
+        welcome_end = get_clock().monotonic() + 3.0  # Show for 3 seconds
         print("🌊 Starting welcome wave effect...")
         welcome_shown = False
-        while time.time() - welcome_start_time < 3.0:  # Show for 3 seconds
+        while get_clock().monotonic() < welcome_end:
             # Update display with welcome message
             content_changed = update_display_with_effects(lcd)
             if content_changed and not welcome_shown:
                 print("✨ Welcome message displayed on LCD")
                 welcome_shown = True
-            time.sleep(0.05)
+            scheduler.sleep_until(next_frame_deadline(), welcome_end)
         print("⏰ Welcome timeout reached, switching modes...")
         
         # Determine initial mode based on music state
@@ -89,6 +104,9 @@ def main():
             app_state.set_display_mode(2)  # clock mode
         
         while True:
+            # Join/leave a cProfile session started by SIGUSR1 (no-op otherwise)
+            capture.checkpoint()
+
             # Check buttons (event-driven API calls)
             button_pressed = check_buttons()
             
@@ -96,12 +114,25 @@ def main():
             content_changed = update_display_with_effects(lcd)
             if content_changed and app_state.get_current_mode() == 'now_playing':
                 print(f"📊 Total API calls: {spotify.get_api_call_count()}")
+            # Snapshot for `python3 render_stats.py` (at most once a minute)
+            get_render_stats().maybe_dump(get_clock().monotonic())
             
-            time.sleep(0.05)  # Responsive checking
+            # Sleep until the next animation frame, clock tick or button hold
+            # deadline; button edges and track changes wake the loop early
+            scheduler.sleep_until(next_frame_deadline(), next_button_deadline())
             
     except KeyboardInterrupt:
-        print(f"\n👋 Goodbye! Total API calls this session: {spotify.get_api_call_count()}")
+        print(f"\n👋 Goodbye! Total API calls this session: {spotify.get_api_call_count()} "
+              f"({spotify.get_calls_saved()} saved by sharing in-flight requests)")
+        report = scheduler.report()
+        print(f"📊 Render loop: {report['wakeups_per_sec']:.1f} wakeups/sec, CPU {report['cpu_percent']:.1f}%")
+        print(get_render_stats().report())
+        print(spotify.latency_report())
+        print(spotify.guard_report())
+        print(spotify.playback_report())
+        print(get_poll_scheduler().report())
         lcd.clear()
+        lcd.stop()
         GPIO.cleanup()
 
 if __name__ == "__main__":
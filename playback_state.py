@@ -0,0 +1,175 @@
+"""
+Playback State Module
+Local model of Spotify playback: commands apply optimistically, polls reconcile
+"""
+
+import threading
+from collections import deque
+
+# Spotify's player state can trail a command by about this long; a poll
+# sent sooner may still show the old state without contradicting it
+SETTLE_SECONDS = 1.0
+DIVERGENCE_HISTORY = 20
+
+# What a poll reports while nothing is playing
+PAUSED_TRACK_INFO = {"title": "Nothing playing", "artist": "Paused or stopped", "track_id": None, "is_playing": False}
+
+REPEAT_MODES = ('off', 'context', 'track')
+
+# Pending skips: 'track' must move to another track; 'restart' (previous)
+# may also restart the same one, as Spotify does a few seconds into a song
+TRACK_FIELDS = ('track', 'restart')
+
+class _Expectation:
+    """A command sent to Spotify that no poll has confirmed yet"""
+    def __init__(self, value, previous, sent_at, position_ms=None):
+        self.value = value
+        self.previous = previous  # restored if Spotify rejects the command
+        self.sent_at = sent_at
+        self.position_ms = position_ms  # playing track's position when a skip was sent
+
+class PlaybackState:
+    """What Spotify is doing, as far as the player knows.
+
+    Commands (play/pause, skip, shuffle, repeat) are applied here before
+    the write call is sent, so the display changes at once and play/pause
+    needs no read first. Each one stays pending until a poll shows it took
+    effect. A poll sent within SETTLE_SECONDS of the command that still
+    shows the old state is not held against it; a later one that does
+    wins, and the divergence is recorded. A rejected write is undone.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.is_playing = None  # None until the first poll
+        self.track = None       # last playing track info, kept while paused
+        self.shuffle = None
+        self.repeat = None
+        self._pending = {}      # 'is_playing' | 'track' | 'restart' | 'shuffle' | 'repeat' -> _Expectation
+        self._polled_at = None  # when the newest reconciled poll was sent
+        self.divergences = deque(maxlen=DIVERGENCE_HISTORY)  # (field, expected, actual)
+        self.stats = {'commands': 0, 'confirmed': 0, 'divergences': 0, 'rejected': 0}
+
+    def apply(self, changes, now):
+        """Apply a command's expected effect locally; returns the track info to show.
+
+        `changes` maps fields to their expected values; for 'track' and
+        'restart' the value is the track being skipped away from.
+        """
+        with self._lock:
+            self.stats['commands'] += 1
+            for field, value in changes.items():
+                position_ms = self._position_ms(now) if field in TRACK_FIELDS else None
+                self._pending[field] = _Expectation(value, self._get(field), now, position_ms)
+                if field == 'is_playing' and value != self.is_playing:
+                    self._hold_position(now)
+                if field not in TRACK_FIELDS:
+                    setattr(self, field, value)
+            return self._view()
+
+    def reject(self, fields):
+        """Undo a command Spotify refused; returns the track info to show"""
+        with self._lock:
+            self.stats['rejected'] += 1
+            for field in fields:
+                expectation = self._pending.pop(field, None)
+                if expectation is not None and field not in TRACK_FIELDS:
+                    setattr(self, field, expectation.previous)
+            return self._view()
+
+    def reconcile(self, track_info, shuffle, repeat, requested_at):
+        """Merge a poll into the model; returns the track info to show.
+
+        `requested_at` is when the poll was sent, so a reply that left
+        before a command settled cannot undo it.
+        """
+        with self._lock:
+            if self._polled_at is not None and requested_at < self._polled_at:
+                return track_info  # overtaken by a newer poll
+            self._polled_at = requested_at
+            if track_info.get('is_playing') and track_info.get('track_id'):
+                self.track = track_info
+            track_id = track_info.get('track_id')
+            actual = {'is_playing': bool(track_info.get('is_playing')), 'track': track_id, 'restart': track_id,
+                      'shuffle': shuffle, 'repeat': repeat}
+            for field, expectation in list(self._pending.items()):
+                if field in TRACK_FIELDS:
+                    matched = track_id is not None and track_id != expectation.value
+                    if field == 'restart' and track_id == expectation.value:
+                        matched = self._restarted(track_info, expectation, requested_at)
+                else:
+                    matched = actual[field] == expectation.value
+                if matched:
+                    self.stats['confirmed'] += 1
+                elif requested_at < expectation.sent_at + SETTLE_SECONDS:
+                    continue  # too early to tell
+                else:
+                    self.stats['divergences'] += 1
+                    expected = {'track': f"not {expectation.value}",
+                                'restart': f"not {expectation.value} or restarted"}.get(field, expectation.value)
+                    self.divergences.append((field, expected, actual[field]))
+                    print(f"⚠️ Playback diverged: expected {field}={expected}, Spotify has {actual[field]}")
+                del self._pending[field]
+            for field in ('is_playing', 'shuffle', 'repeat'):
+                if field not in self._pending:
+                    setattr(self, field, actual[field])
+            if 'is_playing' in self._pending:
+                return self._view() or track_info
+            return track_info
+
+    def pending(self):
+        """Fields with a command still awaiting confirmation"""
+        with self._lock:
+            return sorted(self._pending)
+
+    def report(self):
+        """One-line summary of commands and how polls agreed with them"""
+        with self._lock:
+            stats = dict(self.stats)
+            recent = list(self.divergences)[-3:]
+        line = (f"🎛️ Playback commands: {stats['commands']} sent, {stats['confirmed']} confirmed, "
+                f"{stats['divergences']} diverged, {stats['rejected']} rejected")
+        if recent:
+            line += " (latest: " + ", ".join(f"{field} expected {expected}, got {actual}"
+                                            for field, expected, actual in recent) + ")"
+        return line
+
+    def _get(self, field):
+        if field in TRACK_FIELDS:
+            return self.track.get('track_id') if self.track else None
+        return getattr(self, field)
+
+    def _position_ms(self, now):
+        """Where the model's track is at `now`, or None if unknown"""
+        track = self.track
+        if not track or track.get('progress_ms') is None or track.get('fetched_at') is None:
+            return None
+        progress_ms = track['progress_ms']
+        if self.is_playing:
+            progress_ms += int((now - track['fetched_at']) * 1000)
+        if track.get('duration_ms'):
+            progress_ms = min(progress_ms, track['duration_ms'])
+        return progress_ms
+
+    def _restarted(self, track_info, expectation, requested_at):
+        """Whether a poll shows the same track started over since the skip was sent"""
+        progress_ms = track_info.get('progress_ms')
+        if progress_ms is None or expectation.position_ms is None:
+            return False
+        # Where it would be had it just played on; a restart is well behind that
+        unskipped_ms = expectation.position_ms + max(0.0, requested_at - expectation.sent_at) * 1000
+        return progress_ms < unskipped_ms - SETTLE_SECONDS * 1000
+
+    def _hold_position(self, now):
+        # Pausing freezes the progress bar where it is; resuming continues from there
+        progress_ms = self._position_ms(now)
+        if progress_ms is not None:
+            self.track = dict(self.track, progress_ms=progress_ms, fetched_at=now)
+
+    def _view(self):
+        """Track info the way a poll would report the current model, or None if unknown"""
+        if self.is_playing is False:
+            return dict(PAUSED_TRACK_INFO)
+        if self.is_playing and self.track:
+            return dict(self.track, is_playing=True)
+        return None
@@ -0,0 +1,164 @@
+"""
+Poll Scheduler Module
+Plans background playback polls around the track: just after it ends, sparse mid-track, tight after a command
+"""
+
+import math
+import threading
+from clock import get_clock
+from render_stats import Histogram
+
+# Poll intervals (seconds)
+ACTIVE_POLL_INTERVAL = 8     # on now_playing with no track timing (paused, nothing playing)
+IDLE_POLL_INTERVAL = 30      # other displays - no API calls
+ERROR_RETRY_INTERVAL = 10
+MID_TRACK_INTERVAL = 20      # longest wait while a track plays (catches skips from other devices)
+TRACK_END_MARGIN = 1.0       # poll this long after the expected end, once Spotify has moved on
+MIN_POLL_INTERVAL = 1.0
+COMMAND_POLL_INTERVAL = 3    # after a button command, for COMMAND_WINDOW seconds
+COMMAND_WINDOW = 9
+
+# Detection latency buckets (ms)
+LATENCY_BUCKETS_MS = (250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+
+class PollScheduler:
+    """Decides when the background poller next asks Spotify for playback.
+
+    Each playback response carries progress_ms and duration_ms, so the
+    end of the track is known: polls are spaced evenly so that one lands
+    TRACK_END_MARGIN after it, at most MID_TRACK_INTERVAL apart (which
+    bounds how late a skip made on another device shows up). For
+    COMMAND_WINDOW seconds after a button command polls come every
+    COMMAND_POLL_INTERVAL seconds, and request() wakes the poller early
+    (e.g. once a skip has settled).
+
+    Track changes are timed against what predicted them: the planned end
+    of the previous track, the command that caused them, or (for changes
+    made elsewhere) the previous poll, an upper bound.
+    """
+
+    def __init__(self, clock=None):
+        self._clock = clock
+        self._requested = threading.Event()
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget all polling history (a waiting poller keeps waiting)"""
+        self._due = None
+        self._started = None
+        self._last_poll = None
+        self._last_command = None
+        self._track_id = None
+        self._expected_end = None
+        self.polls = 0
+        self.latency = {}  # 'track end' | 'command' | 'external' -> Histogram
+
+    @property
+    def clock(self):
+        return self._clock or get_clock()
+
+    def request(self, delay=0.0, command=False):
+        """Have the poller check playback within `delay` seconds (safe from any thread)"""
+        now = self.clock.monotonic()
+        if command:
+            self._last_command = now
+        due = now + delay
+        with self._lock:
+            if self._due is None or due < self._due:
+                self._due = due
+        self._requested.set()
+
+    def wait(self, delay):
+        """Sleep `delay` seconds, or until an earlier poll was requested"""
+        clock = self.clock
+        deadline = clock.monotonic() + delay
+        while True:
+            requested = self._due
+            due = deadline if requested is None else min(deadline, requested)
+            timeout = due - clock.monotonic()
+            if timeout <= 0:
+                break
+            clock.wait(self._requested, timeout)
+            self._requested.clear()
+        with self._lock:
+            # The poll about to run answers this request; one made since
+            # (e.g. a command while waking) still stands
+            if self._due == requested:
+                self._due = None
+
+    def polled(self, track, track_changed, issued=True):
+        """Record a poll's result; returns the seconds until the next poll.
+
+        issued=False: no API call went out (e.g. the guard refused it) and
+        `track` is the last good one, so it doesn't count towards polls.
+        """
+        now = self.clock.monotonic()
+        if self._started is None:
+            self._started = now
+        if issued:
+            self.polls += 1
+        track_id = track.get('track_id') if track else None
+        if track_changed and track_id and self._track_id and track_id != self._track_id:
+            self._record_change(now)
+        self._track_id = track_id or self._track_id
+        self._last_poll = now
+        self._expected_end = self._track_end(track, now)
+        return self.next_delay(now)
+
+    def next_delay(self, now):
+        if self._expected_end is None:
+            delay = ACTIVE_POLL_INTERVAL
+        else:
+            until_poll = self._expected_end + TRACK_END_MARGIN - now
+            # Evenly spaced polls, the last one landing just after the end
+            delay = until_poll / math.ceil(until_poll / MID_TRACK_INTERVAL) if until_poll > 0 else MIN_POLL_INTERVAL
+        if self._last_command is not None and now - self._last_command < COMMAND_WINDOW:
+            delay = min(delay, COMMAND_POLL_INTERVAL)
+        return max(MIN_POLL_INTERVAL, delay)
+
+    def _track_end(self, track, now):
+        """Monotonic time the playing track should end, or None"""
+        if not track or not track.get('is_playing'):
+            return None
+        progress_ms, duration_ms = track.get('progress_ms'), track.get('duration_ms')
+        if progress_ms is None or not duration_ms:
+            return None
+        fetched_at = track.get('fetched_at', now)
+        return fetched_at + max(0, duration_ms - progress_ms) / 1000.0
+
+    def _record_change(self, now):
+        if self._last_command is not None and self._last_command >= self._last_poll:
+            kind, since = 'command', self._last_command
+        elif self._expected_end is not None and self._expected_end <= now:
+            kind, since = 'track end', self._expected_end
+        else:
+            kind, since = 'external', self._last_poll
+        if kind not in self.latency:
+            self.latency[kind] = Histogram(LATENCY_BUCKETS_MS)
+        self.latency[kind].record((now - since) * 1000.0)
+
+    def calls_per_hour(self):
+        """Background polls that reached the API, per hour since the first one"""
+        if self._started is None:
+            return 0.0
+        elapsed = max(self.clock.monotonic() - self._started, 1.0)
+        return self.polls * 3600.0 / elapsed
+
+    def report(self):
+        """Polling rate and how late track changes were noticed"""
+        lines = [f"📡 Background polls: {self.polls} ({self.calls_per_hour():.0f}/hour)"]
+        for kind, h in sorted(self.latency.items()):
+            lines.append(f"  {kind:<10} changes n={h.count:<4} detected after mean {h.mean / 1000:.1f}s  "
+                         f"p95 {h.percentile(95) / 1000:.1f}s  max {(h.max or 0) / 1000:.1f}s")
+        return '\n'.join(lines)
+
+# Global scheduler instance
+poll_scheduler = None
+
+def get_poll_scheduler():
+    """Get or create the global poll scheduler"""
+    global poll_scheduler
+    if poll_scheduler is None:
+        poll_scheduler = PollScheduler()
+    return poll_scheduler
@@ -0,0 +1,183 @@
+"""
+Profiler Module
+On-demand cProfile and tracemalloc captures of the running player (SIGUSR1 / SIGUSR2)
+"""
+
+import cProfile
+import os
+import pstats
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+
+# Where captures are written (override with PROFILE_DIR)
+DEFAULT_PROFILE_DIR = '/tmp/spotify-player-profiles'
+TRACEMALLOC_FRAMES = 10
+REPORT_LINES = 40  # entries in the text summaries
+
+# From Python 3.12 cProfile runs on sys.monitoring, so one profiler sees every
+# thread; before that it only sees the thread that enabled it
+_PROFILES_ALL_THREADS = sys.version_info >= (3, 12)
+
+class _ThreadState(threading.local):
+    # Class defaults, so a thread's first lookups don't raise and catch
+    generation = 0
+    profile = None
+
+class ProfileCapture:
+    """cProfile sessions and tracemalloc diffs, started and stopped from signals.
+
+    - toggle_profile(): start a cProfile session, or stop it and write
+      profile-<time>.pstats plus a text summary sorted by cumulative time
+    - snapshot_memory(): start tracemalloc on first use; afterwards write
+      tracemalloc-<time>.txt with what grew since the previous snapshot
+
+    On Python < 3.12 each covered loop (render loop and buttons, background
+    poller, LCD writer) calls checkpoint() once per iteration to join or
+    leave the session with its own profiler; the results are merged into
+    one file. While nothing is being captured a checkpoint is a single
+    counter compare, and tracemalloc is not running at all.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory or os.getenv('PROFILE_DIR', DEFAULT_PROFILE_DIR)
+        self.profiling = False
+        self._lock = threading.Lock()
+        self._local = _ThreadState()
+        # Bumped on every start/stop so threads notice at their next checkpoint
+        self._generation = 0
+        self._profiles = []  # (thread name, cProfile.Profile)
+        self._started = None
+        self._snapshot = None
+
+    def checkpoint(self):
+        """Join or leave the profiling session from this thread (call once per loop iteration)"""
+        if self._local.generation == self._generation:
+            return
+        self._local.generation = self._generation
+        profile = self._local.profile
+        if profile is not None:
+            profile.disable()
+            # The session may have been stopped from another thread, which
+            # cannot remove this thread's hook
+            sys.setprofile(None)
+            self._local.profile = None
+        if self.profiling and not _PROFILES_ALL_THREADS:
+            profile = cProfile.Profile()
+            with self._lock:
+                self._profiles.append((threading.current_thread().name, profile))
+            self._local.profile = profile
+            profile.enable()
+
+    def toggle_profile(self):
+        """Start a cProfile session, or stop the running one; returns the saved path if stopped"""
+        if self.profiling:
+            return self.stop_profile()
+        self.start_profile()
+        return None
+
+    def start_profile(self):
+        with self._lock:
+            self.profiling = True
+            self._profiles = []
+            self._generation += 1
+        self._started = time.perf_counter()
+        if _PROFILES_ALL_THREADS:
+            profile = cProfile.Profile()
+            self._profiles.append(('all threads', profile))
+            profile.enable()
+        else:
+            # The signal's thread (the render loop) joins right away
+            self.checkpoint()
+        print("🔬 Profiling started (SIGUSR1 again to stop and save)")
+
+    def stop_profile(self):
+        """End the session and write the merged profile; returns the .pstats path"""
+        with self._lock:
+            self.profiling = False
+            self._generation += 1
+            profiles, self._profiles = self._profiles, []
+        self.checkpoint()
+        stats = None
+        for _, profile in profiles:
+            profile.disable()
+            if stats is None:
+                stats = pstats.Stats(profile)
+            else:
+                stats.add(profile)
+        if stats is None:
+            return None
+        seconds = time.perf_counter() - self._started
+        path = self._path('profile', '.pstats')
+        stats.dump_stats(path)
+        with open(path[:-len('.pstats')] + '.txt', 'w') as f:
+            threads = ', '.join(name for name, _ in profiles)
+            f.write(f"cProfile session: {seconds:.1f}s, threads: {threads}\n")
+            stats.stream = f
+            stats.sort_stats('cumulative').print_stats(REPORT_LINES)
+        print(f"🔬 Profile saved: {path} ({seconds:.1f}s, {len(profiles)} thread(s))")
+        return path
+
+    def snapshot_memory(self):
+        """Start tracemalloc, or write the growth since the last snapshot; returns the path"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            self._snapshot = self._take_snapshot()
+            print("🧠 tracemalloc started (SIGUSR2 again to save what grew since now)")
+            return None
+        snapshot = self._take_snapshot()
+        growth = snapshot.compare_to(self._snapshot, 'lineno')
+        current, peak = tracemalloc.get_traced_memory()
+        path = self._path('tracemalloc', '.txt')
+        with open(path, 'w') as f:
+            f.write(f"tracemalloc diff: traced {current / 1024:.1f} KiB now, peak {peak / 1024:.1f} KiB\n")
+            for stat in growth[:REPORT_LINES]:
+                f.write(f"{stat}\n")
+        self._snapshot = snapshot
+        print(f"🧠 Memory diff saved: {path}")
+        return path
+
+    def _take_snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ))
+
+    def _path(self, kind, suffix):
+        """Timestamped file in the capture directory, never overwriting an earlier one"""
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, f"{kind}-{time.strftime('%Y%m%d-%H%M%S')}")
+        path = base + suffix
+        count = 1
+        while os.path.exists(path):
+            count += 1
+            path = f"{base}-{count}{suffix}"
+        return path
+
+# Global instance
+profile_capture = None
+
+def get_profile_capture():
+    """Get or create the global profile capture"""
+    global profile_capture
+    if profile_capture is None:
+        profile_capture = ProfileCapture()
+    return profile_capture
+
+def _run_safely(action):
+    # Signal handlers run inside the main loop: a failed capture must not end it
+    try:
+        action()
+    except Exception as e:
+        print(f"⚠️ Capture failed: {e}")
+
+def install_signal_handlers(capture=None):
+    """SIGUSR1 toggles cProfile, SIGUSR2 takes a tracemalloc diff (call from the main thread)"""
+    capture = capture or get_profile_capture()
+    signal.signal(signal.SIGUSR1, lambda signum, frame: _run_safely(capture.toggle_profile))
+    signal.signal(signal.SIGUSR2, lambda signum, frame: _run_safely(capture.snapshot_memory))
+    print(f"🔬 Profiling: kill -USR1 {os.getpid()} (cProfile on/off), "
+          f"kill -USR2 {os.getpid()} (memory diff) -> {capture.directory}")
+    return capture
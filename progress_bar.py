@@ -0,0 +1,233 @@
+"""
+Progress Bar Module
+Elapsed time and a sub-cell progress bar for now_playing, moved along locally between polls
+"""
+
+import threading
+import app_state
+from animation import Effect
+from big_clock import A00_FULL_BLOCK
+from clock import get_clock
+
+CELL_COLUMNS = 5   # pixel columns in a 5x8 character cell
+BAR_START = 6      # '12:34 ' then the bar to the end of the line
+BOUNDARY_MARGIN_MS = 1  # wake just after a boundary so the new cell is due
+
+# Partial cells light the leftmost n pixel columns, full height; level 5 is
+# only needed when the ROM has no full block
+LEVEL_GLYPHS = {
+    level: (f'progress_{level}', (((1 << level) - 1) << (CELL_COLUMNS - level),) * 8)
+    for level in range(1, CELL_COLUMNS + 1)
+}
+TEXT_FULL_CELL = '='  # no full block and no free CGRAM slot
+
+def progress_shown(track):
+    """Whether now_playing shows the progress line for this track"""
+    return bool(app_state.display_settings['progress_bar'] and track and track.get('duration_ms'))
+
+def format_elapsed(ms):
+    """Milliseconds as m:ss"""
+    seconds = int(ms // 1000)
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+class PlaybackProgress:
+    """Playback position from the last poll plus the time since.
+
+    Every playback poll already returns progress_ms and duration_ms, so the
+    position is re-synced whenever a poll comes back and moved along on the
+    monotonic clock in between - the bar never costs an API call. Samples
+    older than the one held (e.g. a cached track dict) are ignored.
+
+    The poller thread syncs while the render thread reads, so each sample is
+    one (progress_ms, duration_ms, is_playing, synced_at) tuple swapped in
+    whole: a reader never sees half of one poll and half of the next.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget the held sample"""
+        with self._lock:
+            self._sample = None
+            self.syncs = 0
+
+    def sync(self, track):
+        """Take a new sample from a track dict; returns True if it was used"""
+        if not track or track.get('progress_ms') is None or not track.get('duration_ms'):
+            return False
+        fetched_at = track.get('fetched_at')
+        if fetched_at is None:
+            fetched_at = get_clock().monotonic()
+        with self._lock:
+            if self._sample is not None and fetched_at < self._sample[3]:
+                return False
+            self._sample = (track['progress_ms'], track['duration_ms'],
+                            bool(track.get('is_playing')), fetched_at)
+            self.syncs += 1
+        return True
+
+    def sample(self):
+        """(progress_ms, duration_ms, is_playing, synced_at) from the last poll, or None"""
+        return self._sample
+
+    def position_ms(self, now, sample=None):
+        """Interpolated position at monotonic `now`, or None before the first sample"""
+        sample = sample or self._sample
+        if sample is None:
+            return None
+        position, duration_ms, is_playing, synced_at = sample
+        if is_playing:
+            position += (now - synced_at) * 1000.0
+        return max(0.0, min(position, duration_ms))
+
+class ProgressOverlay(Effect):
+    """Runs another effect and draws the progress line over one of its rows.
+
+    The row is 'm:ss' followed by a bar with one step per pixel column
+    (5 per cell). Only the partly filled cell needs a CGRAM glyph: one is
+    acquired per fill level as the bar moves (the previous level is left
+    cached), so a step changes one cell code and the framebuffer sends just
+    that cell, plus the seconds digit once a second. The inner effect must
+    not use the hardware display shift, since that would move this row too.
+    """
+
+    def __init__(self, inner, progress=None, row=1):
+        super().__init__()
+        self.inner = inner
+        self.progress = progress
+        self.row = row
+        self._base = None
+        self._key = None
+        self._text = None
+        self._seen_track = None
+        self._cgram = None
+        self._full = None
+        self._held = []
+        self._level = None
+
+    @property
+    def name(self):
+        return self.inner.name
+
+    def start(self, now, ctx):
+        super().start(now, ctx)
+        if self.progress is None:
+            self.progress = get_playback_progress()
+        self.inner.start(now, ctx)
+        self._base = None
+        self._key = None
+
+    def frame(self, now):
+        base = self.inner.frame(now)
+        if base is not None:
+            self._base = base
+        key = self._position_key(now)
+        if base is None and key == self._key:
+            return None
+        if key != self._key:
+            self._key = key
+            self._text = self._render_row(key)
+        rows = list(self._base or self.ctx.padded())
+        if self._text is not None:
+            rows[self.row] = self._text
+        return tuple(rows)
+
+    def _position_key(self, now):
+        """(elapsed seconds, lit pixel columns) - the row only changes with these"""
+        current = app_state.current_track
+        if current is not self._seen_track:
+            # Track change or button refresh: take its sample too
+            self._seen_track = current
+            self.progress.sync(current)
+        sample = self.progress.sample()
+        position = self.progress.position_ms(now, sample)
+        if position is None:
+            return None
+        pixels = (self.ctx.width - BAR_START) * CELL_COLUMNS
+        return int(position // 1000), int(position * pixels // sample[1])
+
+    def _render_row(self, key):
+        if key is None:
+            return None
+        seconds, lit = key
+        width = self.ctx.width
+        full, level = divmod(lit, CELL_COLUMNS)
+        cells = self._full_cell() * full
+        if level:
+            cells += self._partial_cell(level)
+        return (format_elapsed(seconds * 1000).ljust(BAR_START) + cells).ljust(width)[:width]
+
+    def _full_cell(self):
+        if self._full is None:
+            sink = self.ctx.sink
+            full = sink.encode('█') if hasattr(sink, 'encode') else A00_FULL_BLOCK
+            if full != A00_FULL_BLOCK:
+                # Only the A00 ROM has a full block cell
+                code = self._acquire(CELL_COLUMNS)
+                full = chr(code) if code is not None else TEXT_FULL_CELL
+            self._full = full
+        return self._full
+
+    def _partial_cell(self, level):
+        """Code for a cell with `level` columns lit, or a blank while CGRAM is busy"""
+        if level != self._level:
+            # Acquire before releasing so the new level never reuses the
+            # old level's slot (same code, new pattern: no frame change)
+            code = self._acquire(level)
+            if self._level is not None:
+                self._release(self._level)
+            self._level = level if code is not None else None
+        if self._level is None:
+            return ' '
+        return chr(self._cgram.code(LEVEL_GLYPHS[level][0]))
+
+    def _acquire(self, level):
+        cgram = getattr(self.ctx.sink, 'cgram', None)
+        if cgram is None:
+            return None
+        name, bitmap = LEVEL_GLYPHS[level]
+        code = cgram.acquire(name, bitmap)
+        if code is not None:
+            self._cgram = cgram
+            self._held.append(name)
+        return code
+
+    def _release(self, level):
+        name = LEVEL_GLYPHS[level][0]
+        if name in self._held:
+            self._held.remove(name)
+            self._cgram.release(name)
+
+    def deadline(self):
+        deadlines = [self.inner.deadline()]
+        sample = self.progress.sample() if self.progress is not None else None
+        if sample is not None and sample[2] and self._key is not None:
+            now = get_clock().monotonic()
+            duration_ms = sample[1]
+            position = self.progress.position_ms(now, sample)
+            if position < duration_ms:
+                pixels = (self.ctx.width - BAR_START) * CELL_COLUMNS
+                next_pixel = (self._key[1] + 1) * duration_ms / pixels
+                wait_ms = min(1000.0 - position % 1000.0, next_pixel - position)
+                deadlines.append(now + (max(0.0, wait_ms) + BOUNDARY_MARGIN_MS) / 1000.0)
+        deadlines = [d for d in deadlines if d is not None]
+        return min(deadlines) if deadlines else None
+
+    def cancel(self):
+        """Stop the inner effect and hand the glyph slots back"""
+        self.inner.cancel()
+        for name in self._held:
+            self._cgram.release(name)
+        self._held = []
+        self._level = None
+        self._full = None
+        super().cancel()
+
+# Global instance
+playback_progress = PlaybackProgress()
+
+def get_playback_progress():
+    """Get the global playback progress"""
+    return playback_progress
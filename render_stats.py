@@ -0,0 +1,195 @@
+"""
+Render Stats Module
+Counters and histograms for the render loop: frames, render and bus time, scroll jitter
+"""
+
+from bisect import bisect_left
+import json
+import os
+import sys
+import threading
+import time
+
+# Histogram bucket upper bounds (milliseconds); anything slower lands in overflow
+BUCKETS_MS = (0.1, 0.2, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+# Where the main loop writes snapshots for `python3 render_stats.py`
+DEFAULT_STATS_FILE = '/tmp/spotify-player-render-stats.json'
+DUMP_INTERVAL = 60.0  # seconds between snapshots
+
+class Histogram:
+    """Fixed-bucket latency histogram with exact count, mean, min and max.
+
+    Percentiles are reported as the upper bound of the bucket they fall in
+    (the exact max for the overflow bucket), which is plenty to tell a
+    2 ms frame from a 50 ms one on a Pi Zero.
+    """
+
+    def __init__(self, bounds=BUCKETS_MS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def record(self, value_ms):
+        self.counts[bisect_left(self.bounds, value_ms)] += 1
+        self.count += 1
+        self.total += value_ms
+        if self.min is None or value_ms < self.min:
+            self.min = value_ms
+        if self.max is None or value_ms > self.max:
+            self.max = value_ms
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, p):
+        """Approximate p-th percentile (0-100), or 0.0 when empty"""
+        if not self.count:
+            return 0.0
+        rank = p / 100.0 * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                return min(self.bounds[index], self.max) if index < len(self.bounds) else self.max
+        return self.max
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'min': self.min or 0.0,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'max': self.max or 0.0,
+            'buckets': dict(zip([str(b) for b in self.bounds] + ['inf'], self.counts)),
+        }
+
+class RenderStats:
+    """What the render loop actually does.
+
+    - frames_rendered: ticks that sent a new frame to the display
+    - frames_skipped: ticks with nothing new to show
+    - frames_dropped: animation frames that came due but were never shown
+      because a tick ran late
+    - render_ms: time spent in one update_display_with_effects() call
+    - bus_ms: time spent writing one frame to the LCD
+    - scroll_jitter_ms: how late each scroll step was shown relative to its
+      slot on the scroll grid (SCROLL_SPEED, 0.3 s)
+
+    Durations are measured with the real high-resolution counter, even when
+    the app runs on a virtual clock, since they measure work, not schedule.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counters = {'frames_rendered': 0, 'frames_skipped': 0, 'frames_dropped': 0}
+            self.render_ms = Histogram()
+            self.bus_ms = Histogram()
+            self.scroll_jitter_ms = Histogram()
+            self._last_dump = None
+
+    def record_frame(self, seconds, written):
+        with self._lock:
+            self.counters['frames_rendered' if written else 'frames_skipped'] += 1
+            self.render_ms.record(seconds * 1000.0)
+
+    def record_dropped(self, frames):
+        with self._lock:
+            self.counters['frames_dropped'] += frames
+
+    def record_bus_write(self, seconds):
+        # Called from the LCD writer thread
+        with self._lock:
+            self.bus_ms.record(seconds * 1000.0)
+
+    def record_scroll_step(self, lateness):
+        with self._lock:
+            self.scroll_jitter_ms.record(max(0.0, lateness) * 1000.0)
+
+    def snapshot(self):
+        """All counters and histogram summaries as a JSON-friendly dict"""
+        with self._lock:
+            return {
+                'counters': dict(self.counters),
+                'render_ms': self.render_ms.summary(),
+                'bus_ms': self.bus_ms.summary(),
+                'scroll_jitter_ms': self.scroll_jitter_ms.summary(),
+            }
+
+    def debug_line(self):
+        """One 16-column summary for the debug page (changes only after the colon)"""
+        with self._lock:
+            return f"Frm:{self.counters['frames_rendered']} J:{self.scroll_jitter_ms.percentile(95):.0f}ms"
+
+    def dump(self, path=None):
+        """Write a snapshot to the stats file atomically; returns the path"""
+        path = path or os.getenv('RENDER_STATS_FILE', DEFAULT_STATS_FILE)
+        data = self.snapshot()
+        data['written_at'] = time.time()
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+        return path
+
+    def maybe_dump(self, now, interval=DUMP_INTERVAL):
+        """Dump at most once per interval (monotonic `now`); never raises"""
+        if self._last_dump is not None and now < self._last_dump + interval:
+            return False
+        self._last_dump = now
+        try:
+            self.dump()
+        except OSError as e:
+            print(f"⚠️ Could not write render stats: {e}")
+            return False
+        return True
+
+    def report(self):
+        return format_report(self.snapshot())
+
+def format_report(data):
+    """Human-readable render stats from a snapshot()"""
+    counters = data['counters']
+    ticks = counters['frames_rendered'] + counters['frames_skipped']
+    lines = [
+        "📊 Render loop stats",
+        f"  Frames rendered: {counters['frames_rendered']} of {ticks} ticks "
+        f"({counters['frames_skipped']} skipped, {counters['frames_dropped']} dropped late)",
+    ]
+    for key, label in (('render_ms', 'Render time'), ('bus_ms', 'Bus write'), ('scroll_jitter_ms', 'Scroll jitter')):
+        h = data[key]
+        lines.append(
+            f"  {label + ':':<16} n={h['count']:<7} mean {h['mean']:.2f}ms  p50 {h['p50']:.1f}ms  "
+            f"p95 {h['p95']:.1f}ms  p99 {h['p99']:.1f}ms  max {h['max']:.2f}ms"
+        )
+    return '\n'.join(lines)
+
+# Global instance
+render_stats = RenderStats()
+
+def get_render_stats():
+    """Get the global render stats"""
+    return render_stats
+
+if __name__ == "__main__":
+    # Dump command: print the latest snapshot written by the running player
+    stats_path = sys.argv[1] if len(sys.argv) > 1 else os.getenv('RENDER_STATS_FILE', DEFAULT_STATS_FILE)
+    try:
+        with open(stats_path) as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"❌ No render stats at {stats_path}: {e}")
+        sys.exit(1)
+    age = time.time() - snapshot.get('written_at', time.time())
+    print(format_report(snapshot))
+    print(f"  (snapshot {age:.0f}s old: {stats_path})")
@@ -0,0 +1,136 @@
+"""
+Scroll Frames Module
+Precomputed, time-indexed frame tables for scrolling text
+"""
+
+# Fraction of a step treated as already elapsed, so a wake-up scheduled for a
+# step boundary never lands a rounding error short of it
+STEP_TOLERANCE = 1e-6
+
+# Between the end of a marquee's text and its start coming round again
+MARQUEE_SEPARATOR = '  *  '
+
+class ScrollTable:
+    """Ping-pong scroll animation for one line, compiled once per text.
+
+    Every window position is sliced and padded up front, and the whole
+    cycle (scroll out, pause at the end, scroll back, pause at the start)
+    is laid out with one entry per step. The frame to show is a pure
+    function of the time elapsed since scrolling started, so a late tick
+    lands on the right frame instead of slowing the animation down.
+    """
+
+    loops = False
+
+    def __init__(self, text, width=16, step=0.3, pause=4.0):
+        self.text = text
+        self.width = width
+        self.step = step
+        self.pause = pause
+        # Seconds before the first step; the pauses of a pendulum are in the cycle
+        self.lead = 0.0
+        self.frames, self.positions = self._layout()
+        self.period = len(self.positions) * step
+        # Steps until the position changes from each entry, so a scheduler
+        # can sleep straight through the pauses
+        runs = [1] * len(self.positions)
+        for i in range(len(self.positions) - 2, -1, -1):
+            if self.positions[i] == self.positions[i + 1]:
+                runs[i] = runs[i + 1] + 1
+        # The start pause carries on into the next cycle
+        if len(runs) > 1 and self.positions[-1] == self.positions[0]:
+            for i in range(len(runs) - 1, -1, -1):
+                if self.positions[i] != self.positions[-1]:
+                    break
+                runs[i] += runs[0]
+        self._runs = tuple(runs)
+
+    def _layout(self):
+        """(frames, positions): every window and the position at each step of a cycle"""
+        text, width = self.text, self.width
+        max_pos = max(0, len(text) - width)
+        frames = tuple(text[pos:pos + width].ljust(width) for pos in range(max_pos + 1))
+        if max_pos == 0:
+            return frames, (0,)
+        # Pauses are rounded to whole steps; the end frame is also shown
+        # for the step that reaches it
+        hold = max(0, round(self.pause / self.step))
+        positions = tuple(
+            list(range(max_pos))
+            + [max_pos] * (hold + 1)
+            + list(range(max_pos - 1, 0, -1))
+            + [0] * hold
+        )
+        return frames, positions
+
+    @property
+    def scrolls(self):
+        """Whether the text overflows the window at all"""
+        return len(self.frames) > 1
+
+    def position_at(self, elapsed):
+        """Window position `elapsed` seconds after scrolling started"""
+        elapsed -= self.lead
+        if elapsed < 0:
+            return 0
+        return self.positions[self._index(elapsed % self.period)]
+
+    def frame_at(self, elapsed):
+        """Visible line `elapsed` seconds after scrolling started"""
+        return self.frames[self.position_at(elapsed)]
+
+    def time_to_next_change(self, elapsed):
+        """Seconds until a different frame is due, or None if it never changes"""
+        if not self.scrolls:
+            return None
+        elapsed -= self.lead
+        if elapsed < 0:
+            return -elapsed
+        cycle_elapsed = elapsed % self.period
+        index = self._index(cycle_elapsed)
+        return max(0.0, (index + self._runs[index]) * self.step - cycle_elapsed)
+
+    def change_times(self, start, end):
+        """Elapsed times in (start, end] at which a new frame came due"""
+        times = []
+        at = start
+        while True:
+            wait = self.time_to_next_change(at)
+            if wait is None:
+                return times
+            at += wait if wait > 0 else self.step
+            if at > end + STEP_TOLERANCE * self.step:
+                return times
+            times.append(at)
+
+    def _index(self, cycle_elapsed):
+        index = int(cycle_elapsed / self.step + STEP_TOLERANCE)
+        return min(index, len(self.positions) - 1)
+
+class MarqueeTable(ScrollTable):
+    """Continuous marquee for one line: the text, a separator, then the text
+    again, always moving forward.
+
+    The text and separator form a circular buffer; the first `width` cells
+    are repeated once after its end, so every rotation of the ring is a
+    single slice and each frame costs the same cells on the bus as a
+    pendulum step. The start is held for `pause` once; after that there
+    are no end pauses and no scrolling back, so a long title is read in
+    about half the time.
+    """
+
+    loops = True
+
+    def __init__(self, text, width=16, step=0.3, pause=4.0, separator=MARQUEE_SEPARATOR):
+        self.separator = separator
+        super().__init__(text, width, step, pause)
+        if self.scrolls:
+            self.lead = max(0, round(pause / step)) * step
+
+    def _layout(self):
+        text, width = self.text, self.width
+        if len(text) <= width:
+            return (text.ljust(width),), (0,)
+        ring = text + self.separator
+        wrapped = ring + ring[:width]
+        return tuple(wrapped[pos:pos + width] for pos in range(len(ring))), tuple(range(len(ring)))
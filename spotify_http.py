@@ -0,0 +1,139 @@
+"""
+Spotify HTTP Module
+Pooled keep-alive session for the Spotify Web API, with cold/warm latency per call type
+"""
+
+import threading
+import time
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ReadTimeoutError
+from urllib3.util.retry import Retry
+from render_stats import Histogram
+
+# (connect, read) seconds: a dead Wi-Fi link fails fast instead of hanging a button press
+REQUEST_TIMEOUT = (3.05, 5.0)
+# api.spotify.com and accounts.spotify.com
+POOL_HOSTS = 2
+# Background poller and a button handler can be mid-request at once
+POOL_SIZE = 4
+
+# Latency buckets (ms): TLS handshakes on a Pi Zero over Wi-Fi run to hundreds of ms
+LATENCY_BUCKETS_MS = (10, 20, 50, 100, 200, 300, 500, 1000, 2000, 5000)
+
+class _OpenedCount(threading.local):
+    count = 0  # connections this thread's requests have opened
+
+_opened = _OpenedCount()
+
+class _CountingPool(HTTPConnectionPool):
+    def _new_conn(self):
+        # urllib3 opens a connection in the thread that needs it
+        _opened.count += 1
+        return super()._new_conn()
+
+class _CountingHTTPSPool(HTTPSConnectionPool):
+    def _new_conn(self):
+        _opened.count += 1
+        return super()._new_conn()
+
+class _CountingAdapter(HTTPAdapter):
+    """HTTPAdapter whose pools count new connections per thread"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {'http': _CountingPool, 'https': _CountingHTTPSPool}
+
+class _Retry(Retry):
+    """Retry that gives up at once when a response times out.
+
+    A dropped keep-alive connection fails straight away and is worth a
+    fresh try, but a read timeout has already spent the whole read
+    timeout: sending again would double how long the caller is stuck.
+    """
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        if isinstance(error, ReadTimeoutError):
+            raise error
+        return super().increment(method, url, response, error, _pool, _stacktrace)
+
+class TimedSession(requests.Session):
+    """requests.Session that times every call, split by call type and by
+    whether it had to open a new connection (cold) or reused a pooled
+    keep-alive one (warm).
+
+    A call is cold when its own thread opened a connection while it ran
+    (counted by the pools build_session() mounts), so calls in flight on
+    other threads at the same time don't affect it.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._latency_lock = threading.Lock()
+        self.latency = {}  # (call type, 'cold' | 'warm') -> Histogram
+        self.stats = {'connections_opened': 0}
+
+    def request(self, method, url, *args, **kwargs):
+        opened = _opened.count
+        started = time.perf_counter()
+        try:
+            return super().request(method, url, *args, **kwargs)
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000.0
+            new_connections = _opened.count - opened
+            self._record(call_type(method, url), 'cold' if new_connections else 'warm', elapsed_ms,
+                         new_connections)
+
+    def _record(self, kind, connection, elapsed_ms, new_connections=0):
+        with self._latency_lock:
+            self.stats['connections_opened'] += new_connections
+            key = (kind, connection)
+            if key not in self.latency:
+                self.latency[key] = Histogram(LATENCY_BUCKETS_MS)
+            self.latency[key].record(elapsed_ms)
+
+    def report(self):
+        """Cold vs warm latency per call type"""
+        with self._latency_lock:
+            rows = sorted(self.latency.items())
+            lines = [f"🌐 Spotify HTTP latency (cold = new connection, warm = keep-alive), "
+                     f"{self.stats['connections_opened']} connections opened"]
+            for (kind, connection), h in rows:
+                lines.append(f"  {kind:<28} {connection:<4} n={h.count:<5} mean {h.mean:.0f}ms  "
+                             f"p95 {h.percentile(95):.0f}ms  max {(h.max or 0):.0f}ms")
+        if len(lines) == 1:
+            lines.append("  (no calls yet)")
+        return '\n'.join(lines)
+
+def call_type(method, url):
+    """'GET me/player' style label for a Web API or accounts URL"""
+    parts = urlsplit(url)
+    path = parts.path
+    if path.startswith('/v1/'):
+        path = path[len('/v1/'):]
+    else:
+        path = parts.netloc.split('.')[0] + path
+    return f"{method.upper()} {path}"
+
+def build_session(pool_size=POOL_SIZE):
+    """Keep-alive session shared by the poller, button handlers and token refresh.
+
+    Failed connects are retried twice. A GET whose pooled connection the
+    router or Spotify dropped while idle fails as a read error, so GETs get
+    one read retry on a fresh connection; writes are never resent, and
+    neither is a GET whose response timed out (that already took the full
+    read timeout). Status codes are left to the caller.
+    A 429 is not slept on here: its Retry-After reaches api_guard through
+    spotipy's exception instead of blocking the calling thread.
+    """
+    session = TimedSession()
+    retry = _Retry(total=2, connect=2, read=1, status=0, backoff_factor=0.2,
+                   respect_retry_after_header=False,
+                   allowed_methods=frozenset(['GET']))
+    adapter = _CountingAdapter(pool_connections=POOL_HOSTS, pool_maxsize=pool_size, max_retries=retry)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers['Connection'] = 'keep-alive'
+    return session
@@ -1,14 +1,29 @@
 import spotipy
 from spotipy.oauth2 import SpotifyOAuth
 import os
+import threading
+from collections import deque
 from dotenv import load_dotenv
-import time
+from api_guard import COMMAND, ApiGuard
+from clock import get_clock
+from playback_state import PAUSED_TRACK_INFO, REPEAT_MODES, SETTLE_SECONDS, PlaybackState
+from spotify_http import REQUEST_TIMEOUT, build_session
+from token_cache import LockedFileCacheHandler, TokenRefresher
 
 # Load environment variables
 load_dotenv()
 
+class _Flight:
+    """One current_playback() request that concurrent callers wait on"""
+    def __init__(self, commands):
+        self.commands = commands  # playback commands sent before it started
+        self.done = threading.Event()
+        self.result = None
+
 class SpotifyManager:
-    def __init__(self):
+    def __init__(self, clock=None):
+        # Monotonic time source for cache expiry (injectable for tests)
+        self.clock = clock or get_clock()
         self.client_id = os.getenv('SPOTIPY_CLIENT_ID')
         self.client_secret = os.getenv('SPOTIPY_CLIENT_SECRET')
         self.redirect_uri = os.getenv('SPOTIPY_REDIRECT_URI')
@@ -22,6 +37,28 @@ class SpotifyManager:
         self.cache_timestamp = 0
         self.cache_duration = 10  # Cache for 10 seconds
         self.api_call_count = 0
+        # Cache, counters and the in-flight request are shared by the poller
+        # and button threads
+        self._lock = threading.Lock()
+        self._flight = None
+        self._commands_sent = 0
+        self.calls_saved = 0  # callers served by another caller's request
+        # Playback as last polled, with button commands applied ahead of the poll
+        self.playback = PlaybackState()
+        # Write calls go out in order on their own thread, so a button press
+        # never waits for the network
+        self._command_cond = threading.Condition()
+        self._queued_commands = deque()
+        self._command_busy = False
+        self._command_thread = None
+        # Call budget, Retry-After and circuit breaker for every Web API call
+        self.guard = ApiGuard(clock=self.clock)
+        # One keep-alive pool for every call (poller, buttons, token refresh),
+        # kept across reconnects
+        self.session = build_session()
+        # Token lives in memory; the refresher renews it before it expires
+        self.token_cache = LockedFileCacheHandler(".spotify_cache")
+        self.token_refresher = None
         
         self._authenticate()
     
@@ -33,38 +70,82 @@ class SpotifyManager:
                 client_secret=self.client_secret,
                 redirect_uri=self.redirect_uri,
                 scope=self.scope,
-                cache_path=".spotify_cache"
+                cache_handler=self.token_cache,
+                requests_session=self.session,
+                requests_timeout=REQUEST_TIMEOUT
             )
             
-            self.sp = spotipy.Spotify(auth_manager=auth_manager)
+            self.sp = spotipy.Spotify(auth_manager=auth_manager, requests_session=self.session,
+                                      requests_timeout=REQUEST_TIMEOUT)
             print("Spotify authentication successful!")
             
             # Test the connection
             self.get_current_track()
+
+            if self.token_refresher is None:
+                self.token_refresher = TokenRefresher(auth_manager, self.token_cache).start()
+            else:
+                self.token_refresher.auth_manager = auth_manager
             
         except Exception as e:
             print(f"Spotify authentication failed: {e}")
             self.sp = None
     
     def get_current_track(self, force_refresh=False):
-        """Get currently playing track information with smart caching"""
+        """Get currently playing track information with smart caching.
+
+        Callers that arrive while a request is already in flight wait for it
+        and share its result instead of sending their own - unless a playback
+        command went out after it started, in which case its answer may
+        predate the change.
+        """
         if not self.sp:
             return self.cached_track_info
         
-        current_time = time.time()
+        with self._lock:
+            current_time = self.clock.monotonic()
+            
+            # Check if we should use cached data
+            if not force_refresh and (current_time - self.cache_timestamp) < self.cache_duration:
+                return self.cached_track_info
+            
+            flight = self._flight
+            if flight is not None and flight.commands == self._commands_sent:
+                self.calls_saved += 1
+                leader = False
+            else:
+                flight = self._flight = _Flight(self._commands_sent)
+                leader = True
         
-        # Check if we should use cached data
-        if not force_refresh and (current_time - self.cache_timestamp) < self.cache_duration:
-            return self.cached_track_info
+        if not leader:
+            flight.done.wait()
+            return flight.result
         
-        # Time to make an API call
+        track_info = self.cached_track_info
+        try:
+            if not self.guard.allow():
+                # Over budget, rate limited or the API is down: keep showing the last good track
+                return track_info
+            
+            # Time to make an API call
+            call_number = self._count_call()
+            print(f"🔄 API Call #{call_number} - Fetching current track...")
+            track_info = self._fetch_current_track(current_time)
+            return track_info
+        finally:
+            with self._lock:
+                if self._flight is flight:
+                    self._flight = None
+            flight.result = track_info
+            flight.done.set()
+    
+    def _fetch_current_track(self, current_time):
         try:
-            print(f"🔄 API Call #{self.api_call_count + 1} - Fetching current track...")
-            self.api_call_count += 1
             current_track = self.sp.current_playback()
+            self.guard.succeeded()
             
             if current_track is None or not current_track.get('is_playing'):
-                track_info = {"title": "Nothing playing", "artist": "Paused or stopped", "track_id": None, "is_playing": False}
+                track_info = dict(PAUSED_TRACK_INFO)
             else:
                 track = current_track['item']
                 if track is None:
@@ -75,20 +156,34 @@ class SpotifyManager:
                     title = track['name']
                     artists = [artist['name'] for artist in track['artists']]
                     artist = ', '.join(artists)
-                    track_info = {"title": title, "artist": artist, "track_id": track_id, "is_playing": True}
+                    track_info = {"title": title, "artist": artist, "track_id": track_id, "is_playing": True,
+                                  # Same response: lets the display move the progress bar locally
+                                  "progress_ms": current_track.get('progress_ms'),
+                                  "duration_ms": track.get('duration_ms'),
+                                  "fetched_at": self.clock.monotonic()}
                     self.last_track_id = track_id
             
-            # Update cache
-            self.cached_track_info = track_info
-            self.cache_timestamp = current_time
+            # Confirm (or overrule) commands sent since the last poll
+            current_track = current_track or {}
+            track_info = self.playback.reconcile(track_info, current_track.get('shuffle_state'),
+                                                 current_track.get('repeat_state'), current_time)
+            
+            # Update cache (a slower, older request never overwrites a newer one)
+            with self._lock:
+                if current_time >= self.cache_timestamp:
+                    self.cached_track_info = track_info
+                    self.cache_timestamp = current_time
             
             return track_info
             
         except spotipy.exceptions.SpotifyException as e:
             print(f"Spotify API error: {e}")
+            if self.guard.failed(e):
+                return self.cached_track_info  # rate limited or server error: last good track
             return {"title": "API Error", "artist": "Check connection", "track_id": None, "is_playing": False}
         except Exception as e:
             print(f"Unexpected error: {e}")
+            self.guard.failed(e)
             return self.cached_track_info
     
     def has_track_changed(self, old_track, new_track):
@@ -116,60 +211,184 @@ class SpotifyManager:
         print("Refreshing Spotify connection...")
         self._authenticate()
     
-    def play_pause(self):
-        """Toggle play/pause - optimized to minimize API calls"""
+    def play_pause(self, on_rejected=None):
+        """Toggle play/pause - shown at once, the one write call goes out in the background.
+
+        Returns False if the command was not accepted; `on_rejected` runs
+        (on the command thread) if Spotify refuses it after all.
+        """
         if not self.sp:
             return False
-        try:
-            # First get current state to decide what to do
-            current = self.sp.current_playback()
-            self.api_call_count += 1
-            print(f"🔄 API Call #{self.api_call_count} - Checking playback state...")
-            
-            if current and current.get('is_playing'):
-                self.sp.pause_playback()
-                print("⏸️  Paused - no track change")
-            else:
-                self.sp.start_playback()
-                print("▶️  Playing - no track change")
-            
-            # No additional API call needed - play/pause doesn't change track!
+        is_playing = self.playback.is_playing
+        if is_playing is None:
+            # Never polled: ask Spotify which way to toggle, off the caller's thread too
+            if not self.guard.allow(COMMAND):
+                print(f"⏳ Play/pause not sent - Spotify API {self.guard.status_text()}")
+                return False
+            self._queue_command(lambda: self._toggle_after_read(on_rejected))
             return True
-        except Exception as e:
-            print(f"Play/pause error: {e}")
-            return False
+        return self._send_command(*self._toggle(is_playing), on_rejected)
     
-    def next_track(self):
-        """Skip to next track - track info will be refreshed by caller"""
+    def next_track(self, on_rejected=None):
+        """Skip to next track - the next poll picks up the new track"""
         if not self.sp:
             return False
-        try:
-            self.sp.next_track()
-            print("⏭️  Next track - caller will refresh track info")
-            return True
-        except Exception as e:
-            print(f"Next track error: {e}")
+        return self._send_command(self._skip_changes(), self.sp.next_track,
+                                  "⏭️  Next track - poller will refresh track info", "Next track", on_rejected)
+    
+    def previous_track(self, on_rejected=None):
+        """Skip to previous track - the next poll picks up the new track"""
+        if not self.sp:
             return False
+        # Spotify restarts the track instead if it is a few seconds in
+        return self._send_command(self._skip_changes('restart'), self.sp.previous_track,
+                                  "⏮️  Previous track - poller will refresh track info", "Previous track",
+                                  on_rejected)
     
-    def previous_track(self):
-        """Skip to previous track - track info will be refreshed by caller"""
+    def set_shuffle(self, state, on_rejected=None):
+        """Turn shuffle on or off"""
         if not self.sp:
             return False
+        return self._send_command({'shuffle': bool(state)}, lambda: self.sp.shuffle(bool(state)),
+                                  f"🔀 Shuffle {'on' if state else 'off'}", "Shuffle", on_rejected)
+    
+    def set_repeat(self, mode, on_rejected=None):
+        """Set repeat to 'off', 'context' or 'track'"""
+        if not self.sp or mode not in REPEAT_MODES:
+            return False
+        return self._send_command({'repeat': mode}, lambda: self.sp.repeat(mode),
+                                  f"🔁 Repeat {mode}", "Repeat", on_rejected)
+    
+    def flush_commands(self, timeout=None):
+        """Wait until every accepted command has been sent (or refused)"""
+        with self._command_cond:
+            return self._command_cond.wait_for(
+                lambda: not self._queued_commands and not self._command_busy, timeout)
+    
+    def _toggle(self, is_playing):
+        if is_playing:
+            return ({'is_playing': False}, self.sp.pause_playback, "⏸️  Paused - no track change", "Play/pause")
+        return ({'is_playing': True}, self.sp.start_playback, "▶️  Playing - no track change", "Play/pause")
+    
+    def _toggle_after_read(self, on_rejected):
         try:
-            self.sp.previous_track()
-            print("⏮️  Previous track - caller will refresh track info")
-            return True
+            current = self.sp.current_playback()
+            self.guard.succeeded()
+            call_number = self._count_call()
+            print(f"🔄 API Call #{call_number} - Checking playback state...")
         except Exception as e:
-            print(f"Previous track error: {e}")
+            print(f"Play/pause error: {e}")
+            self.guard.failed(e)
+            if on_rejected:
+                on_rejected()
+            return
+        changes, call, message, label = self._toggle(bool(current and current.get('is_playing')))
+        if not self.guard.allow(COMMAND):
+            print(f"⏳ {label} not sent - Spotify API {self.guard.status_text()}")
+            return
+        self._apply_command(self.playback.apply(changes, self.clock.monotonic()))
+        self._write(changes, call, message, label, on_rejected)
+    
+    def _skip_changes(self, field='track'):
+        # Spotify starts playing on a skip; the track must differ from the one playing now
+        # (or, for 'restart', may also start over)
+        changes = {'is_playing': True}
+        track = self.playback.track
+        if track and track.get('track_id'):
+            changes[field] = track['track_id']
+        return changes
+    
+    def _send_command(self, changes, call, message, label, on_rejected=None):
+        """Apply a command to the local playback state, then queue its one write call"""
+        if not self.guard.allow(COMMAND):
+            print(f"⏳ {label} not sent - Spotify API {self.guard.status_text()}")
             return False
+        self._apply_command(self.playback.apply(changes, self.clock.monotonic()))
+        self._queue_command(lambda: self._write(changes, call, message, label, on_rejected))
+        return True
+    
+    def _write(self, changes, call, message, label, on_rejected):
+        """Send a command's write call (command thread); undo it locally if Spotify refuses"""
+        try:
+            call()
+            self.guard.succeeded()
+            call_number = self._count_call()
+            print(f"{message} (API Call #{call_number})")
+        except Exception as e:
+            print(f"{label} error: {e}")
+            self.guard.failed(e)
+            self._apply_command(self.playback.reject(changes))
+            if on_rejected:
+                on_rejected()
+    
+    def _queue_command(self, job):
+        with self._command_cond:
+            self._queued_commands.append(job)
+            if self._command_thread is None:
+                self._command_thread = threading.Thread(target=self._run_commands, name='spotify-commands',
+                                                        daemon=True)
+                self._command_thread.start()
+            self._command_cond.notify_all()
+    
+    def _run_commands(self):
+        while True:
+            with self._command_cond:
+                self._command_cond.wait_for(lambda: self._queued_commands)
+                job = self._queued_commands.popleft()
+                self._command_busy = True
+            try:
+                job()
+            except Exception as e:
+                print(f"Spotify command error: {e}")
+            finally:
+                with self._command_cond:
+                    self._command_busy = False
+                    self._command_cond.notify_all()
+    
+    def _apply_command(self, track_info):
+        now = self.clock.monotonic()
+        with self._lock:
+            # Requests already in flight may answer with the old state: later callers must not join them
+            self._commands_sent += 1
+            if track_info is not None:
+                self.cached_track_info = track_info
+            # Serve the local state until the command has settled, then let the next poll reconcile it
+            self.cache_timestamp = now + SETTLE_SECONDS - self.cache_duration
+    
+    def _count_call(self):
+        with self._lock:
+            self.api_call_count += 1
+            return self.api_call_count
     
     def get_api_call_count(self):
         """Get the number of API calls made this session"""
         return self.api_call_count
     
+    def get_api_headroom(self):
+        """Call budget left, or why calls are held back (for the debug page)"""
+        return self.guard.status_text()
+    
+    def get_calls_saved(self):
+        """Get the number of track fetches served by a request already in flight"""
+        return self.calls_saved
+    
     def reset_api_call_count(self):
         """Reset the API call counter"""
-        self.api_call_count = 0
+        with self._lock:
+            self.api_call_count = 0
+            self.calls_saved = 0
+
+    def playback_report(self):
+        """Commands sent and how the following polls agreed with them"""
+        return self.playback.report()
+
+    def guard_report(self):
+        """Call budget use, rate limiting and circuit breaker activity"""
+        return self.guard.report()
+
+    def latency_report(self):
+        """Cold vs warm HTTP latency per call type"""
+        return self.session.report()
 
 # Global instance
 spotify_manager = None
@@ -58,11 +58,12 @@ def test_setup():
     
     # Test playback controls (optimized usage)
     print("\n🎮 Testing Optimized Playback Controls...")
-    print("Testing play/pause (should only check state, not refresh track):")
+    print("Testing play/pause (one write call, state known from the last poll):")
     api_before = spotify.get_api_call_count()
     spotify.play_pause()
+    spotify.flush_commands(10)  # the write call goes out on the command thread
     api_after = spotify.get_api_call_count()
-    print(f"📊 API calls: {api_before} → {api_after} (only +1 for state check)")
+    print(f"📊 API calls: {api_before} → {api_after} (only +1 for the pause/play call)")
     
     print("\n🎉 All tests passed!")
     print(f"📈 Final API call count: {spotify.get_api_call_count()}")
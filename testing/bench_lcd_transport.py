@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Benchmark LCD transports on real hardware
+Compares chars/sec of RPLCD's byte-per-transaction path with the packed PCF8574 transport
+"""
+
+import sys
+import os
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ADDRESS = 0x27
+LINES = 200  # full 16-char lines written per transport
+
+def _bench(name, driver):
+    """Write LINES full lines alternating between both rows"""
+    text_a = "Packed I2C bench"
+    text_b = "0123456789ABCDEF"
+    start = time.perf_counter()
+    for i in range(LINES):
+        driver.cursor_pos = (i % 2, 0)
+        driver.write_string(text_a if i % 4 < 2 else text_b)
+    elapsed = time.perf_counter() - start
+    chars = LINES * 16
+    print(f"  {name:<8} {chars} chars in {elapsed:.3f}s -> {chars / elapsed:,.0f} chars/sec")
+    return chars / elapsed
+
+def run_benchmark():
+    print("⏱️  LCD Transport Throughput Benchmark")
+    print("=" * 50)
+
+    from RPLCD.i2c import CharLCD
+    rplcd = CharLCD('PCF8574', ADDRESS, cols=16, rows=2)
+    rplcd.clear()
+    stock = _bench("rplcd", rplcd)
+    rplcd.close(clear=True)
+
+    from lcd_transport import PackedPCF8574
+    packed_driver = PackedPCF8574(ADDRESS)
+    packed = _bench("packed", packed_driver)
+    print(f"  packed transactions: {packed_driver.stats['transactions']}, "
+          f"bus bytes: {packed_driver.stats['bus_bytes']}")
+    packed_driver.clear()
+    packed_driver.close()
+
+    print(f"\n🚀 Speedup: {packed / stock:.1f}x")
+
+if __name__ == "__main__":
+    run_benchmark()
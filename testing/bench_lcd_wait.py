@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Benchmark LCD command latency on real hardware
+Measures clear/home/write latency with RPLCD, packed timed waits and packed busy-flag polling
+"""
+
+import sys
+import os
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ADDRESS = 0x27
+ROUNDS = 100
+
+def _latency(operation):
+    """Average milliseconds per call over ROUNDS calls"""
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        operation()
+    return (time.perf_counter() - start) * 1000 / ROUNDS
+
+def _bench(name, driver):
+    def write():
+        driver.cursor_pos = (0, 0)
+        driver.write_string("Latency bench 16")
+
+    results = {
+        'clear': _latency(driver.clear),
+        'home': _latency(driver.home),
+        'write': _latency(write),
+    }
+    print(f"  {name:<18} clear {results['clear']:.2f}ms | home {results['home']:.2f}ms | "
+          f"16-char write {results['write']:.2f}ms")
+    return results
+
+def run_benchmark():
+    print("⏱️  LCD Wait Strategy Latency Benchmark")
+    print("=" * 60)
+
+    from RPLCD.i2c import CharLCD
+    rplcd = CharLCD('PCF8574', ADDRESS, cols=16, rows=2)
+    _bench("rplcd (fixed)", rplcd)
+    rplcd.close(clear=True)
+
+    from lcd_transport import PackedPCF8574, WAIT_TIMED, WAIT_BUSY_FLAG
+    for strategy in (WAIT_TIMED, WAIT_BUSY_FLAG):
+        driver = PackedPCF8574(ADDRESS, wait_strategy=strategy)
+        _bench(f"packed ({strategy})", driver)
+        if driver.wait_strategy != strategy:
+            print("  ⚠️ Busy flag readback unavailable on this backpack - numbers above are timed waits")
+        else:
+            print(f"  busy-flag polls: {driver.stats['busy_polls']}")
+        driver.clear()
+        driver.close()
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark main loop wakeups and CPU use
+Compares the old fixed 50 ms sleep with the deadline-driven frame scheduler
+"""
+
+import sys
+import os
+import io
+import time
+from contextlib import redirect_stdout
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app_state
+from display_effects import update_display_with_effects, next_frame_deadline
+from frame_scheduler import FrameScheduler
+from lcd import LCD
+from render_stats import get_render_stats
+
+DURATION = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0  # seconds per run
+
+def _setup_clock():
+    app_state.set_display_mode(2)
+
+def _setup_static():
+    app_state.set_display_mode(1)
+    app_state.current_track = {'title': "Short Song", 'artist': "Artist"}
+
+def _setup_scrolling():
+    app_state.set_display_mode(1)
+    app_state.current_track = {'title': "A Very Long Song Title That Needs Scrolling", 'artist': "Artist"}
+
+def _run(setup, deadline_driven):
+    lcd = LCD(transport='emulator', wait_strategy='busy_flag')
+    app_state.display_state.update({'content_line1': '', 'content_line2': ''})
+    setup()
+    scheduler = FrameScheduler()
+    get_render_stats().reset()
+    wakeups = 0
+    end = time.monotonic() + DURATION
+    cpu_start = time.process_time()
+    with redirect_stdout(io.StringIO()):
+        while time.monotonic() < end:
+            update_display_with_effects(lcd)
+            wakeups += 1
+            if deadline_driven:
+                scheduler.sleep_until(next_frame_deadline(), end)
+            else:
+                time.sleep(0.05)
+    cpu = time.process_time() - cpu_start
+    return wakeups / DURATION, 100.0 * cpu / DURATION, get_render_stats().snapshot()
+
+def run_benchmark():
+    print("⏱️  Main Loop Wakeup Benchmark (emulated LCD)")
+    print("=" * 66)
+    print(f"  {DURATION:.0f}s per run\n")
+    print(f"  {'scenario':<14} {'fixed 50ms':>22}   {'deadline-driven':>22}")
+    for name, setup in (("clock", _setup_clock), ("static", _setup_static), ("scrolling", _setup_scrolling)):
+        fixed = _run(setup, deadline_driven=False)
+        driven = _run(setup, deadline_driven=True)
+        print(f"  {name:<14} {fixed[0]:>6.1f} wakeups/s {fixed[1]:>5.1f}% CPU   "
+              f"{driven[0]:>6.1f} wakeups/s {driven[1]:>5.1f}% CPU")
+    # Scroll cadence against the 0.3 s grid, from the last (scrolling) runs
+    for label, run in (("fixed 50ms", fixed), ("deadline-driven", driven)):
+        jitter = run[2]['scroll_jitter_ms']
+        print(f"  scroll jitter ({label}): p50 {jitter['p50']:.1f}ms  p95 {jitter['p95']:.1f}ms  max {jitter['max']:.1f}ms")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark the render pipeline against the headless HD44780 emulator
+Reports frames/sec of display_effects and the I2C bytes each scenario puts on the bus
+"""
+
+import sys
+import os
+import io
+import time
+from contextlib import redirect_stdout
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app_state
+import display_effects
+from clock import VirtualClock, set_clock
+from lcd import LCD
+
+FRAME_INTERVAL = 0.05  # main loop tick
+FRAMES = 2000
+
+def _setup_now_playing(title, artist):
+    app_state.set_display_mode(1)
+    app_state.current_track = {'title': title, 'artist': artist}
+
+def _setup_clock():
+    app_state.set_display_mode(2)
+
+def _run(name, setup, hardware_scroll=True, track_change_every=None):
+    lcd = LCD(transport='emulator', wait_strategy='busy_flag')
+    bus = lcd.lcd.bus
+    bus.record_events = False
+    app_state.display_settings['hardware_scroll'] = hardware_scroll
+    app_state.display_state.update({'content_line1': '', 'content_line2': ''})
+    setup()
+
+    clock = VirtualClock()
+    previous = set_clock(clock)
+    start_bytes = bus.stats['bus_bytes']
+    start = time.perf_counter()
+    # Keep the app's per-event logging out of the timings
+    try:
+        with redirect_stdout(io.StringIO()):
+            for frame in range(FRAMES):
+                if track_change_every and frame % track_change_every == 0:
+                    app_state.current_track = {'title': f"Track number {frame}", 'artist': "Bench Artist"}
+                display_effects.update_display_with_effects(lcd)
+                clock.sleep(FRAME_INTERVAL)
+    finally:
+        set_clock(previous)
+    elapsed = time.perf_counter() - start
+
+    bus_bytes = bus.stats['bus_bytes'] - start_bytes
+    simulated = FRAMES * FRAME_INTERVAL
+    print(f"  {name:<22} {FRAMES / elapsed:>9,.0f} frames/sec  "
+          f"{bus_bytes / FRAMES:>7.1f} bus bytes/frame  "
+          f"{bus_bytes / simulated:>8,.0f} bus bytes/sec")
+    return bus_bytes
+
+def run_benchmark():
+    print("⏱️  Render Pipeline Benchmark (emulated HD44780)")
+    print("=" * 70)
+    print(f"  {FRAMES} frames at {FRAME_INTERVAL * 1000:.0f} ms per tick\n")
+
+    long_title = "A Very Long Song Title That Needs Scrolling"
+    long_artist = "An Artist With A Long Name Too"
+
+    _run("clock page", _setup_clock)
+    _run("static now playing", lambda: _setup_now_playing("Short Song", "Artist"))
+    _run("scroll (software)", lambda: _setup_now_playing(long_title, long_artist), hardware_scroll=False)
+    _run("scroll (hw shift)", lambda: _setup_now_playing(long_title[:30], long_artist[:30]))
+    _run("slide transitions", lambda: _setup_now_playing("Short Song", "Artist"), track_change_every=100)
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Benchmark Spotify Web API latency over cold and warm connections
+Compares a fresh connection per call (TCP + TLS handshake every time) with the pooled keep-alive session
+"""
+
+import sys
+import os
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CALLS = 10     # playback reads per run
+INTERVAL = 1.0  # seconds between calls, like closely spaced polls and button presses
+
+def _client(session):
+    import spotipy
+    from spotipy.oauth2 import SpotifyOAuth
+    from spotify_http import REQUEST_TIMEOUT
+    from token_cache import LockedFileCacheHandler
+    auth_manager = SpotifyOAuth(
+        scope="user-read-playback-state",
+        cache_handler=LockedFileCacheHandler(".spotify_cache"),
+        requests_session=session,
+        requests_timeout=REQUEST_TIMEOUT,
+        open_browser=False,
+    )
+    return spotipy.Spotify(auth_manager=auth_manager, requests_session=session,
+                           requests_timeout=REQUEST_TIMEOUT)
+
+def _run(name, new_session_per_call):
+    from spotify_http import build_session
+    shared = build_session()
+    timings = []
+    for _ in range(CALLS):
+        session = build_session() if new_session_per_call else shared
+        client = _client(session)
+        start = time.perf_counter()
+        client.current_playback()
+        timings.append((time.perf_counter() - start) * 1000.0)
+        if new_session_per_call:
+            session.close()
+        time.sleep(INTERVAL)
+    timings.sort()
+    print(f"  {name:<22} median {timings[len(timings) // 2]:.0f}ms  "
+          f"min {timings[0]:.0f}ms  max {timings[-1]:.0f}ms")
+    return shared
+
+def run_benchmark():
+    from dotenv import load_dotenv
+    load_dotenv()
+    print("⏱️  Spotify API Latency Benchmark (cold vs warm connections)")
+    print("=" * 60)
+    _run("new connection/call", new_session_per_call=True)
+    pooled = _run("pooled keep-alive", new_session_per_call=False)
+    print()
+    print(pooled.report())
+
+if __name__ == "__main__":
+    run_benchmark()
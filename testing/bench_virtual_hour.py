@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Simulate an hour of the player on a virtual clock
+Runs scrolling, background polling and auto-sleep logic against a headless LCD in well under a second
+"""
+
+import sys
+import os
+import io
+import time
+from contextlib import redirect_stdout
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app_state
+from api_guard import ApiGuard
+from background_tasks import poll_once
+from poll_scheduler import PollScheduler
+from clock import VirtualClock, set_clock
+from display_effects import update_display_with_effects, next_frame_deadline
+from frame_scheduler import FrameScheduler
+from lcd import LCD
+
+SIMULATED_SECONDS = 3600
+TRACK_LENGTH = 200      # seconds per track
+PLAYING_FOR = 45 * 60   # music stops after 45 minutes
+
+class NullDisplay:
+    """CharLCD-style backend that discards writes (LCD.stats still counts bytes)"""
+    cursor_pos = (0, 0)
+
+    def write(self, code):
+        pass
+
+    def command(self, value):
+        pass
+
+    def clear(self):
+        pass
+
+    def create_char(self, location, bitmap):
+        pass
+
+class FakeSpotify:
+    """Plays a long-titled track every TRACK_LENGTH seconds, then stops"""
+    def __init__(self, clock):
+        self.clock = clock
+        self.start = clock.monotonic()
+        self.api_calls = 0
+        self.guard = ApiGuard(clock=clock)
+
+    def get_current_track(self, force_refresh=False):
+        if not self.guard.allow():
+            return None
+        self.api_calls += 1
+        elapsed = self.clock.monotonic() - self.start
+        if elapsed >= PLAYING_FOR:
+            return {"title": "Nothing playing", "artist": "Paused or stopped", "track_id": None, "is_playing": False}
+        n = int(elapsed // TRACK_LENGTH)
+        return {"title": f"Track {n} with a title long enough to scroll", "artist": f"Artist {n}",
+                "track_id": f"id{n}", "is_playing": True,
+                "progress_ms": int((elapsed % TRACK_LENGTH) * 1000), "duration_ms": TRACK_LENGTH * 1000,
+                "fetched_at": self.clock.monotonic()}
+
+    def has_track_changed(self, old_track, new_track):
+        if old_track is None or new_track is None:
+            return True
+        return old_track.get('track_id') != new_track.get('track_id')
+
+def run_benchmark():
+    print("⏱️  Virtual Hour Simulation")
+    print("=" * 50)
+
+    clock = VirtualClock()
+    previous = set_clock(clock)
+    lcd = LCD(backend=NullDisplay())
+    scheduler = FrameScheduler(clock=clock)
+    spotify = FakeSpotify(clock)
+    poller = PollScheduler(clock)
+
+    app_state.set_display_mode(1)
+    app_state.display_state.update({'content_line1': '', 'content_line2': ''})
+    app_state.music_state.update({'is_playing': False, 'last_playing_time': clock.monotonic(), 'stopped_duration': 0})
+    app_state.current_track = None
+
+    start = clock.monotonic()
+    end = start + SIMULATED_SECONDS
+    next_poll = start
+    frames = 0
+    mode_changes = []
+    real_start = time.perf_counter()
+    try:
+        with redirect_stdout(io.StringIO()):
+            while clock.monotonic() < end:
+                if clock.monotonic() >= next_poll:
+                    mode = app_state.get_current_mode()
+                    next_poll = clock.monotonic() + poll_once(spotify, poller)
+                    if app_state.get_current_mode() != mode:
+                        mode_changes.append((clock.monotonic() - start, app_state.get_current_mode()))
+                update_display_with_effects(lcd)
+                frames += 1
+                scheduler.sleep_until(next_frame_deadline(), next_poll, end)
+    finally:
+        set_clock(previous)
+    real = time.perf_counter() - real_start
+
+    print(f"  Simulated:      {SIMULATED_SECONDS / 60:.0f} minutes in {real:.3f}s real time")
+    print(f"  Render wakeups: {frames} ({frames / SIMULATED_SECONDS:.2f}/sec)")
+    print(f"  API calls:      {spotify.api_calls}")
+    print(poller.report())
+    print(f"  LCD bytes sent: {lcd.stats['bytes_sent']:,}")
+    for at, mode in mode_changes:
+        print(f"  Mode change:    {mode} at {at / 60:.1f} min")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Tests for the animation engine
+Sequencing, cancellation, frame budgets and write deduplication on a virtual clock
+"""
+
+from animation import Animator, AnimationContext, Marquee, Pause, Sequence, StepEffect
+
+class MockSink:
+    """Display sink that records every line write"""
+    def __init__(self):
+        self.writes = []
+
+    def write_line(self, text, line=0):
+        self.writes.append((line, text))
+
+class MockMarqueeSink(MockSink):
+    """Sink with hardware scrolling support"""
+    def __init__(self):
+        super().__init__()
+        self.marquees = []
+        self.offsets = []
+
+    def load_marquee(self, lines):
+        self.marquees.append(tuple(lines))
+
+    def set_display_offset(self, offset):
+        self.offsets.append(offset)
+
+def counter(ctx, frames, hold):
+    """Frames '0', '1', ... held `hold` seconds each"""
+    for i in range(frames):
+        yield (str(i).ljust(ctx.width),), hold
+
+def test_sequence_runs_effects_back_to_back():
+    animator = Animator(width=4)
+    animator.set_content(('done',))
+    animator.play(Sequence(StepEffect(counter, name='count', frames=3, hold=0.1), Pause(1.0)), 100.0)
+    sink = MockSink()
+
+    assert animator.is_playing('count')
+    animator.render(sink, 100.0)
+    assert abs(animator.next_deadline() - 100.1) < 1e-9
+    animator.render(sink, 100.1)
+    animator.render(sink, 100.2)
+    # Counter ends at 100.3; the pause starts on time and shows the content
+    animator.render(sink, 100.3)
+    assert animator.is_playing('pause')
+    assert sink.writes[-1] == (0, 'done')
+    # Only a pause is left, so there is nothing to wake up for
+    assert animator.next_deadline() is None
+    animator.render(sink, 101.3)
+    assert not animator.is_playing('pause')
+    assert [text for _, text in sink.writes] == ['0   ', '1   ', '2   ', 'done']
+
+def test_late_tick_shows_newest_frame_only():
+    animator = Animator(width=4)
+    animator.play(StepEffect(counter, frames=10, hold=0.1, budget=4), 0.0)
+    sink = MockSink()
+    animator.render(sink, 0.0)
+    # Three frames overdue: stepped through, only the last is written
+    animator.render(sink, 0.3)
+    assert sink.writes == [(0, '0   '), (0, '3   ')]
+    # A stall longer than the budget skips ahead instead of replaying
+    animator.render(sink, 5.0)
+    assert sink.writes[-1] == (0, '7   ')
+    assert animator.next_deadline() == 5.0
+
+def test_cancel_stops_frames_and_closes_generator():
+    closed = []
+
+    def forever(ctx):
+        try:
+            while True:
+                yield ('x',), 0.1
+        finally:
+            closed.append(True)
+
+    animator = Animator(width=1)
+    animator.play(StepEffect(forever, name='forever'), 0.0)
+    animator.render(MockSink(), 0.0)
+    animator.play(Pause(1.0), 0.05)
+    assert closed == [True]
+    assert not animator.is_playing('forever')
+
+def test_unchanged_frames_are_not_rewritten():
+    animator = Animator(width=4)
+    animator.set_content(('same',))
+    animator.play(Pause(10.0), 0.0)
+    sink = MockSink()
+    for tick in range(20):
+        animator.render(sink, tick * 0.1)
+    assert len(sink.writes) == 1
+    assert animator.stats['frames_written'] == 1
+    # Content updates in place reach the running effect
+    animator.set_content(('new!',))
+    animator.render(sink, 2.0)
+    assert sink.writes[-1] == (0, 'new!')
+
+def test_marquee_frames_use_display_shift():
+    def marquee(ctx):
+        for offset in range(3):
+            yield Marquee(ctx.lines, offset), 0.3
+
+    animator = Animator(width=4)
+    animator.set_content(('abcdef', 'ghijkl'))
+    animator.play(StepEffect(marquee), 0.0)
+    sink = MockMarqueeSink()
+    for tick in range(3):
+        animator.render(sink, tick * 0.3)
+    assert sink.offsets == [0, 1, 2]
+    assert sink.writes == []
+    assert animator.visible_lines() == ('cdef', 'ijkl')
+
+def test_marquee_lines_loop_in_software():
+    from display_effects import ScrollEffect
+    from scroll_frames import MARQUEE_SEPARATOR
+
+    class HardwareSink(MockMarqueeSink):
+        def can_hardware_scroll(self, line):
+            return True
+
+    animator = Animator(width=4)
+    animator.set_content(('abcdef', 'ghijkl'))
+    animator.play(ScrollEffect(step=0.3, pause=0.0, loops=(True, False)), 0.0)
+    sink = HardwareSink()
+    for tick in range(8):
+        animator.render(sink, tick * 0.3)
+    # Line 1 came round through the separator; the display shift was never used
+    ring = 'abcdef' + MARQUEE_SEPARATOR
+    assert animator.visible_lines()[0] == (ring + ring)[7:11]
+    assert sink.offsets == [] and sink.marquees == []
+
+def test_marquee_pages_from_environment():
+    import io
+    import os
+    from contextlib import redirect_stdout
+    import app_state
+    from display_effects import marquee_lines
+
+    os.environ['LCD_MARQUEE_PAGES'] = 'now_playing:1, debug, clock:3'
+    try:
+        with redirect_stdout(io.StringIO()) as out:
+            app_state.load_display_settings()
+        assert marquee_lines('now_playing') == (True, False)
+        assert marquee_lines('debug') == (True, True)
+        assert marquee_lines('welcome') == ()
+        # Unknown line numbers are reported, not guessed at
+        assert marquee_lines('clock') == ()
+        assert 'clock:3' in out.getvalue()
+    finally:
+        del os.environ['LCD_MARQUEE_PAGES']
+        app_state.display_settings['marquee'] = {}
+
+def test_context_pads_content():
+    ctx = AnimationContext(width=4, lines=('ab', 'abcdef'))
+    assert ctx.padded() == ('ab  ', 'abcd')
+
+if __name__ == "__main__":
+    print("🧪 Running animation tests...")
+    test_sequence_runs_effects_back_to_back()
+    test_late_tick_shows_newest_frame_only()
+    test_cancel_stops_frames_and_closes_generator()
+    test_unchanged_frames_are_not_rewritten()
+    test_marquee_frames_use_display_shift()
+    test_marquee_lines_loop_in_software()
+    test_marquee_pages_from_environment()
+    test_context_pads_content()
+    print("🎉 All animation tests passed!")
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Tests for the Spotify API guard
+Call budget with command priority, Retry-After, jittered backoff and the circuit breaker
+"""
+
+import io
+import threading
+import time
+from contextlib import redirect_stdout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import spotipy
+from spotipy.exceptions import SpotifyException
+import spotify_manager
+from api_guard import COMMAND, POLL, ApiGuard, poll_priority
+from clock import VirtualClock
+from spotify_http import build_session
+
+def _error(status, retry_after=None):
+    headers = {'Retry-After': retry_after} if retry_after is not None else None
+    return SpotifyException(status, -1, f"HTTP {status}", headers=headers)
+
+class RateLimitedHandler(BaseHTTPRequestHandler):
+    """Answers every call with 429 and a long Retry-After"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = b'{"error": {"status": 429, "message": "API rate limit exceeded"}}'
+        self.send_response(429)
+        self.send_header('Retry-After', '30')
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class MockClient:
+    """spotipy.Spotify that plays one track until `error` is set"""
+    def __init__(self):
+        self.calls = 0
+        self.error = None
+
+    def current_playback(self):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return {'is_playing': True, 'progress_ms': 1000,
+                'item': {'id': 'id1', 'name': 'Song', 'artists': [{'name': 'Artist'}], 'duration_ms': 200_000}}
+
+def test_budget_keeps_room_for_commands():
+    clock = VirtualClock()
+    guard = ApiGuard(budget=5, window=30, reserve=2, clock=clock)
+    assert [guard.allow(POLL) for _ in range(4)] == [True, True, True, False]
+    assert guard.headroom() == 2
+    # Button presses still get through
+    assert guard.allow(COMMAND) and guard.allow(COMMAND)
+    assert not guard.allow(COMMAND)
+    assert guard.status_text() == "0/5 free"
+    clock.advance(30)
+    assert guard.allow(POLL)
+    assert guard.stats['over_budget'] == 2
+
+def test_retry_after_holds_every_call():
+    clock = VirtualClock()
+    guard = ApiGuard(budget=30, clock=clock)
+    with redirect_stdout(io.StringIO()):
+        assert guard.failed(_error(429, '12'))
+    assert not guard.allow(COMMAND)
+    assert guard.status_text() == "429 wait 12s"
+    clock.advance(11.9)
+    assert not guard.allow(POLL)
+    clock.advance(0.1)
+    assert guard.allow(POLL)
+    # Not a health signal: a 404 (no active device) leaves the guard alone
+    assert not guard.failed(_error(404))
+    assert guard.allow(COMMAND)
+
+def test_backoff_then_breaker_then_trial():
+    clock = VirtualClock()
+    guard = ApiGuard(budget=30, clock=clock, jitter=lambda: 0.0)  # jitter at its minimum: half the delay
+    with redirect_stdout(io.StringIO()):
+        guard.failed(_error(503))
+        # Polls back off, commands still go out
+        assert not guard.allow(POLL) and guard.allow(COMMAND)
+        clock.advance(1.0)
+        assert guard.allow(POLL)
+        guard.failed(_error(502))
+        guard.failed(ConnectionError("network down"))
+        assert guard.breaker_open
+        assert not guard.allow(COMMAND)  # breaker open: everything waits
+        assert guard.status_text() == "down 4s"
+        clock.advance(4.0)
+        # Half-open: one trial call, the rest wait for its answer
+        assert guard.allow(POLL)
+        assert not guard.allow(COMMAND)
+        guard.succeeded()
+    assert not guard.breaker_open and guard.allow(POLL)
+    assert guard.stats['breaker_opened'] == 1
+
+def test_manager_shows_last_good_track_while_unhealthy():
+    clock = VirtualClock()
+    client = MockClient()
+    original = (spotify_manager.spotipy.Spotify, spotify_manager.SpotifyOAuth)
+    spotify_manager.spotipy.Spotify = lambda **kwargs: client
+    spotify_manager.SpotifyOAuth = lambda **kwargs: None
+    try:
+        with redirect_stdout(io.StringIO()):
+            manager = spotify_manager.SpotifyManager(clock=clock)
+    finally:
+        spotify_manager.spotipy.Spotify, spotify_manager.SpotifyOAuth = original
+    manager.token_refresher.stop()
+    client.error = _error(500)
+    with redirect_stdout(io.StringIO()), poll_priority():
+        for _ in range(20):
+            track = manager.get_current_track(force_refresh=True)
+            assert track['title'] == 'Song'  # never the "API Error" placeholder
+            clock.advance(1.0)
+    # Backoff and the open breaker kept most polls off the failing API
+    assert client.calls < 8
+    assert manager.guard.breaker_open
+    assert manager.get_api_headroom().startswith('down')
+    client.error = None
+    clock.advance(120)
+    with redirect_stdout(io.StringIO()):
+        manager.get_current_track(force_refresh=True)
+    assert not manager.guard.breaker_open
+    assert manager.get_api_headroom().endswith('free')
+
+def test_retry_after_not_slept_in_session():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), RateLimitedHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        client = spotipy.Spotify(auth='token', requests_session=build_session(), retries=0)
+        client.prefix = f"http://127.0.0.1:{server.server_address[1]}/v1/"
+        started = time.perf_counter()
+        try:
+            client.current_playback()
+            raise AssertionError("expected a 429")
+        except SpotifyException as e:
+            error = e
+        # The 429 comes straight back with its header, for the guard to honor
+        assert time.perf_counter() - started < 5
+        assert error.http_status == 429
+        assert error.headers['Retry-After'] == '30'
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    print("🧪 Running API guard tests...")
+    test_budget_keeps_room_for_commands()
+    test_retry_after_holds_every_call()
+    test_backoff_then_breaker_then_trial()
+    test_manager_shows_last_good_track_while_unhealthy()
+    test_retry_after_not_slept_in_session()
+    print("🎉 All API guard tests passed!")
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Tests for the big-digit clock
+Draws HH:MM from CGRAM bar glyphs on the emulated LCD
+"""
+
+import io
+import os
+from contextlib import redirect_stdout
+from datetime import datetime
+import app_state
+from big_clock import BAR_GLYPHS, BigClockEffect
+from clock import VirtualClock, set_clock
+from display_effects import animator, update_display_with_effects, next_frame_deadline
+from lcd import LCD
+
+def _run_clock(lcd, clock, seconds):
+    """Tick the render loop on its deadlines for `seconds` of virtual time"""
+    end = clock.monotonic() + seconds
+    with redirect_stdout(io.StringIO()):
+        while clock.monotonic() < end:
+            update_display_with_effects(lcd)
+            clock.sleep(min(next_frame_deadline(), end) - clock.monotonic())
+
+def _show_clock(wall_start):
+    clock = VirtualClock(wall_start=wall_start)
+    lcd = LCD(transport='emulator', wait_strategy='busy_flag')
+    app_state.display_settings['big_clock'] = True
+    app_state.display_state.update({'content_line1': '', 'content_line2': ''})
+    app_state.set_display_mode(app_state.DISPLAY_MODES.index('clock'))
+    return clock, lcd
+
+def test_digits_drawn_from_bar_glyphs():
+    clock, lcd = _show_clock(datetime(2026, 5, 1, 12, 34, 0).timestamp())
+    previous = set_clock(clock)
+    try:
+        _run_clock(lcd, clock, 0.5)
+        assert animator.is_playing('big_clock')
+        controller = lcd.lcd.bus.controller
+        # The bar glyphs are in CGRAM
+        resident = {controller.glyph(lcd.cgram.code(name)) for name in BAR_GLYPHS}
+        assert resident == set(BAR_GLYPHS.values())
+        top, bottom = controller.visible_lines()
+        top_code = chr(lcd.cgram.code('bar_top'))
+        # '1' is bar_top + full block on the top row, after the left margin
+        assert top[1:3] == top_code + '\xff'
+        assert len(top) == len(bottom) == 16
+    finally:
+        app_state.display_settings['big_clock'] = False
+        set_clock(previous)
+
+def test_only_changed_digits_each_minute():
+    clock, lcd = _show_clock(datetime(2026, 5, 1, 12, 34, 30).timestamp())
+    previous = set_clock(clock)
+    try:
+        _run_clock(lcd, clock, 1)
+        sent = lcd.stats['bytes_sent']
+        # Seconds ticking by send nothing
+        _run_clock(lcd, clock, 20)
+        assert lcd.stats['bytes_sent'] == sent
+        # 12:34 -> 12:35 redraws the last digit only (two cursor bytes + 2x3 cells at most)
+        _run_clock(lcd, clock, 20)
+        assert 0 < lcd.stats['bytes_sent'] - sent <= 8
+    finally:
+        app_state.display_settings['big_clock'] = False
+        set_clock(previous)
+
+def test_falls_back_to_text_clock_when_cgram_busy():
+    clock, lcd = _show_clock(datetime(2026, 5, 1, 9, 5, 7).timestamp())
+    previous = set_clock(clock)
+    try:
+        held = [f"icon{slot}" for slot in range(6)]
+        for name in held:
+            lcd.cgram.acquire(name, (0b10101,) * 8)
+        _run_clock(lcd, clock, 0.5)
+        assert lcd.lcd.bus.controller.visible_lines()[0].startswith("09:05:07")
+        # Once the slots are free the next frame switches to big digits
+        for name in held:
+            lcd.cgram.release(name)
+        _run_clock(lcd, clock, 1)
+        assert lcd.cgram.code('bar_top') is not None
+        assert not lcd.lcd.bus.controller.visible_lines()[0].startswith("09:05")
+    finally:
+        app_state.display_settings['big_clock'] = False
+        set_clock(previous)
+
+def test_cancel_releases_glyphs():
+    clock, lcd = _show_clock(datetime(2026, 5, 1, 7, 0, 0).timestamp())
+    previous = set_clock(clock)
+    try:
+        _run_clock(lcd, clock, 0.5)
+        assert lcd.cgram.free_slots() == lcd.cgram.slot_count - len(BAR_GLYPHS)
+        animator.play(BigClockEffect(), clock.monotonic())
+        animator.cancel()
+        assert lcd.cgram.free_slots() == lcd.cgram.slot_count
+    finally:
+        app_state.display_settings['big_clock'] = False
+        set_clock(previous)
+
+def test_opt_in_from_environment():
+    assert not app_state.display_settings['big_clock']
+    os.environ['LCD_BIG_CLOCK'] = 'yes'
+    try:
+        app_state.load_display_settings()
+        assert app_state.display_settings['big_clock']
+        os.environ['LCD_BIG_CLOCK'] = '0'
+        app_state.load_display_settings()
+        assert not app_state.display_settings['big_clock']
+    finally:
+        del os.environ['LCD_BIG_CLOCK']
+        app_state.display_settings['big_clock'] = False
+
+if __name__ == "__main__":
+    print("🧪 Running big clock tests...")
+    test_digits_drawn_from_bar_glyphs()
+    test_only_changed_digits_each_minute()
+    test_falls_back_to_text_clock_when_cgram_busy()
+    test_cancel_releases_glyphs()
+    test_opt_in_from_environment()
+    print("🎉 All big clock tests passed!")
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for the injectable clock
+Runs the polling and auto-sleep logic on a virtual clock
+"""
+
+import threading
+import app_state
+from background_tasks import poll_once
+from clock import VirtualClock, SystemClock, get_clock, set_clock
+from frame_scheduler import FrameScheduler
+from poll_scheduler import ACTIVE_POLL_INTERVAL
+
+class StoppedSpotify:
+    """Spotify double that reports nothing playing"""
+    def __init__(self):
+        self.calls = 0
+
+    def get_current_track(self, force_refresh=False):
+        self.calls += 1
+        return {"title": "Nothing playing", "artist": "Paused or stopped", "track_id": None, "is_playing": False}
+
+    def has_track_changed(self, old_track, new_track):
+        return old_track != new_track
+
+def test_virtual_clock_only_moves_when_told():
+    clock = VirtualClock(start=50.0, wall_start=1_700_000_000.0)
+    assert clock.monotonic() == 50.0
+    clock.sleep(2.5)
+    assert clock.monotonic() == 52.5
+    assert clock.wall() == 1_700_000_002.5
+    # Timed-out waits advance time instantly; set events return at once
+    event = threading.Event()
+    assert not clock.wait(event, 10)
+    assert clock.monotonic() == 62.5
+    event.set()
+    assert clock.wait(event, 10)
+    assert clock.monotonic() == 62.5
+
+def test_scheduler_sleeps_on_virtual_time():
+    clock = VirtualClock()
+    scheduler = FrameScheduler(clock=clock)
+    scheduler.sleep_until(clock.monotonic() + 0.3)
+    assert clock.monotonic() == 1000.3
+    # Nothing pending: capped at max_sleep
+    scheduler.sleep_until(None)
+    assert abs(clock.monotonic() - (1000.3 + scheduler.max_sleep)) < 1e-9
+
+def test_auto_sleep_on_virtual_clock():
+    clock = VirtualClock()
+    previous = set_clock(clock)
+    try:
+        app_state.set_display_mode(1)
+        app_state.current_track = None
+        app_state.music_state.update({'is_playing': True, 'last_playing_time': clock.monotonic(), 'stopped_duration': 0})
+        spotify = StoppedSpotify()
+
+        # Music stopped: stays on now_playing until the threshold passes
+        waited = 0
+        while app_state.get_current_mode() == 'now_playing' and waited < 600:
+            delay = poll_once(spotify)
+            clock.sleep(delay)
+            waited += delay
+        assert app_state.get_current_mode() == 'clock'
+        threshold = app_state.music_state['auto_sleep_threshold']
+        assert threshold < waited <= threshold + 2 * ACTIVE_POLL_INTERVAL
+    finally:
+        set_clock(previous)
+
+def test_default_clock_is_system():
+    assert isinstance(get_clock(), SystemClock)
+
+if __name__ == "__main__":
+    print("🧪 Running clock tests...")
+    test_virtual_clock_only_moves_when_told()
+    test_scheduler_sleeps_on_virtual_time()
+    test_auto_sleep_on_virtual_clock()
+    test_default_clock_is_system()
+    print("🎉 All clock tests passed!")
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Tests for the clock page
+Cached time/date strings and digit-only repaints on the emulated LCD
+"""
+
+import io
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+import app_state
+from clock import VirtualClock, set_clock
+from display_effects import update_display_with_effects, next_frame_deadline
+from display_manager import ClockContent
+from lcd import LCD
+
+def test_matches_strftime():
+    content = ClockContent()
+    wall = datetime(2026, 3, 14, 9, 26, 53).timestamp()
+    assert content.lines(wall) == ("09:26:53", "Sat Mar 14")
+    assert content.lines(wall + 0.5) is content.lines(wall)
+
+def test_date_cached_until_midnight():
+    content = ClockContent()
+    before = datetime(2026, 12, 31, 23, 59, 59).timestamp()
+    assert content.lines(before) == ("23:59:59", "Thu Dec 31")
+    cached = content._date
+    content.lines(before - 3600)
+    assert content._date is cached
+    assert content.lines(before + 1) == ("00:00:00", "Fri Jan 01")
+
+def test_only_changed_digits_are_sent():
+    clock = VirtualClock(wall_start=datetime(2026, 5, 1, 12, 0, 0, 500000).timestamp())
+    previous = set_clock(clock)
+    try:
+        lcd = LCD(transport='emulator', wait_strategy='busy_flag')
+        app_state.display_settings['big_clock'] = False
+        app_state.set_display_mode(app_state.DISPLAY_MODES.index('clock'))
+        app_state.display_state.update({'content_line1': '', 'content_line2': ''})
+        with redirect_stdout(io.StringIO()):
+            # Let the wave reveal finish
+            for _ in range(40):
+                update_display_with_effects(lcd)
+                clock.sleep(next_frame_deadline() - clock.monotonic())
+            sent = lcd.stats['bytes_sent']
+            update_display_with_effects(lcd)
+        assert lcd.lcd.bus.controller.visible_lines()[0].startswith(clock.now().strftime("%H:%M:%S"))
+        # One set-cursor byte and the seconds digit (two at most on a :x9 -> :x0 tick)
+        assert lcd.stats['bytes_sent'] - sent <= 3
+    finally:
+        app_state.display_settings['big_clock'] = False
+        set_clock(previous)
+
+def test_clock_tick_is_cheap():
+    content = ClockContent()
+    wall = time.time()
+    start = time.perf_counter()
+    for tick in range(20000):
+        content.lines(wall + tick * 0.05)
+    assert time.perf_counter() - start < 1.0
+
+if __name__ == "__main__":
+    print("🧪 Running clock page tests...")
+    test_matches_strftime()
+    test_date_cached_until_midnight()
+    test_only_changed_digits_are_sent()
+    test_clock_tick_is_cheap()
+    print("🎉 All clock page tests passed!")
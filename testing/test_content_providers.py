@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Tests for versioned display content providers
+Content is regenerated only when a provider's inputs change
+"""
+
+import io
+from contextlib import redirect_stdout
+import app_state
+from clock import VirtualClock, set_clock
+from display_effects import update_display_with_effects
+from display_manager import get_content_provider, get_content_version, get_display_content
+
+class MockLCD:
+    """Headless LCD that keeps the last line written per row"""
+    def __init__(self):
+        self.lines = [' ' * 16, ' ' * 16]
+
+    def write_line(self, text, line=0):
+        self.lines[line] = text
+
+    def clear(self):
+        self.lines = [' ' * 16, ' ' * 16]
+
+class MockSpotify:
+    """Counts API calls like SpotifyManager"""
+    def __init__(self):
+        self.api_call_count = 0
+
+    def get_api_call_count(self):
+        return self.api_call_count
+
+    def get_api_headroom(self):
+        return "30/30 free"
+
+def test_version_follows_track_object():
+    app_state.set_display_mode(1)
+    app_state.current_track = {'title': 'Song', 'artist': 'Artist'}
+    version = get_content_version()
+    assert get_content_version() == version
+    assert get_display_content() == ('Song', 'Artist')
+    app_state.current_track = {'title': 'Other', 'artist': 'Artist'}
+    assert get_content_version() != version
+    assert get_display_content() == ('Other', 'Artist')
+
+def test_render_skipped_while_version_unchanged():
+    clock = VirtualClock()
+    previous = set_clock(clock)
+    provider = get_content_provider('now_playing')
+    renders = []
+    original_render = provider.render
+    provider.render = lambda: renders.append(1) or original_render()
+    try:
+        app_state.set_display_mode(1)
+        app_state.current_track = {'title': 'Song', 'artist': 'Artist'}
+        lcd = MockLCD()
+        with redirect_stdout(io.StringIO()):
+            for _ in range(100):
+                update_display_with_effects(lcd)
+                clock.sleep(0.05)
+            assert len(renders) == 1
+            assert lcd.lines[0].startswith('Song')
+            # A new track bumps the version and is picked up on the next tick
+            app_state.current_track = {'title': 'Next', 'artist': 'Artist'}
+            assert update_display_with_effects(lcd)
+        assert len(renders) == 2
+    finally:
+        del provider.render
+        set_clock(previous)
+
+def test_mode_change_changes_version():
+    app_state.set_display_mode(1)
+    version = get_content_version()
+    app_state.set_display_mode(2)
+    assert get_content_version() != version
+
+def test_clock_version_per_second():
+    clock = VirtualClock(wall_start=1_700_000_000.0)
+    previous = set_clock(clock)
+    try:
+        app_state.set_display_mode(2)
+        version = get_content_version()
+        clock.sleep(0.5)
+        assert get_content_version() == version
+        clock.sleep(0.5)
+        assert get_content_version() != version
+    finally:
+        set_clock(previous)
+
+def test_debug_version_follows_api_calls():
+    clock = VirtualClock()
+    previous = set_clock(clock)
+    provider = get_content_provider('debug')
+    spotify = MockSpotify()
+    provider._spotify = spotify
+    try:
+        app_state.set_display_mode(3)
+        version = get_content_version()
+        assert get_display_content()[0].startswith('API: 0')
+        spotify.api_call_count = 1
+        assert get_content_version() != version
+        assert get_display_content()[0].startswith('API: 1')
+    finally:
+        provider._spotify = None
+        set_clock(previous)
+
+if __name__ == "__main__":
+    print("🧪 Running content provider tests...")
+    test_version_follows_track_object()
+    test_render_skipped_while_version_unchanged()
+    test_mode_change_changes_version()
+    test_clock_version_per_second()
+    test_debug_version_follows_api_calls()
+    print("🎉 All content provider tests passed!")
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Tests for the deadline-driven frame scheduler
+"""
+
+import threading
+import time
+import app_state
+from clock import VirtualClock
+from display_effects import update_display_with_effects, next_frame_deadline
+from frame_scheduler import FrameScheduler
+
+class MockLCD:
+    """Headless LCD that keeps the last line written per row"""
+    def __init__(self):
+        self.lines = [' ' * 16, ' ' * 16]
+
+    def write_line(self, text, line=0):
+        self.lines[line] = text
+
+    def clear(self):
+        self.lines = [' ' * 16, ' ' * 16]
+
+def _show(title, artist):
+    app_state.set_display_mode(1)
+    app_state.display_state.update({'content_line1': '', 'content_line2': ''})
+    app_state.current_track = {'title': title, 'artist': artist}
+    app_state.display_state['transition_speed'] = 0.001
+    lcd = MockLCD()
+    # Run the slide transition to completion
+    for _ in range(200):
+        update_display_with_effects(lcd)
+        if not app_state.display_state['transition_active']:
+            break
+        time.sleep(0.002)
+    return lcd
+
+def test_sleeps_until_earliest_deadline():
+    scheduler = FrameScheduler(max_sleep=1.0)
+    start = time.monotonic()
+    scheduler.sleep_until(None, start + 0.05, start + 0.5)
+    elapsed = time.monotonic() - start
+    assert 0.04 <= elapsed < 0.3, f"Slept {elapsed:.3f}s"
+    assert scheduler.stats['wakeups'] == 1
+
+def test_wake_cuts_sleep_short():
+    scheduler = FrameScheduler(max_sleep=5.0)
+    threading.Timer(0.05, scheduler.wake).start()
+    start = time.monotonic()
+    assert scheduler.sleep_until(None)
+    assert time.monotonic() - start < 1.0
+    assert scheduler.stats['event_wakeups'] == 1
+
+def test_wake_between_sleeps_is_not_lost():
+    class WakeAsTimeoutEnds(VirtualClock):
+        """A background update lands just as the sleep times out"""
+        def wait(self, event, timeout):
+            woken = super().wait(event, timeout)
+            if not woken and wake_on_timeout:
+                wake_on_timeout.pop()()
+            return woken
+
+    clock = WakeAsTimeoutEnds()
+    scheduler = FrameScheduler(max_sleep=5.0, clock=clock)
+    wake_on_timeout = [scheduler.wake]
+    # That wake still counts, so the loop redraws for it
+    assert scheduler.sleep_until(clock.monotonic() + 1.0)
+    # One while the loop renders cuts the next sleep to nothing
+    start = clock.monotonic()
+    scheduler.wake()
+    assert scheduler.sleep_until(start + 1.0)
+    assert clock.monotonic() == start
+    # Both were handled: no spurious wakeup after
+    assert not scheduler.sleep_until(start + 1.0)
+    assert clock.monotonic() == start + 1.0
+    assert scheduler.stats['event_wakeups'] == 2
+
+def test_static_content_has_no_deadline():
+    _show("Short Song", "Artist")
+    update_display_with_effects(MockLCD())
+    assert next_frame_deadline() is None
+
+def test_scrolling_deadline_is_next_step():
+    _show("A Very Long Song Title That Needs Scrolling", "Artist")
+    update_display_with_effects(MockLCD())
+    deadline = next_frame_deadline()
+    # The first step comes after the one-second hold that follows the slide
+    assert deadline is not None
+    assert 0.0 < deadline - time.monotonic() <= 1.0 + 0.3
+
+def test_clock_ticks_every_second():
+    app_state.set_display_mode(2)
+    deadline = next_frame_deadline()
+    assert deadline is not None and deadline - time.monotonic() <= 1.0
+
+if __name__ == "__main__":
+    print("🧪 Running frame scheduler tests...")
+    test_sleeps_until_earliest_deadline()
+    test_wake_cuts_sleep_short()
+    test_wake_between_sleeps_is_not_lost()
+    test_static_content_has_no_deadline()
+    test_scrolling_deadline_is_next_step()
+    test_clock_ticks_every_second()
+    print("🎉 All frame scheduler tests passed!")
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for the Unicode to HD44780 ROM encoder
+"""
+
+import io
+from contextlib import redirect_stdout
+import app_state
+from display_effects import update_display_with_effects
+from lcd import LCD, CGRAMManager
+from lcd_charmap import LCDEncoder
+
+def _codes(text):
+    return [ord(ch) for ch in text]
+
+def test_ascii_is_unchanged():
+    encoder = LCDEncoder('A00')
+    assert encoder.encode("Hello, World 123") == "Hello, World 123"
+
+def test_a00_symbols_and_accents():
+    encoder = LCDEncoder('A00')
+    # ä/ö/ü and ° have ROM cells; é falls back to its base letter
+    assert _codes(encoder.encode("äöü°")) == [0xE1, 0xEF, 0xF5, 0xDF]
+    assert encoder.encode("Beyoncé") == "Beyonce"
+    assert encoder.encode("“Quoted” – live…") == '"Quoted" - live...'
+    # Backslash is ¥ on the A00 ROM, so it is remapped
+    assert encoder.encode("AC\\DC") == "AC/DC"
+
+def test_a00_katakana():
+    encoder = LCDEncoder('A00')
+    # ア = 0xB1, voiced ガ = カ (0xB6) + dakuten (0xDE), hiragana share cells
+    assert _codes(encoder.encode("アガ")) == [0xB1, 0xB6, 0xDE]
+    assert encoder.encode("あ") == encoder.encode("ア")
+
+def test_a02_latin1():
+    encoder = LCDEncoder('A02')
+    assert _codes(encoder.encode("éÑ")) == [0xE9, 0xD1]
+    assert encoder.encode("AC\\DC") == "AC\\DC"
+
+def test_symbols_use_cgram_glyphs():
+    cgram = CGRAMManager()
+    encoder = LCDEncoder('A00', cgram=cgram)
+    encoded = encoder.encode("♪ Song ♥")
+    assert ord(encoded[0]) == cgram.code('note')
+    assert ord(encoded[-1]) == cgram.code('heart')
+
+    # Without CGRAM the ASCII fallback is used
+    assert LCDEncoder('A00').encode("♪ Song ♥") == "# Song *"
+
+def test_symbol_glyphs_released_when_off_screen():
+    cgram = CGRAMManager()
+    encoder = LCDEncoder('A00', cgram=cgram)
+    title = encoder.encode("♪ Song ♥")
+    encoder.retain([title, "Artist"])
+    assert cgram.free_slots() == 6
+    # The next track has no symbols: both slots can go to other glyphs
+    encoder.retain([encoder.encode("Plain song"), "Artist"])
+    assert cgram.free_slots() == 8
+    # Back on screen later: the glyph is acquired again
+    assert ord(encoder.encode("♪ Song ♥")[0]) == cgram.code('note')
+
+def test_fallback_not_kept_while_cgram_full():
+    cgram = CGRAMManager()
+    encoder = LCDEncoder('A00', cgram=cgram)
+    held = [cgram.acquire(f'bar{i}', (i,) * 8) for i in range(8)]  # e.g. big clock and progress bar
+    assert encoder.encode("♪ Song") == "# Song"
+    for i in range(8):
+        cgram.release(f'bar{i}')
+    encoded = encoder.encode("♪ Song")
+    assert ord(encoded[0]) == cgram.code('note') and ord(encoded[0]) in held
+
+def test_results_are_cached():
+    encoder = LCDEncoder('A00')
+    first = encoder.encode("Ünïcödé title")
+    second = encoder.encode("Ünïcödé title")
+    assert first is second
+    assert encoder.stats == {'encoded': 1, 'cache_hits': 1}
+
+def test_change_log_shows_text_not_rom_codes():
+    lcd = LCD(transport='emulator', wait_strategy='busy_flag')
+    app_state.set_display_mode(app_state.DISPLAY_MODES.index('now_playing'))
+    app_state.display_state.update({'content_line1': '', 'content_line2': ''})
+    app_state.current_track = {'title': 'ラジオ ♪', 'artist': 'Björk', 'track_id': 'id1', 'is_playing': True}
+    try:
+        with redirect_stdout(io.StringIO()) as out:
+            update_display_with_effects(lcd)
+        assert "Display content changed: 'ラジオ ♪' | 'Björk'" in out.getvalue()
+    finally:
+        app_state.current_track = None
+
+if __name__ == "__main__":
+    print("🧪 Running LCD charmap tests...")
+    test_ascii_is_unchanged()
+    test_a00_symbols_and_accents()
+    test_a00_katakana()
+    test_a02_latin1()
+    test_symbols_use_cgram_glyphs()
+    test_symbol_glyphs_released_when_off_screen()
+    test_fallback_not_kept_while_cgram_full()
+    test_results_are_cached()
+    test_change_log_shows_text_not_rom_codes()
+    print("🎉 All charmap tests passed!")
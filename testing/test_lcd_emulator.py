@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Tests for the headless HD44780 emulator
+Drives the real LCD class over an emulated PCF8574 bus and inspects DDRAM/CGRAM
+"""
+
+import io
+from contextlib import redirect_stdout
+from unittest.mock import patch
+from lcd import LCD, GLYPHS
+
+def _make_lcd(wait_strategy='busy_flag'):
+    with patch('time.sleep'):
+        lcd = LCD(transport='emulator', wait_strategy=wait_strategy)
+    return lcd, lcd.lcd.bus
+
+def test_frames_land_in_ddram():
+    lcd, bus = _make_lcd()
+    lcd.write_line("Hello", 0)
+    lcd.write_line("World!", 1)
+    lcd.commit()
+    assert bus.controller.visible_lines() == ["Hello".ljust(16), "World!".ljust(16)]
+
+    # Changing one cell sends one data write plus its set-DDRAM command
+    commands, data = bus.stats['commands'], bus.stats['data_writes']
+    lcd.write_line("Jello", 0)
+    lcd.commit()
+    assert bus.stats['data_writes'] - data == 1
+    assert bus.stats['commands'] - commands == 1
+    assert bus.controller.visible_lines()[0] == "Jello".ljust(16)
+
+def test_hardware_scroll_shifts_window():
+    lcd, bus = _make_lcd()
+    title = "A long title for the marquee"
+    lcd.load_marquee([title, ""])
+    lcd.set_display_offset(5)
+    lcd.commit()
+    assert bus.controller.ddram_line(0) == title.ljust(40)
+    assert bus.controller.display_shift == 5
+    assert bus.controller.visible_lines()[0] == title[5:21]
+
+    # Going back to normal lines returns the window home
+    lcd.write_line("Short", 0)
+    lcd.commit()
+    assert bus.controller.display_shift == 0
+    assert bus.controller.visible_lines()[0] == "Short".ljust(16)
+
+def test_glyph_upload_reaches_cgram():
+    lcd, bus = _make_lcd()
+    heart = lcd.cgram.acquire('heart')
+    lcd.write_line(chr(heart) + " Liked", 0)
+    lcd.commit()
+    assert bus.controller.glyph(heart) == GLYPHS['heart']
+    assert bus.controller.visible_lines()[0][0] == chr(heart)
+
+def test_glyph_upload_resent_after_bus_error():
+    lcd, bus = _make_lcd()
+    heart = lcd.cgram.acquire('heart')
+    lcd.write_line(chr(heart), 0)
+    # The bus glitches while the glyph is being uploaded
+    with patch.object(bus, 'i2c_rdwr', side_effect=OSError(121, "Remote I/O error")):
+        try:
+            lcd.commit()
+            raise AssertionError("expected the bus error")
+        except OSError:
+            pass
+    lcd.commit()
+    assert bus.controller.glyph(heart) == GLYPHS['heart']
+    assert bus.controller.visible_lines()[0][0] == chr(heart)
+
+def test_rw_grounded_backpack_probed_at_init():
+    from lcd_emulator import EmulatedBus
+    from lcd_transport import WAIT_TIMED, PackedPCF8574
+    bus = EmulatedBus(rw_grounded=True)
+    with patch('time.sleep'), redirect_stdout(io.StringIO()):
+        transport = PackedPCF8574(bus=bus, wait_strategy='busy_flag')
+        lcd = LCD(backend=transport)
+    assert transport.wait_strategy == WAIT_TIMED
+    # Decided once during init: content never goes through a busy-flag read
+    polls = transport.stats['busy_polls']
+    with patch('time.sleep'):
+        lcd.write_line("Hello", 0)
+        lcd.commit()
+        lcd.clear()
+        lcd.write_line("Again", 1)
+        lcd.commit()
+    assert transport.stats['busy_polls'] == polls == 1
+    assert bus.controller.visible_lines() == [' ' * 16, "Again".ljust(16)]
+
+def test_busy_flag_reads_wait_for_clear():
+    lcd, bus = _make_lcd()
+    reads = bus.stats['reads']
+    lcd.clear()
+    # Clear takes 1.52 ms, longer than one busy-flag poll on a 100 kHz bus
+    assert bus.stats['reads'] - reads > 1
+    assert bus.sim_time >= bus.controller.busy_until
+    assert bus.controller.visible_lines() == [' ' * 16, ' ' * 16]
+
+def test_bus_bytes_are_recorded():
+    lcd, bus = _make_lcd(wait_strategy='timed')
+    before = len(bus.bus_log)
+    lcd.write_line("Hi", 0)
+    lcd.commit()
+    # Setup byte + set-DDRAM, then setup byte + 2 characters, 4 bytes each
+    assert len(bus.bus_log) - before == 1 + 4 + 1 + 2 * 4
+    # Without busy-flag reads the emulator sees exactly what the transport sent
+    assert len(bus.bus_log) == lcd.lcd.stats['bus_bytes']
+    kinds = [kind for _, kind, _ in bus.events[-3:]]
+    assert kinds == ['command', 'data', 'data']
+    assert [value for _, _, value in bus.events[-2:]] == [ord('H'), ord('i')]
+
+if __name__ == "__main__":
+    print("🧪 Running LCD emulator tests...")
+    test_frames_land_in_ddram()
+    test_hardware_scroll_shifts_window()
+    test_glyph_upload_reaches_cgram()
+    test_glyph_upload_resent_after_bus_error()
+    test_rw_grounded_backpack_probed_at_init()
+    test_busy_flag_reads_wait_for_clear()
+    test_bus_bytes_are_recorded()
+    print("🎉 All LCD emulator tests passed!")
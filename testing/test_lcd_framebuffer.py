@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Tests for the LCD shadow framebuffer
+Verifies that commit() only sends the cells that changed, without hardware
+"""
+
+import sys
+import types
+from unittest.mock import patch
+
+class MockCharLCD:
+    """Stand-in for RPLCD's CharLCD that records every bus-level operation"""
+    def __init__(self, *args, **kwargs):
+        self.ops = []
+        self._cursor_pos = (0, 0)
+
+    @property
+    def cursor_pos(self):
+        return self._cursor_pos
+
+    @cursor_pos.setter
+    def cursor_pos(self, pos):
+        self._cursor_pos = pos
+        self.ops.append(('cursor', pos))
+
+    def write_string(self, text):
+        self.ops.append(('write', self._cursor_pos, text))
+
+    def write(self, value):
+        # Raw bytes written back to back are recorded as one string
+        if self.ops and self.ops[-1][0] == 'write':
+            _, pos, text = self.ops[-1]
+            self.ops[-1] = ('write', pos, text + chr(value))
+        else:
+            self.ops.append(('write', self._cursor_pos, chr(value)))
+
+    def clear(self):
+        self.ops.append(('clear',))
+
+    def command(self, value):
+        self.ops.append(('command', value))
+
+    def create_char(self, location, bitmap):
+        self.ops.append(('create_char', location, tuple(bitmap)))
+
+import lcd as lcd_module
+
+# Fake RPLCD so LCD() can be built without I2C hardware
+_rplcd = types.ModuleType('RPLCD')
+_rplcd_i2c = types.ModuleType('RPLCD.i2c')
+_rplcd_i2c.CharLCD = MockCharLCD
+
+def _make_lcd():
+    with patch.dict(sys.modules, {'RPLCD': _rplcd, 'RPLCD.i2c': _rplcd_i2c}):
+        lcd = lcd_module.LCD(transport='rplcd', wait_strategy='timed')
+    lcd.lcd.ops.clear()
+    return lcd
+
+def _writes(lcd):
+    return [op for op in lcd.lcd.ops if op[0] == 'write']
+
+def test_static_frame_sends_nothing():
+    lcd = _make_lcd()
+    lcd.write_line("Hello", 0)
+    lcd.write_line("World", 1)
+    lcd.commit()
+    lcd.lcd.ops.clear()
+
+    # Re-staging identical content must not touch the bus
+    lcd.write_line("Hello", 0)
+    lcd.write_line("World", 1)
+    sent = lcd.commit()
+    assert sent == 0, f"Expected no bytes for unchanged frame, got {sent}"
+    assert lcd.lcd.ops == [], f"Unexpected bus traffic: {lcd.lcd.ops}"
+    assert lcd.stats['last_frame_saved'] == 2 * (1 + 16)
+
+def test_only_changed_cells_written():
+    lcd = _make_lcd()
+    lcd.write_line("12:34:56", 0)
+    lcd.write_line("Mon Jan 01", 1)
+    lcd.commit()
+    lcd.lcd.ops.clear()
+
+    lcd.write_line("12:34:57", 0)
+    lcd.write_line("Mon Jan 01", 1)
+    sent = lcd.commit()
+    assert _writes(lcd) == [('write', (0, 7), '7')], f"Got {_writes(lcd)}"
+    assert sent == 2, f"One cursor command plus one character, got {sent}"
+
+def test_adjacent_runs_are_merged():
+    lcd = _make_lcd()
+    lcd.write_line("abcdefgh", 0)
+    lcd.commit()
+    lcd.lcd.ops.clear()
+
+    # Cells 0 and 2 change; rewriting cell 1 is cheaper than a second cursor move
+    lcd.write_line("XbXdefgh", 0)
+    lcd.commit()
+    assert _writes(lcd) == [('write', (0, 0), 'XbX')], f"Got {_writes(lcd)}"
+
+    # Far-apart changes get their own cursor command each
+    lcd.lcd.ops.clear()
+    lcd.write_line("YbXdefgY", 0)
+    lcd.commit()
+    assert _writes(lcd) == [('write', (0, 0), 'Y'), ('write', (0, 7), 'Y')], f"Got {_writes(lcd)}"
+
+def test_clear_and_invalidate_reset_shadow():
+    lcd = _make_lcd()
+    lcd.write_line("Persist", 0)
+    lcd.commit()
+
+    lcd.clear()
+    lcd.lcd.ops.clear()
+    lcd.write_line("Persist", 0)
+    lcd.commit()
+    assert _writes(lcd) == [('write', (0, 0), 'Persist')], f"Got {_writes(lcd)}"
+
+    lcd.invalidate()
+    lcd.lcd.ops.clear()
+    lcd.commit()
+    assert len(_writes(lcd)) == 2, "Invalidated shadow should rewrite both lines"
+
+def test_hardware_scroll_uses_shift_commands():
+    lcd = _make_lcd()
+    title = "A title that is longer than sixteen"
+    lcd.load_marquee([title, ""])
+    lcd.commit()
+    assert _writes(lcd) == [('write', (0, 0), title)], f"Got {_writes(lcd)}"
+
+    # Advancing the window is one shift byte per step, no character writes
+    lcd.lcd.ops.clear()
+    lcd.load_marquee([title, ""])
+    lcd.set_display_offset(2)
+    sent = lcd.commit()
+    assert lcd.lcd.ops == [('command', lcd_module.SHIFT_DISPLAY_LEFT)] * 2, f"Got {lcd.lcd.ops}"
+    assert sent == 2
+
+    # Going back to regular lines shifts the window home again
+    lcd.lcd.ops.clear()
+    lcd.write_line("Short", 0)
+    lcd.commit()
+    shifts = [op for op in lcd.lcd.ops if op[0] == 'command']
+    assert shifts == [('command', lcd_module.SHIFT_DISPLAY_RIGHT)] * 2, f"Got {shifts}"
+
+def test_cgram_manager_avoids_reuploads():
+    lcd = _make_lcd()
+    heart = lcd.cgram.acquire('heart')
+    play = lcd.cgram.acquire('play')
+    lcd.write_line(f"{chr(heart)} {chr(play)}", 0)
+    lcd.commit()
+    uploads = [op for op in lcd.lcd.ops if op[0] == 'create_char']
+    assert [op[1] for op in uploads] == [heart, play], f"Got {uploads}"
+
+    # Released glyphs stay resident: re-acquiring is free
+    lcd.cgram.release('heart')
+    lcd.lcd.ops.clear()
+    assert lcd.cgram.acquire('heart') == heart
+    lcd.commit()
+    assert not [op for op in lcd.lcd.ops if op[0] == 'create_char']
+    assert lcd.cgram.stats['uploads_avoided'] == 1
+
+def test_savings_never_negative():
+    lcd = _make_lcd()
+    # A marquee load writes past the visible window
+    lcd.load_marquee(["A title that is longer than sixteen", "And an artist line past it too"])
+    lcd.commit()
+    assert lcd.stats['last_frame_saved'] == 0
+    # Glyph uploads are counted apart from the cells
+    lcd.cgram.acquire('heart')
+    lcd.write_line("x", 0)
+    sent = lcd.commit()
+    assert lcd.stats['glyph_bytes_sent'] == lcd_module.CGRAM_UPLOAD_BYTES
+    assert lcd.stats['last_frame_saved'] == 2 * (1 + 16) - (sent - lcd_module.CGRAM_UPLOAD_BYTES)
+    assert lcd.stats['bytes_saved'] >= 0
+
+def test_cgram_lru_eviction():
+    cgram = lcd_module.CGRAMManager()
+    for i in range(8):
+        cgram.acquire(f'g{i}', [i] * 8)
+    # All slots referenced: nothing can be evicted
+    assert cgram.acquire('extra', [9] * 8) is None
+
+    cgram.release('g3')
+    cgram.release('g5')
+    cgram.acquire('g3', [3] * 8)  # touch g3 so g5 is least recently used
+    cgram.release('g3')
+    slot = cgram.acquire('extra', [9] * 8)
+    assert slot == 5, f"Expected LRU slot 5, got {slot}"
+    assert cgram.code('g5') is None and cgram.code('g3') == 3
+    assert cgram.stats['evictions'] == 1
+
+if __name__ == "__main__":
+    print("🧪 Running LCD framebuffer tests...")
+    test_static_frame_sends_nothing()
+    test_only_changed_cells_written()
+    test_adjacent_runs_are_merged()
+    test_clear_and_invalidate_reset_shadow()
+    test_hardware_scroll_uses_shift_commands()
+    test_cgram_manager_avoids_reuploads()
+    test_savings_never_negative()
+    test_cgram_lru_eviction()
+    print("🎉 All framebuffer tests passed!")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tests for the packed PCF8574 transport
+Checks the generated nibble/enable byte sequences without I2C hardware
+"""
+
+from unittest.mock import patch
+import lcd_transport
+from lcd_transport import PackedPCF8574, RS, EN, BACKLIGHT
+
+class MockMsg:
+    @staticmethod
+    def write(address, data):
+        return (address, bytes(data))
+
+    @staticmethod
+    def read(address, length):
+        return [0] * length
+
+class MockBus:
+    """Records each I2C transaction as (address, bytes)
+
+    Read messages are filled from `busy_reads`: True reads back the busy
+    flag set, an exception is raised as a bus error.
+    """
+    def __init__(self):
+        self.transactions = []
+        self.busy_reads = []
+
+    def i2c_rdwr(self, *msgs):
+        for msg in msgs:
+            if isinstance(msg, list):
+                reply = self.busy_reads.pop(0) if self.busy_reads else False
+                if isinstance(reply, Exception):
+                    raise reply
+                msg[0] = 0x80 if reply else 0x00
+            else:
+                self.transactions.append(msg)
+
+    def close(self):
+        pass
+
+def _make_transport():
+    bus = MockBus()
+    with patch('time.sleep'):
+        transport = PackedPCF8574(bus=bus)
+    bus.transactions.clear()
+    return transport, bus
+
+def _decode(data):
+    """Rebuild (rs, byte) pairs from the nibbles latched on enable falling edges"""
+    nibbles = []
+    prev = None
+    for value in data:
+        if prev is not None and prev & EN and not value & EN:
+            nibbles.append((value & RS, value >> 4))
+        prev = value
+    return [(nibbles[i][0], (nibbles[i][1] << 4) | nibbles[i + 1][1]) for i in range(0, len(nibbles), 2)]
+
+def test_span_is_one_transaction():
+    with patch.object(lcd_transport, 'i2c_msg', MockMsg, create=True):
+        transport, bus = _make_transport()
+        transport.cursor_pos = (1, 3)
+        transport.write_string("Hi!")
+
+    assert len(bus.transactions) == 1, f"Expected 1 transaction, got {len(bus.transactions)}"
+    address, data = bus.transactions[0]
+    assert address == 0x27
+    assert all(b & BACKLIGHT for b in data), "Backlight must stay on in every byte"
+
+    decoded = _decode(data)
+    # Set-DDRAM for row 1 col 3, then the three characters as data
+    assert decoded == [(0, 0x80 | 0x43), (RS, ord('H')), (RS, ord('i')), (RS, ord('!'))], decoded
+
+def test_cursor_advances_after_write():
+    with patch.object(lcd_transport, 'i2c_msg', MockMsg, create=True):
+        transport, bus = _make_transport()
+        transport.cursor_pos = (0, 0)
+        transport.write_string("abcd")
+    assert transport.cursor_pos == (0, 4)
+
+def test_busy_flag_polling_skips_fixed_delay():
+    with patch.object(lcd_transport, 'i2c_msg', MockMsg, create=True):
+        transport, bus = _make_transport()
+        transport.wait_strategy = lcd_transport.WAIT_BUSY_FLAG
+        bus.busy_reads = [True, True, False]
+        with patch('time.sleep') as sleep:
+            transport.clear()
+    assert transport.stats['busy_polls'] == 3
+    sleep.assert_not_called()
+
+def test_busy_flag_falls_back_to_timed_waits():
+    with patch.object(lcd_transport, 'i2c_msg', MockMsg, create=True):
+        transport, bus = _make_transport()
+        transport.wait_strategy = lcd_transport.WAIT_BUSY_FLAG
+        bus.busy_reads = [OSError("NACK")]
+        with patch('time.sleep') as sleep:
+            transport.home()
+    assert transport.wait_strategy == lcd_transport.WAIT_TIMED
+    sleep.assert_called_once_with(lcd_transport.SLOW_COMMAND_DELAY)
+
+if __name__ == "__main__":
+    print("🧪 Running packed transport tests...")
+    test_span_is_one_transaction()
+    test_cursor_advances_after_write()
+    test_busy_flag_polling_skips_fixed_delay()
+    test_busy_flag_falls_back_to_timed_waits()
+    print("🎉 All packed transport tests passed!")
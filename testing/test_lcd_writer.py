@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Tests for the LCD writer thread
+Checks latest-frame-wins coalescing with a slow headless LCD
+"""
+
+import io
+import threading
+from contextlib import redirect_stdout
+from unittest.mock import patch
+from lcd import LCD, GLYPHS
+from lcd_writer import LCDWriter
+from lcd_charmap import LCDEncoder
+
+class SlowLCD:
+    """Headless LCD whose commit() blocks until the test releases it"""
+    def __init__(self):
+        self.cols = 16
+        self.rows = 2
+        self.lines = [' ' * 16, ' ' * 16]
+        self.committed = []
+        self.uploads = {}
+        self.encoder = LCDEncoder('A00')
+        self.gate = threading.Event()
+        self.gate.set()
+        self.entered = threading.Event()
+
+    def write_line(self, text, line=0):
+        self.lines[line] = text
+
+    def commit(self):
+        self.entered.set()
+        self.gate.wait(2.0)
+        self.committed.append(tuple(self.lines))
+
+    def invalidate(self):
+        pass
+
+    def upload_glyphs(self, uploads):
+        self.uploads.update(uploads)
+
+def test_frames_reach_lcd():
+    lcd = SlowLCD()
+    writer = LCDWriter(lcd).start()
+    try:
+        writer.write_line("Hello", 0)
+        writer.write_line("World", 1)
+        assert writer.commit()
+        assert writer.flush(1.0), "Writer did not drain"
+        assert lcd.committed[-1] == ("Hello".ljust(16), "World".ljust(16))
+
+        # Unchanged frames are not resubmitted
+        assert not writer.commit()
+        assert writer.stats['submitted'] == 1
+    finally:
+        writer.stop()
+
+def test_stale_frames_are_coalesced():
+    lcd = SlowLCD()
+    writer = LCDWriter(lcd).start()
+    try:
+        # Block the writer inside a slow bus write
+        lcd.gate.clear()
+        writer.write_line("frame 0", 0)
+        writer.commit()
+        assert lcd.entered.wait(1.0), "Writer never started the first frame"
+
+        # Render loop keeps producing frames without blocking
+        for i in range(1, 6):
+            writer.write_line(f"frame {i}", 0)
+            writer.commit()
+
+        lcd.gate.set()
+        assert writer.flush(2.0), "Writer did not drain"
+
+        written = [frame[0].strip() for frame in lcd.committed]
+        assert written == ["frame 0", "frame 5"], f"Expected only newest frame after stall, got {written}"
+        assert writer.stats['coalesced'] == 4
+    finally:
+        writer.stop()
+
+def test_glyph_uploads_survive_coalescing():
+    lcd = SlowLCD()
+    writer = LCDWriter(lcd).start()
+    try:
+        lcd.gate.clear()
+        writer.write_line("busy", 0)
+        writer.commit()
+        assert lcd.entered.wait(1.0)
+
+        # Glyph acquired in a frame that gets coalesced away
+        heart = writer.cgram.acquire('heart')
+        writer.write_line(chr(heart), 0)
+        writer.commit()
+        writer.write_line(chr(heart) + "!", 0)
+        writer.commit()
+
+        lcd.gate.set()
+        assert writer.flush(2.0)
+        assert heart in lcd.uploads, "Upload from a coalesced frame was lost"
+    finally:
+        writer.stop()
+
+def _emulated_writer():
+    with patch('time.sleep'):
+        lcd = LCD(transport='emulator')
+    return LCDWriter(lcd).start(), lcd.lcd.bus
+
+def _fail_next_write(bus):
+    """Make the bus's next transaction raise, like a glitch on the I2C lines"""
+    real = bus.i2c_rdwr
+
+    def i2c_rdwr(*msgs):
+        bus.i2c_rdwr = real
+        raise OSError(121, "Remote I/O error")
+    bus.i2c_rdwr = i2c_rdwr
+
+def test_failed_frame_is_retried():
+    writer, bus = _emulated_writer()
+    try:
+        _fail_next_write(bus)
+        # A static page: committed once, never changed again
+        writer.write_line("Paused", 0)
+        writer.write_line("Artist", 1)
+        with redirect_stdout(io.StringIO()):
+            writer.commit()
+            assert writer.flush(2.0), "Writer did not retry the frame"
+        assert writer.stats['errors'] == 1
+        assert bus.controller.visible_lines() == ["Paused".ljust(16), "Artist".ljust(16)]
+    finally:
+        writer.stop()
+
+def test_glyphs_resent_after_bus_error():
+    writer, bus = _emulated_writer()
+    try:
+        heart = writer.cgram.acquire('heart')
+        writer.write_line(chr(heart) + " Liked", 0)
+        with redirect_stdout(io.StringIO()):
+            writer.commit()
+            assert writer.flush(2.0)
+            # The glyph is resident already; the glitch hits a later frame
+            note = writer.cgram.acquire('note')
+            _fail_next_write(bus)
+            writer.write_line(chr(heart) + chr(note), 0)
+            writer.commit()
+            assert writer.flush(2.0), "Writer did not retry the frame"
+        assert writer.stats['errors'] == 1
+        assert bus.controller.glyph(heart) == GLYPHS['heart']
+        assert bus.controller.glyph(note) == GLYPHS['note']
+        assert bus.controller.visible_lines()[0][:2] == chr(heart) + chr(note)
+    finally:
+        writer.stop()
+
+def test_persistent_bus_fault_logged_once():
+    writer, bus = _emulated_writer()
+    real = bus.i2c_rdwr
+    failures = []
+
+    def i2c_rdwr(*msgs):
+        if len(failures) < 5:
+            failures.append(msgs)
+            raise OSError(121, "Remote I/O error")
+        return real(*msgs)
+    try:
+        with redirect_stdout(io.StringIO()) as out, patch('lcd_writer.WRITE_RETRY_DELAY', 0.01):
+            bus.i2c_rdwr = i2c_rdwr
+            writer.write_line("Unplugged", 0)
+            writer.commit()
+            assert writer.flush(2.0), "Writer did not recover"
+        assert writer.stats['errors'] == 5
+        log = out.getvalue().splitlines()
+        # The first failure and the recovery, not every retry
+        assert log == ["LCD write error: [Errno 121] Remote I/O error",
+                       "✅ LCD writes recovered after 5 failed attempts"]
+        assert bus.controller.visible_lines()[0] == "Unplugged".ljust(16)
+    finally:
+        bus.i2c_rdwr = real
+        writer.stop()
+
+if __name__ == "__main__":
+    print("🧪 Running LCD writer tests...")
+    test_frames_reach_lcd()
+    test_stale_frames_are_coalesced()
+    test_glyph_uploads_survive_coalescing()
+    test_failed_frame_is_retried()
+    test_glyphs_resent_after_bus_error()
+    test_persistent_bus_fault_logged_once()
+    print("🎉 All LCD writer tests passed!")
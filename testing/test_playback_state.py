@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Tests for optimistic playback commands
+Commands apply locally, send one write call and are reconciled by the next poll
+"""
+
+import io
+import sys
+import threading
+from contextlib import redirect_stdout
+from unittest.mock import Mock, patch
+
+# Button handler imports RPi.GPIO
+sys.modules.setdefault('RPi', Mock())
+sys.modules.setdefault('RPi.GPIO', Mock())
+
+import app_state
+import background_tasks
+import button_handler
+import spotify_manager
+from clock import VirtualClock, set_clock
+from playback_state import SETTLE_SECONDS
+from poll_scheduler import ACTIVE_POLL_INTERVAL
+
+class MockClient:
+    """spotipy.Spotify with a player that follows (or ignores) commands"""
+    def __init__(self):
+        self.playing = True
+        self.track_id = 'id1'
+        self.progress_ms = 30_000
+        self.shuffle_state = False
+        self.reads = 0
+        self.commands = []
+        self.ignore_commands = False
+        self.fail = False
+        self.release = threading.Event()  # cleared: write calls hang like a slow network
+        self.release.set()
+
+    def current_playback(self):
+        self.reads += 1
+        return {'is_playing': self.playing, 'progress_ms': self.progress_ms, 'shuffle_state': self.shuffle_state,
+                'repeat_state': 'off',
+                'item': {'id': self.track_id, 'name': f'Song {self.track_id}',
+                         'artists': [{'name': 'Artist'}], 'duration_ms': 200_000}}
+
+    def _command(self, name, **state):
+        self.release.wait(5)
+        if self.fail:
+            raise ConnectionError("no active device")
+        self.commands.append(name)
+        if not self.ignore_commands:
+            for key, value in state.items():
+                setattr(self, key, value)
+
+    def pause_playback(self):
+        self._command('pause', playing=False)
+
+    def start_playback(self):
+        self._command('play', playing=True)
+
+    def next_track(self):
+        self._command('next', track_id='id2', playing=True)
+
+    def previous_track(self):
+        # More than a few seconds in, Spotify starts the same track over
+        self._command('previous', progress_ms=0, playing=True)
+
+    def shuffle(self, state):
+        self._command('shuffle', shuffle_state=state)
+
+def _manager(client, clock):
+    original = (spotify_manager.spotipy.Spotify, spotify_manager.SpotifyOAuth)
+    spotify_manager.spotipy.Spotify = lambda **kwargs: client
+    spotify_manager.SpotifyOAuth = lambda **kwargs: None
+    try:
+        with redirect_stdout(io.StringIO()):
+            manager = spotify_manager.SpotifyManager(clock=clock)
+    finally:
+        spotify_manager.spotipy.Spotify, spotify_manager.SpotifyOAuth = original
+    manager.token_refresher.stop()
+    manager.reset_api_call_count()
+    client.reads = 0
+    return manager
+
+def test_play_pause_is_one_write_call():
+    clock = VirtualClock()
+    client = MockClient()
+    manager = _manager(client, clock)
+    with redirect_stdout(io.StringIO()):
+        assert manager.play_pause()
+        # Shown paused at once, served locally
+        assert manager.get_current_track()['is_playing'] is False
+        assert manager.play_pause()
+        resumed = manager.get_current_track()
+        assert manager.flush_commands(5)
+    assert client.commands == ['pause', 'play']
+    assert client.reads == 0
+    assert manager.get_api_call_count() == 2
+    assert resumed['track_id'] == 'id1' and resumed['is_playing']
+
+def test_poll_confirms_or_overrules_command():
+    clock = VirtualClock()
+    client = MockClient()
+    manager = _manager(client, clock)
+    with redirect_stdout(io.StringIO()):
+        manager.play_pause()
+        assert manager.flush_commands(5)
+        assert client.playing is False
+        clock.advance(SETTLE_SECONDS)
+        assert manager.get_current_track()['is_playing'] is False  # poll agrees
+        assert manager.playback.stats['confirmed'] == 1
+
+        # Spotify drops the next pause (e.g. another device took over)
+        client.ignore_commands = True
+        client.playing = True
+        manager.get_current_track(force_refresh=True)
+        manager.play_pause()
+        assert manager.flush_commands(5)
+        clock.advance(0.3)
+        # Too early to tell: Spotify may not have applied it yet
+        assert manager.get_current_track(force_refresh=True)['is_playing'] is False
+        clock.advance(SETTLE_SECONDS)
+        track = manager.get_current_track(force_refresh=True)
+    assert track['is_playing'] is True  # the poll wins
+    assert manager.playback.stats['divergences'] == 1
+    assert list(manager.playback.divergences) == [('is_playing', False, True)]
+    assert manager.playback.pending() == []
+
+def test_previous_restarting_the_track_is_confirmed():
+    clock = VirtualClock()
+    client = MockClient()
+    manager = _manager(client, clock)
+    with redirect_stdout(io.StringIO()):
+        manager.get_current_track(force_refresh=True)
+        manager.previous_track()
+        assert manager.flush_commands(5)
+        clock.advance(SETTLE_SECONDS + 0.5)
+        client.progress_ms = 1_500
+        assert manager.get_current_track(force_refresh=True)['track_id'] == 'id1'
+        assert manager.playback.stats['divergences'] == 0
+        assert manager.playback.pending() == []
+
+        # Spotify ignored this one: the same track, still playing on
+        client.ignore_commands = True
+        client.progress_ms = 10_000
+        manager.get_current_track(force_refresh=True)
+        manager.previous_track()
+        assert manager.flush_commands(5)
+        clock.advance(SETTLE_SECONDS + 0.5)
+        client.progress_ms = 11_500
+        manager.get_current_track(force_refresh=True)
+    assert list(manager.playback.divergences) == [('restart', 'not id1 or restarted', 'id1')]
+
+def test_rejected_command_is_undone():
+    clock = VirtualClock()
+    client = MockClient()
+    manager = _manager(client, clock)
+    client.fail = True
+    rejected = []
+    with redirect_stdout(io.StringIO()):
+        # Accepted and shown at once; Spotify's refusal arrives later
+        assert manager.play_pause(on_rejected=lambda: rejected.append('play'))
+        assert manager.set_shuffle(True, on_rejected=lambda: rejected.append('shuffle'))
+        assert manager.flush_commands(5)
+    assert rejected == ['play', 'shuffle']
+    assert manager.get_current_track()['is_playing'] is True
+    assert manager.playback.shuffle is False
+    assert manager.playback.stats['rejected'] == 2
+    assert manager.playback.pending() == []
+
+def test_skip_button_does_not_block():
+    clock = VirtualClock()
+    previous_clock = set_clock(clock)
+    previous_manager = spotify_manager.spotify_manager
+    client = MockClient()
+    try:
+        spotify_manager.spotify_manager = manager = _manager(client, clock)
+        app_state.set_display_mode(app_state.DISPLAY_MODES.index('now_playing'))
+        app_state.current_track = manager.get_current_track()
+        pressed_at = clock.monotonic()
+        # The handler imports spotify_manager lazily (other test files stub the module)
+        with redirect_stdout(io.StringIO()), patch.dict(sys.modules, {'spotify_manager': spotify_manager}):
+            button_handler.handle_next_button()
+            # The handler returned without sleeping or reading playback
+            assert clock.monotonic() == pressed_at
+            assert manager.flush_commands(5)
+            assert client.commands == ['next'] and client.reads == 0
+            # The poller wakes when the skip has settled, not a full interval later
+            background_tasks.get_poll_scheduler().wait(ACTIVE_POLL_INTERVAL)
+            assert clock.monotonic() == pressed_at + SETTLE_SECONDS
+            background_tasks.poll_once(manager)
+        assert app_state.current_track['track_id'] == 'id2'
+        assert client.reads == 1
+        assert manager.playback.stats['confirmed'] == 2  # new track, still playing
+    finally:
+        set_clock(previous_clock)
+        spotify_manager.spotify_manager = previous_manager
+        app_state.current_track = None
+        background_tasks.get_poll_scheduler().reset()
+
+def test_play_button_shows_state_before_write_call():
+    clock = VirtualClock()
+    previous_clock = set_clock(clock)
+    previous_manager = spotify_manager.spotify_manager
+    client = MockClient()
+    try:
+        spotify_manager.spotify_manager = manager = _manager(client, clock)
+        app_state.set_display_mode(app_state.DISPLAY_MODES.index('now_playing'))
+        app_state.current_track = manager.get_current_track()
+        client.release.clear()
+        with redirect_stdout(io.StringIO()), patch.dict(sys.modules, {'spotify_manager': spotify_manager}):
+            button_handler.handle_play_button()
+            # Paused on screen while the write call is still on the network
+            assert app_state.music_state['is_playing'] is False
+            assert client.commands == []
+            client.fail = True
+            client.release.set()
+            assert manager.flush_commands(5)
+        # Spotify refused: the handler's callback showed it undone
+        assert app_state.music_state['is_playing'] is True
+        assert app_state.current_track['track_id'] == 'id1'
+    finally:
+        client.release.set()
+        set_clock(previous_clock)
+        spotify_manager.spotify_manager = previous_manager
+        app_state.current_track = None
+        background_tasks.get_poll_scheduler().reset()
+
+class MockGPIO:
+    HIGH = 1
+    LOW = 0
+    pins = {}
+
+    @classmethod
+    def input(cls, pin):
+        return cls.pins.get(pin, cls.LOW)
+
+def test_debounce_does_not_hold_up_the_frame():
+    clock = VirtualClock()
+    previous_clock = set_clock(clock)
+    presses = []
+    next_pin = button_handler.BUTTON_PINS['NEXT']
+    for name in ('last_button_states', 'hold_start_times', 'hold_triggered', 'settle_until'):
+        if hasattr(button_handler.check_buttons, name):
+            delattr(button_handler.check_buttons, name)
+    try:
+        with patch.object(button_handler, 'GPIO', MockGPIO), patch.object(button_handler, 'edge_detection', True), \
+                patch.dict(button_handler.BUTTON_HANDLERS, {'NEXT': lambda: presses.append(clock.monotonic())}), \
+                redirect_stdout(io.StringIO()):
+            MockGPIO.pins = {next_pin: MockGPIO.HIGH}
+            pressed_at = clock.monotonic()
+            assert button_handler.check_buttons()
+            # Back to the render loop at once, to be read again once settled
+            assert clock.monotonic() == pressed_at
+            assert button_handler.next_button_deadline() == pressed_at + button_handler.DEBOUNCE
+            # Contact bounce inside the debounce window is ignored
+            for state in (MockGPIO.LOW, MockGPIO.HIGH, MockGPIO.LOW, MockGPIO.HIGH):
+                MockGPIO.pins = {next_pin: state}
+                clock.advance(0.05)
+                assert not button_handler.check_buttons()
+            MockGPIO.pins = {}
+            clock.advance(button_handler.DEBOUNCE)
+            button_handler.check_buttons()
+            MockGPIO.pins = {next_pin: MockGPIO.HIGH}
+            clock.advance(button_handler.DEBOUNCE)
+            assert button_handler.check_buttons()
+        assert len(presses) == 2
+    finally:
+        set_clock(previous_clock)
+        MockGPIO.pins = {}
+        for name in ('last_button_states', 'hold_start_times', 'hold_triggered', 'settle_until'):
+            if hasattr(button_handler.check_buttons, name):
+                delattr(button_handler.check_buttons, name)
+
+if __name__ == "__main__":
+    print("🧪 Running playback state tests...")
+    test_play_pause_is_one_write_call()
+    test_poll_confirms_or_overrules_command()
+    test_previous_restarting_the_track_is_confirmed()
+    test_rejected_command_is_undone()
+    test_skip_button_does_not_block()
+    test_play_button_shows_state_before_write_call()
+    test_debounce_does_not_hold_up_the_frame()
+    print("🎉 All playback state tests passed!")
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Tests for track-aware background polling
+Polls planned around the track end, sparse mid-track and tight after commands
+"""
+
+import io
+from contextlib import redirect_stdout
+import app_state
+from api_guard import ApiGuard
+from background_tasks import poll_once
+from clock import VirtualClock, set_clock
+from poll_scheduler import (ACTIVE_POLL_INTERVAL, COMMAND_POLL_INTERVAL, COMMAND_WINDOW, MID_TRACK_INTERVAL,
+                            TRACK_END_MARGIN, PollScheduler)
+
+TRACK_LENGTH = 200  # seconds
+
+def _track(clock, progress_s, track_id='id0'):
+    return {'title': 'Song', 'artist': 'Artist', 'track_id': track_id, 'is_playing': True,
+            'progress_ms': int(progress_s * 1000), 'duration_ms': TRACK_LENGTH * 1000,
+            'fetched_at': clock.monotonic()}
+
+class MockSpotify:
+    """Back-to-back TRACK_LENGTH tracks; skip() moves on early like another device would"""
+    def __init__(self, clock):
+        self.clock = clock
+        self.track_start = clock.monotonic()
+        self.track = 0
+        self.api_call_count = 0
+        # Like SpotifyManager, every call asks the guard first
+        self.guard = ApiGuard(budget=1000, clock=clock)
+        self.last = None
+
+    def skip(self):
+        self._advance()
+        self.track += 1
+        self.track_start = self.clock.monotonic()
+
+    def _advance(self):
+        while self.clock.monotonic() - self.track_start >= TRACK_LENGTH:
+            self.track_start += TRACK_LENGTH
+            self.track += 1
+
+    def get_current_track(self, force_refresh=False):
+        if not self.guard.allow():
+            return self.last
+        self.api_call_count += 1
+        self._advance()
+        self.last = _track(self.clock, self.clock.monotonic() - self.track_start, f'id{self.track}')
+        return self.last
+
+    def has_track_changed(self, old_track, new_track):
+        return old_track is None or old_track.get('track_id') != new_track.get('track_id')
+
+def _run(clock, spotify, scheduler, seconds, skip_at=()):
+    end = clock.monotonic() + seconds
+    skips = sorted(clock.monotonic() + at for at in skip_at)
+    while clock.monotonic() < end:
+        delay = poll_once(spotify, scheduler)
+        wake = clock.monotonic() + delay
+        while skips and skips[0] <= wake:
+            clock.sleep(skips.pop(0) - clock.monotonic())
+            spotify.skip()
+        clock.sleep(wake - clock.monotonic())
+
+def test_next_poll_planned_after_track_end():
+    clock = VirtualClock()
+    scheduler = PollScheduler(clock)
+    # Near the end: just after it
+    assert scheduler.polled(_track(clock, TRACK_LENGTH - 5), True) == 5 + TRACK_END_MARGIN
+    # Mid-track: back off, evenly spaced so one poll lands just after the end
+    delay = scheduler.polled(_track(clock, 30), False)
+    assert MID_TRACK_INTERVAL / 2 < delay <= MID_TRACK_INTERVAL
+    polls_to_end = (TRACK_LENGTH - 30 + TRACK_END_MARGIN) / delay
+    assert abs(polls_to_end - round(polls_to_end)) < 1e-9
+    # Paused or nothing known: the plain interval
+    assert scheduler.polled({'track_id': None, 'is_playing': False}, True) == ACTIVE_POLL_INTERVAL
+
+def test_command_tightens_and_wakes_poller():
+    clock = VirtualClock()
+    scheduler = PollScheduler(clock)
+    scheduler.polled(_track(clock, 30), False)
+    scheduler.request(1.0, command=True)
+    start = clock.monotonic()
+    scheduler.wait(MID_TRACK_INTERVAL)
+    assert clock.monotonic() == start + 1.0
+    assert scheduler.polled(_track(clock, 31, 'id1'), True) == COMMAND_POLL_INTERVAL
+    assert scheduler.latency['command'].count == 1
+    clock.advance(COMMAND_WINDOW)
+    assert scheduler.polled(_track(clock, 40, 'id1'), False) > COMMAND_POLL_INTERVAL
+
+def test_fewer_calls_and_prompt_track_ends():
+    clock = VirtualClock()
+    previous = set_clock(clock)
+    try:
+        app_state.set_display_mode(app_state.DISPLAY_MODES.index('now_playing'))
+        app_state.current_track = None
+        spotify = MockSpotify(clock)
+        scheduler = PollScheduler(clock)
+        with redirect_stdout(io.StringIO()):
+            _run(clock, spotify, scheduler, 3600, skip_at=(1110.0, 2150.0))
+        # A fixed 8 s poll makes 450 calls an hour
+        assert spotify.api_call_count == scheduler.polls
+        assert scheduler.calls_per_hour() < 3600 / ACTIVE_POLL_INTERVAL / 2
+        ends = scheduler.latency['track end']
+        assert ends.count >= 15
+        assert ends.max <= TRACK_END_MARGIN * 1000 + 1
+        # Skips made elsewhere show up within one mid-track interval
+        assert scheduler.latency['external'].count == 2
+        assert scheduler.latency['external'].max <= MID_TRACK_INTERVAL * 1000
+        assert 'track end' in scheduler.report()
+    finally:
+        set_clock(previous)
+        app_state.current_track = None
+
+def test_request_while_waking_is_kept():
+    class RequestOnWake(VirtualClock):
+        """Another thread requests a poll just as the wait's deadline passes"""
+        pending = None
+
+        def monotonic(self):
+            now = super().monotonic()
+            if self.pending and now >= self.pending:
+                self.pending = None
+                scheduler.request(2.0, command=True)
+            return now
+
+    clock = RequestOnWake()
+    clock.pending = clock.monotonic() + 5.0
+    scheduler = PollScheduler(clock)
+    scheduler.wait(5.0)
+    start = clock.monotonic()
+    # The request landed after the wait's last look: the next wait honours it
+    scheduler.wait(MID_TRACK_INTERVAL)
+    assert clock.monotonic() == start + 2.0
+
+def test_refused_polls_are_not_counted():
+    clock = VirtualClock()
+    previous = set_clock(clock)
+    try:
+        app_state.set_display_mode(app_state.DISPLAY_MODES.index('now_playing'))
+        app_state.current_track = None
+        spotify = MockSpotify(clock)
+        scheduler = PollScheduler(clock)
+        start = clock.monotonic()
+        with redirect_stdout(io.StringIO()):
+            _run(clock, spotify, scheduler, 60)
+            polls = scheduler.polls
+            # Backing off after an outage: the poller runs, the guard refuses
+            spotify.guard.blocked_until = clock.monotonic() + 120
+            _run(clock, spotify, scheduler, 100)
+        assert scheduler.polls == polls == spotify.api_call_count
+        assert abs(scheduler.calls_per_hour() - polls * 3600 / (clock.monotonic() - start)) < 1e-9
+    finally:
+        set_clock(previous)
+        app_state.current_track = None
+
+if __name__ == "__main__":
+    print("🧪 Running poll scheduler tests...")
+    test_next_poll_planned_after_track_end()
+    test_command_tightens_and_wakes_poller()
+    test_fewer_calls_and_prompt_track_ends()
+    test_request_while_waking_is_kept()
+    test_refused_polls_are_not_counted()
+    print("🎉 All poll scheduler tests passed!")
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Tests for on-demand profiling captures
+cProfile sessions across threads, tracemalloc diffs and the signal handlers
+"""
+
+import io
+import os
+import pstats
+import signal
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from profiler import ProfileCapture, install_signal_handlers
+
+def poller_marker():
+    """Stands in for a background loop's work"""
+    return sum(range(100))
+
+def render_marker():
+    return sum(range(100))
+
+def test_profile_covers_worker_threads():
+    capture = ProfileCapture(tempfile.mkdtemp())
+    stop = threading.Event()
+
+    def worker():
+        while not stop.is_set():
+            capture.checkpoint()
+            poller_marker()
+            time.sleep(0.001)
+
+    thread = threading.Thread(target=worker, name='poller')
+    thread.start()
+    try:
+        with redirect_stdout(io.StringIO()):
+            capture.toggle_profile()
+            for _ in range(20):
+                capture.checkpoint()
+                render_marker()
+                time.sleep(0.001)
+            path = capture.toggle_profile()
+    finally:
+        stop.set()
+        thread.join()
+    functions = {name for _, _, name in pstats.Stats(path).stats}
+    assert {'poller_marker', 'render_marker'} <= functions
+    assert os.path.exists(path[:-len('.pstats')] + '.txt')
+    assert not capture.profiling
+
+def test_memory_diff_lists_growth():
+    capture = ProfileCapture(tempfile.mkdtemp())
+    try:
+        with redirect_stdout(io.StringIO()):
+            assert capture.snapshot_memory() is None  # starts tracing
+            grown = [bytearray(1024) for _ in range(200)]
+            path = capture.snapshot_memory()
+        with open(path) as f:
+            report = f.read()
+        assert 'test_profiler.py' in report
+        assert os.path.basename(path).startswith('tracemalloc-')
+        del grown
+    finally:
+        tracemalloc.stop()
+
+def test_signals_trigger_captures():
+    capture = ProfileCapture(tempfile.mkdtemp())
+    previous = (signal.getsignal(signal.SIGUSR1), signal.getsignal(signal.SIGUSR2))
+    try:
+        with redirect_stdout(io.StringIO()):
+            install_signal_handlers(capture)
+            os.kill(os.getpid(), signal.SIGUSR1)
+            render_marker()
+            assert capture.profiling
+            os.kill(os.getpid(), signal.SIGUSR1)
+        assert not capture.profiling
+        files = os.listdir(capture.directory)
+        assert any(name.endswith('.pstats') for name in files)
+        assert any(name.endswith('.txt') for name in files)
+    finally:
+        signal.signal(signal.SIGUSR1, previous[0])
+        signal.signal(signal.SIGUSR2, previous[1])
+
+def _profiler_hooks():
+    """Whatever would make idle loops pay for profiling"""
+    hooks = [sys.getprofile(), threading.getprofile(), tracemalloc.is_tracing() or None]
+    if hasattr(sys, 'monitoring'):
+        hooks.append(sys.monitoring.get_tool(sys.monitoring.PROFILER_ID))
+    return [hook for hook in hooks if hook]
+
+def test_checkpoint_is_inert_when_idle():
+    capture = ProfileCapture(tempfile.mkdtemp())
+    assert _profiler_hooks() == []
+
+    def loop():
+        for _ in range(100):
+            capture.checkpoint()
+
+    worker = threading.Thread(target=loop)
+    worker.start()
+    loop()
+    worker.join()
+    # No thread joined a session, nothing hooked and no capture state moved
+    assert _profiler_hooks() == []
+    assert (capture.profiling, capture._generation, capture._profiles) == (False, 0, [])
+    assert capture._local.profile is None
+    assert os.listdir(capture.directory) == []
+
+if __name__ == "__main__":
+    print("🧪 Running profiler tests...")
+    test_profile_covers_worker_threads()
+    test_memory_diff_lists_growth()
+    test_signals_trigger_captures()
+    test_checkpoint_is_inert_when_idle()
+    print("🎉 All profiler tests passed!")
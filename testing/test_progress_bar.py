@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Tests for the now_playing progress bar
+Position interpolated between polls and drawn with sub-cell CGRAM glyphs
+"""
+
+import io
+import os
+from contextlib import redirect_stdout
+import app_state
+from background_tasks import poll_once
+from clock import VirtualClock, set_clock
+from display_effects import animator, update_display_with_effects, next_frame_deadline
+from lcd import LCD
+from progress_bar import BOUNDARY_MARGIN_MS, LEVEL_GLYPHS, PlaybackProgress, format_elapsed, get_playback_progress
+
+class MockSpotify:
+    """Playback that advances with the clock; every fetch is one API call"""
+    def __init__(self, clock, progress_ms=0, duration_ms=200_000):
+        self.clock = clock
+        self.started = clock.monotonic() - progress_ms / 1000.0
+        self.duration_ms = duration_ms
+        self.api_call_count = 0
+
+    def seek(self, progress_ms):
+        self.started = self.clock.monotonic() - progress_ms / 1000.0
+
+    def get_current_track(self, force_refresh=False):
+        self.api_call_count += 1
+        now = self.clock.monotonic()
+        return {'title': 'Song', 'artist': 'Artist', 'track_id': 'id1', 'is_playing': True,
+                'progress_ms': int((now - self.started) * 1000), 'duration_ms': self.duration_ms,
+                'fetched_at': now}
+
+    def has_track_changed(self, old_track, new_track):
+        return old_track is None or old_track.get('track_id') != new_track.get('track_id')
+
+def _start(clock, spotify):
+    """Fresh progress state and an emulated LCD on now_playing"""
+    get_playback_progress().reset()
+    app_state.display_settings['progress_bar'] = True
+    app_state.set_display_mode(app_state.DISPLAY_MODES.index('now_playing'))
+    app_state.current_track = None
+    app_state.display_state.update({'content_line1': '', 'content_line2': ''})
+    lcd = LCD(transport='emulator', wait_strategy='busy_flag')
+    with redirect_stdout(io.StringIO()):
+        poll_once(spotify)
+    spotify.next_poll = clock.monotonic() + 8
+    return lcd
+
+def _run(lcd, clock, spotify, seconds):
+    """Render on the loop's deadlines, polling like the background thread"""
+    end = clock.monotonic() + seconds
+    with redirect_stdout(io.StringIO()):
+        while clock.monotonic() < end:
+            if clock.monotonic() >= spotify.next_poll:
+                spotify.next_poll += poll_once(spotify)
+            update_display_with_effects(lcd)
+            deadline = next_frame_deadline()
+            wake = min(deadline if deadline is not None else end, spotify.next_poll, end)
+            clock.sleep(wake - clock.monotonic())
+        # Final frame where the loop would draw it: just past the boundary
+        clock.sleep(BOUNDARY_MARGIN_MS / 1000.0)
+        update_display_with_effects(lcd)
+
+def test_position_interpolates_between_polls():
+    clock = VirtualClock()
+    previous = set_clock(clock)
+    try:
+        progress = PlaybackProgress()
+        sample = {'progress_ms': 10_000, 'duration_ms': 60_000, 'is_playing': True, 'fetched_at': clock.monotonic()}
+        assert progress.sync(sample)
+        clock.sleep(2.5)
+        assert progress.position_ms(clock.monotonic()) == 12_500
+        clock.sleep(100)
+        assert progress.position_ms(clock.monotonic()) == 60_000  # clamped to the duration
+        # An older sample (e.g. a cached dict) never moves the position back
+        assert not progress.sync(dict(sample, fetched_at=sample['fetched_at'] - 1))
+        # Paused: the position holds
+        assert progress.sync(dict(sample, is_playing=False, fetched_at=clock.monotonic()))
+        clock.sleep(5)
+        assert progress.position_ms(clock.monotonic()) == 10_000
+        assert format_elapsed(61_999) == "1:01"
+    finally:
+        set_clock(previous)
+
+def _stop(previous):
+    app_state.display_settings['progress_bar'] = False
+    set_clock(previous)
+
+def test_elapsed_and_partial_cell_drawn():
+    clock = VirtualClock()
+    previous = set_clock(clock)
+    try:
+        # 10 cells x 5 columns over 50 s: one pixel column per second
+        spotify = MockSpotify(clock, progress_ms=0, duration_ms=50_000)
+        lcd = _start(clock, spotify)
+        _run(lcd, clock, spotify, 7.5)
+        top, bottom = lcd.lcd.bus.controller.visible_lines()
+        assert top.startswith('Song - Artist')
+        full = lcd.encode('█')
+        partial = chr(lcd.cgram.code(LEVEL_GLYPHS[2][0]))
+        # 7 s: one full cell and two lit columns of the next
+        assert bottom == '0:07  ' + full + partial + ' ' * 8
+    finally:
+        _stop(previous)
+
+def test_bar_moves_without_api_calls():
+    clock = VirtualClock()
+    previous = set_clock(clock)
+    try:
+        spotify = MockSpotify(clock, progress_ms=30_000)
+        lcd = _start(clock, spotify)
+        _run(lcd, clock, spotify, 5)
+        sent = lcd.stats['bytes_sent']
+        calls = spotify.api_call_count
+        # 60 s of playback: only the background polls reach the API
+        _run(lcd, clock, spotify, 60)
+        assert spotify.api_call_count - calls <= 60 // 8 + 1
+        assert lcd.lcd.bus.controller.visible_lines()[1].startswith('1:35')
+        # A cursor byte and a digit or two per second, plus a cell per bar step
+        assert lcd.stats['bytes_sent'] - sent < 60 * 4 + 20 * 2
+    finally:
+        _stop(previous)
+
+def test_poll_resyncs_after_seek():
+    clock = VirtualClock()
+    previous = set_clock(clock)
+    try:
+        spotify = MockSpotify(clock, progress_ms=5_000)
+        lcd = _start(clock, spotify)
+        _run(lcd, clock, spotify, 2)
+        spotify.seek(120_000)
+        # The jump shows up when the next poll returns, not before
+        _run(lcd, clock, spotify, 5)
+        assert lcd.lcd.bus.controller.visible_lines()[1].startswith('0:12')
+        _run(lcd, clock, spotify, 4)
+        assert lcd.lcd.bus.controller.visible_lines()[1].startswith('2:0')
+        animator.cancel()
+        assert lcd.cgram.free_slots() == lcd.cgram.slot_count
+    finally:
+        _stop(previous)
+
+def test_opt_in_from_environment():
+    assert not app_state.display_settings['progress_bar']
+    os.environ['LCD_PROGRESS_BAR'] = '1'
+    try:
+        app_state.load_display_settings()
+        assert app_state.display_settings['progress_bar']
+    finally:
+        del os.environ['LCD_PROGRESS_BAR']
+        app_state.display_settings['progress_bar'] = False
+
+if __name__ == "__main__":
+    print("🧪 Running progress bar tests...")
+    test_position_interpolates_between_polls()
+    test_elapsed_and_partial_cell_drawn()
+    test_bar_moves_without_api_calls()
+    test_poll_resyncs_after_seek()
+    test_opt_in_from_environment()
+    print("🎉 All progress bar tests passed!")
@@ -34,6 +34,7 @@ class MockGPIO:
 # Import button handler with mocked GPIO
 sys.modules['RPi.GPIO'] = MockGPIO
 from button_handler import check_buttons, HOLD_DURATION
+from clock import get_clock
 
 def test_hold_detection():
     """Test the hold detection logic"""
@@ -95,7 +96,7 @@ def test_hold_timing():
         
         # Reset states
         if hasattr(check_buttons, 'hold_start_times'):
-            check_buttons.hold_start_times['CYCLE'] = time.time() - duration
+            check_buttons.hold_start_times['CYCLE'] = get_clock().monotonic() - duration
             check_buttons.hold_triggered['CYCLE'] = False
         
         start_time = time.time()
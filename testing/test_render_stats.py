@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Tests for render loop instrumentation
+Frame counters, latency histograms and scroll jitter on a virtual clock
+"""
+
+import json
+import os
+import tempfile
+import app_state
+from clock import VirtualClock, set_clock
+from display_effects import animator, update_display_with_effects, next_frame_deadline, SCROLL_SPEED
+from render_stats import Histogram, RenderStats, get_render_stats, format_report
+
+LONG_TITLE = "A Very Long Song Title That Needs Scrolling"
+
+class MockLCD:
+    """Headless LCD that keeps the last line written per row"""
+    def __init__(self):
+        self.lines = [' ' * 16, ' ' * 16]
+
+    def write_line(self, text, line=0):
+        self.lines[line] = text
+
+    def clear(self):
+        self.lines = [' ' * 16, ' ' * 16]
+
+def _tick(clock, lcd):
+    """Sleep to the next frame deadline and render"""
+    clock.sleep(next_frame_deadline() - clock.monotonic())
+    update_display_with_effects(lcd)
+
+def _play_long_title(clock):
+    """Show a scrolling title and run the slide and hold on the virtual clock"""
+    app_state.set_display_mode(1)
+    app_state.display_state.update({'content_line1': '', 'content_line2': '', 'transition_speed': 0.06})
+    app_state.current_track = {'title': LONG_TITLE, 'artist': 'Artist'}
+    lcd = MockLCD()
+    update_display_with_effects(lcd)
+    while not animator.is_playing('scroll'):
+        _tick(clock, lcd)
+    get_render_stats().reset()
+    return lcd
+
+def test_histogram_percentiles():
+    h = Histogram(bounds=(1, 10, 100))
+    for value in [0.5] * 90 + [5] * 9 + [250]:
+        h.record(value)
+    assert h.count == 100
+    assert h.percentile(50) == 1
+    assert h.percentile(95) == 10
+    # The overflow bucket reports the exact max
+    assert h.percentile(100) == 250
+    assert h.min == 0.5 and h.max == 250
+
+def test_counts_rendered_and_skipped_frames():
+    clock = VirtualClock()
+    previous = set_clock(clock)
+    try:
+        lcd = _play_long_title(clock)
+        stats = get_render_stats()
+        # On the step grid every tick shows a new frame
+        for _ in range(5):
+            _tick(clock, lcd)
+        # Ticks between steps have nothing new to show
+        update_display_with_effects(lcd)
+        update_display_with_effects(lcd)
+        assert stats.counters['frames_rendered'] == 5
+        assert stats.counters['frames_skipped'] == 2
+        assert stats.render_ms.count == 7
+        assert stats.scroll_jitter_ms.count == 5
+        assert stats.scroll_jitter_ms.max < 0.01
+    finally:
+        set_clock(previous)
+
+def test_late_scroll_tick_records_jitter_and_drops():
+    clock = VirtualClock()
+    previous = set_clock(clock)
+    try:
+        lcd = _play_long_title(clock)
+        stats = get_render_stats()
+        _tick(clock, lcd)
+        # Next tick 2.5 steps later: one step is never shown, the next is 150 ms late
+        clock.sleep(2.5 * SCROLL_SPEED)
+        update_display_with_effects(lcd)
+        assert stats.counters['frames_dropped'] == 1
+        assert abs(stats.scroll_jitter_ms.max - 150) < 1
+    finally:
+        set_clock(previous)
+
+def test_debug_page_shows_stats():
+    from display_manager import has_significant_content_change
+
+    stats = get_render_stats()
+    stats.reset()
+    app_state.set_display_mode(app_state.DISPLAY_MODES.index('debug'))
+    line1, line2 = "API: 3 | Ready", stats.debug_line()
+    assert line2 == "Frm:0 J:0ms"
+    app_state.display_state.update({'content_line1': line1, 'content_line2': line2})
+    # Counters ticking over must not restart the wave effect
+    stats.record_frame(0.001, True)
+    assert not has_significant_content_change(line1, stats.debug_line())
+
+def test_dump_round_trip():
+    stats = RenderStats()
+    stats.record_frame(0.002, True)
+    stats.record_bus_write(0.004)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = stats.dump(os.path.join(tmp, 'stats.json'))
+        with open(path) as f:
+            data = json.load(f)
+    assert data['counters']['frames_rendered'] == 1
+    assert data['bus_ms']['count'] == 1
+    report = format_report(data)
+    assert "Frames rendered: 1 of 1 ticks" in report
+
+if __name__ == "__main__":
+    print("🧪 Running render stats tests...")
+    test_histogram_percentiles()
+    test_counts_rendered_and_skipped_frames()
+    test_late_scroll_tick_records_jitter_and_drops()
+    test_debug_page_shows_stats()
+    test_dump_round_trip()
+    print("🎉 All render stats tests passed!")
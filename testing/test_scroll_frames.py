@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests for precomputed scroll frame tables
+"""
+
+from scroll_frames import MARQUEE_SEPARATOR, MarqueeTable, ScrollTable
+
+TEXT = "0123456789ABCDEFGHIJ"  # 20 chars: 4 positions of overflow on 16 columns
+
+def test_short_text_is_static():
+    table = ScrollTable("Short", width=16)
+    assert not table.scrolls
+    assert table.frame_at(0) == "Short".ljust(16)
+    assert table.frame_at(1234.5) == "Short".ljust(16)
+
+def test_ping_pong_with_end_pauses():
+    table = ScrollTable(TEXT, width=16, step=0.3, pause=0.6)
+    positions = [table.position_at(i * 0.3 + 0.01) for i in range(len(table.positions))]
+    # Out 0..4, hold the end, back 3..1, hold the start
+    assert positions == [0, 1, 2, 3, 4, 4, 4, 3, 2, 1, 0, 0]
+    assert table.frame_at(4 * 0.3 + 0.01) == TEXT[4:20]
+    # The cycle repeats seamlessly
+    assert table.position_at(table.period + 0.01) == 0
+
+def test_frames_are_precomputed():
+    table = ScrollTable(TEXT, width=16)
+    # Lookups hand back the compiled strings, never new ones
+    assert table.frame_at(0.31) is table.frames[1]
+    assert table.frame_at(0.31) is table.frame_at(0.32)
+
+def test_late_ticks_keep_pace():
+    table = ScrollTable(TEXT, width=16, step=0.3, pause=4.0)
+    # A tick arriving a whole second late shows the frame due at that time
+    on_time = [table.position_at(t) for t in (0.0, 0.3, 0.6, 0.9, 1.2)]
+    assert on_time == [0, 1, 2, 3, 4]
+    assert table.position_at(1.0) == 3
+    assert table.position_at(-1.0) == 0
+
+def test_time_to_next_change_skips_pauses():
+    table = ScrollTable(TEXT, width=16, step=0.3, pause=0.6)
+    assert abs(table.time_to_next_change(0.1) - 0.2) < 1e-9
+    # Arriving at the end: the next change is after the whole hold
+    assert abs(table.time_to_next_change(1.2) - 0.9) < 1e-9
+    # The start pause runs on into the next cycle
+    assert abs(table.time_to_next_change(3.0) - 0.9) < 1e-9
+    assert ScrollTable("Short").time_to_next_change(5.0) is None
+
+def test_marquee_loops_forward():
+    table = MarqueeTable(TEXT, width=16, step=0.3, pause=0.6)
+    ring = TEXT + MARQUEE_SEPARATOR
+    # Held once at the start, then one cell forward per step, never back
+    positions = [table.position_at(0.61 + i * 0.3) for i in range(len(ring) + 2)]
+    assert positions == list(range(len(ring))) + [0, 1]
+    assert table.position_at(0.3) == 0
+    # The view wraps through the separator into the start of the text
+    assert table.frame_at(0.61 + 20 * 0.3) == (MARQUEE_SEPARATOR + TEXT)[:16]
+    assert all(len(frame) == 16 for frame in table.frames)
+    assert abs(table.time_to_next_change(0.0) - 0.6) < 1e-9
+    assert not MarqueeTable("Short").scrolls
+
+def test_marquee_reads_faster_than_pendulum():
+    title = "Kimi no Na wa Zenzenzense Movie ver."
+    pendulum = ScrollTable(title, width=16)
+    marquee = MarqueeTable(title, width=16)
+    # Time from one full showing of the title to the next
+    assert marquee.period < 0.7 * pendulum.period
+
+if __name__ == "__main__":
+    print("🧪 Running scroll frame table tests...")
+    test_short_text_is_static()
+    test_ping_pong_with_end_pauses()
+    test_frames_are_precomputed()
+    test_late_ticks_keep_pace()
+    test_time_to_next_change_skips_pauses()
+    test_marquee_loops_forward()
+    test_marquee_reads_faster_than_pendulum()
+    print("🎉 All scroll frame table tests passed!")
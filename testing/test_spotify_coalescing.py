@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Tests for single-flight track fetches
+Concurrent get_current_track() callers share one current_playback() request
+"""
+
+import io
+import threading
+from contextlib import redirect_stdout
+import spotify_manager
+from api_guard import ApiGuard
+from clock import VirtualClock
+
+def _playback(track_id):
+    return {'is_playing': True, 'progress_ms': 1000,
+            'item': {'id': track_id, 'name': f'Song {track_id}', 'artists': [{'name': 'Artist'}],
+                     'duration_ms': 200_000}}
+
+class MockClient:
+    """spotipy.Spotify whose first current_playback() blocks until released"""
+    def __init__(self):
+        self.track_id = 'id1'
+        self.calls = 0
+        self.commands = []
+        self.blocking = False
+        self.entered = threading.Event()
+        self.release = threading.Event()
+        self._lock = threading.Lock()
+
+    def current_playback(self):
+        with self._lock:
+            self.calls += 1
+            block, self.blocking = self.blocking, False
+            answer = _playback(self.track_id)
+        if block:
+            self.entered.set()
+            self.release.wait(5)
+        return answer
+
+    def next_track(self):
+        self.commands.append('next')
+        self.track_id = 'id2'
+
+def _manager(client, clock=None):
+    original = (spotify_manager.spotipy.Spotify, spotify_manager.SpotifyOAuth)
+    spotify_manager.spotipy.Spotify = lambda **kwargs: client
+    spotify_manager.SpotifyOAuth = lambda **kwargs: None
+    try:
+        with redirect_stdout(io.StringIO()):
+            manager = spotify_manager.SpotifyManager(clock=clock)
+    finally:
+        spotify_manager.spotipy.Spotify, spotify_manager.SpotifyOAuth = original
+    manager.token_refresher.stop()
+    # Room for every fetch: these tests count calls, not the budget
+    manager.guard = ApiGuard(budget=1000, clock=clock)
+    manager.reset_api_call_count()
+    client.calls = 0
+    return manager
+
+def _fetch_in_threads(manager, count):
+    results = [None] * count
+
+    def fetch(index):
+        results[index] = manager.get_current_track(force_refresh=True)
+
+    threads = [threading.Thread(target=fetch, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+def _wait_for(condition):
+    for _ in range(500):
+        if condition():
+            return
+        threading.Event().wait(0.01)
+    raise AssertionError("timed out")
+
+def test_concurrent_callers_share_one_request():
+    client = MockClient()
+    manager = _manager(client)
+    client.blocking = True
+    with redirect_stdout(io.StringIO()):
+        leader, leader_result = _fetch_in_threads(manager, 1)
+        assert client.entered.wait(5)
+        # Poller and button handlers arrive while the request is out
+        followers, results = _fetch_in_threads(manager, 4)
+        _wait_for(lambda: manager.get_calls_saved() == 4)
+        client.release.set()
+        for thread in leader + followers:
+            thread.join()
+    assert client.calls == 1
+    assert manager.get_api_call_count() == 1
+    assert all(result is leader_result[0] for result in results)
+    assert leader_result[0]['track_id'] == 'id1'
+    # Nothing left in flight: the next caller sends a fresh request
+    with redirect_stdout(io.StringIO()):
+        manager.get_current_track(force_refresh=True)
+    assert client.calls == 2
+
+def test_request_before_command_not_shared():
+    clock = VirtualClock()
+    client = MockClient()
+    manager = _manager(client, clock)
+    client.blocking = True
+    with redirect_stdout(io.StringIO()):
+        poll, poll_result = _fetch_in_threads(manager, 1)
+        assert client.entered.wait(5)
+        # Next pressed while the poll is out: its answer predates the skip
+        manager.next_track()
+        assert manager.flush_commands(5)
+        clock.advance(1)
+        assert manager.get_current_track(force_refresh=True)['track_id'] == 'id2'
+        client.release.set()
+        poll[0].join()
+    assert poll_result[0]['track_id'] == 'id1'
+    assert (client.calls, manager.get_calls_saved()) == (2, 0)
+    # The slower, older answer did not replace the newer one in the cache
+    assert manager.get_current_track()['track_id'] == 'id2'
+
+def test_counters_consistent_under_contention():
+    client = MockClient()
+    manager = _manager(client)
+    with redirect_stdout(io.StringIO()):
+        threads, results = _fetch_in_threads(manager, 40)
+        for thread in threads:
+            thread.join()
+    assert all(result['track_id'] == 'id1' for result in results)
+    assert manager.get_api_call_count() == client.calls
+    assert manager.get_api_call_count() + manager.get_calls_saved() == 40
+
+if __name__ == "__main__":
+    print("🧪 Running Spotify coalescing tests...")
+    test_concurrent_callers_share_one_request()
+    test_request_before_command_not_shared()
+    test_counters_consistent_under_contention()
+    print("🎉 All Spotify coalescing tests passed!")
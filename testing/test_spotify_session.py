@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Tests for the pooled Spotify HTTP session
+Keep-alive reuse, cold/warm timing and how SpotifyManager wires it into spotipy
+"""
+
+import io
+import threading
+import time
+from contextlib import redirect_stdout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import requests
+import spotify_manager
+from spotify_http import REQUEST_TIMEOUT, TimedSession, build_session, call_type
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """Tiny JSON endpoint that keeps connections open like api.spotify.com"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = b'{"is_playing": false}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class DroppingHandler(KeepAliveHandler):
+    """Drops each kept-alive connection on its second request, like a router timing it out"""
+
+    def do_GET(self):
+        self.served = getattr(self, 'served', 0) + 1
+        if self.served > 1:
+            self.close_connection = True  # hang up without answering
+            return
+        super().do_GET()
+
+    def do_PUT(self):
+        self.do_GET()
+
+class StalledHandler(KeepAliveHandler):
+    """Never answers until released, like Spotify stuck behind a flaky link"""
+    requests_seen = 0
+    release = threading.Event()
+
+    def do_GET(self):
+        StalledHandler.requests_seen += 1
+        self.release.wait(5)
+
+def _serve(handler=KeepAliveHandler):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1/me/player"
+
+class MockSpotipy:
+    """Records how spotipy.Spotify / SpotifyOAuth were constructed"""
+    created = []
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        MockSpotipy.created.append(self)
+
+    def current_playback(self):
+        return None
+
+def test_connection_reused_across_calls():
+    server, url = _serve()
+    try:
+        session = build_session()
+        for _ in range(5):
+            assert session.get(url, timeout=REQUEST_TIMEOUT).json() == {'is_playing': False}
+        cold = session.latency[('GET me/player', 'cold')]
+        warm = session.latency[('GET me/player', 'warm')]
+        # One handshake, then keep-alive
+        assert (cold.count, warm.count) == (1, 4)
+        assert 'GET me/player' in session.report()
+    finally:
+        server.shutdown()
+
+def test_pool_shared_between_threads():
+    server, url = _serve()
+    try:
+        session = build_session(pool_size=2)
+        threads = [threading.Thread(target=lambda: [session.get(url) for _ in range(5)]) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        calls = sum(h.count for h in session.latency.values())
+        assert calls == 10
+        # Never more connections than the pool holds, each credited to the one call that opened it
+        cold = session.latency[('GET me/player', 'cold')].count
+        assert cold == session.stats['connections_opened']
+        assert cold <= 2
+    finally:
+        server.shutdown()
+
+def test_dropped_keep_alive_connection_retried():
+    server, url = _serve(DroppingHandler)
+    try:
+        session = build_session()
+        assert session.get(url, timeout=REQUEST_TIMEOUT).json() == {'is_playing': False}
+        # The pooled connection is dead: the poll reopens one instead of failing
+        assert session.get(url, timeout=REQUEST_TIMEOUT).json() == {'is_playing': False}
+        assert session.latency[('GET me/player', 'cold')].count == 2
+        # A write is not resent: it may already have reached Spotify
+        try:
+            session.put(url, timeout=REQUEST_TIMEOUT)
+            raise AssertionError("expected the dropped connection to fail the PUT")
+        except requests.ConnectionError:
+            pass
+    finally:
+        server.shutdown()
+
+def test_read_timeout_not_retried():
+    server, url = _serve(StalledHandler)
+    try:
+        session = build_session()
+        start = time.perf_counter()
+        try:
+            session.get(url, timeout=(1.0, 0.3))
+            raise AssertionError("expected the stalled GET to time out")
+        except requests.ReadTimeout:
+            pass
+        # One wait for the read timeout, not a second one on a retry
+        assert time.perf_counter() - start < 0.55
+        assert StalledHandler.requests_seen == 1
+    finally:
+        StalledHandler.release.set()
+        server.shutdown()
+
+def test_call_type_labels():
+    assert call_type('get', 'https://api.spotify.com/v1/me/player?market=JP') == 'GET me/player'
+    assert call_type('PUT', 'https://api.spotify.com/v1/me/player/pause') == 'PUT me/player/pause'
+    assert call_type('POST', 'https://accounts.spotify.com/api/token') == 'POST accounts/api/token'
+
+def test_manager_shares_session_with_spotipy():
+    original = (spotify_manager.spotipy.Spotify, spotify_manager.SpotifyOAuth)
+    spotify_manager.spotipy.Spotify = MockSpotipy
+    spotify_manager.SpotifyOAuth = MockSpotipy
+    MockSpotipy.created = []
+    try:
+        with redirect_stdout(io.StringIO()):
+            manager = spotify_manager.SpotifyManager()
+        auth, client = MockSpotipy.created
+        assert isinstance(manager.session, TimedSession)
+        assert client.kwargs['requests_session'] is manager.session
+        assert auth.kwargs['requests_session'] is manager.session
+        assert client.kwargs['requests_timeout'] == REQUEST_TIMEOUT
+        # Reconnecting keeps the same pool
+        with redirect_stdout(io.StringIO()):
+            manager.refresh_connection()
+        assert MockSpotipy.created[-1].kwargs['requests_session'] is manager.session
+        manager.token_refresher.stop()
+    finally:
+        spotify_manager.spotipy.Spotify, spotify_manager.SpotifyOAuth = original
+
+if __name__ == "__main__":
+    print("🧪 Running Spotify session tests...")
+    test_connection_reused_across_calls()
+    test_pool_shared_between_threads()
+    test_dropped_keep_alive_connection_retried()
+    test_read_timeout_not_retried()
+    test_call_type_labels()
+    test_manager_shares_session_with_spotipy()
+    print("🎉 All Spotify session tests passed!")
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Tests for the Spotify token cache
+In-memory tokens, locked atomic cache writes and proactive refresh
+"""
+
+import io
+import json
+import os
+import stat
+import tempfile
+import threading
+import time
+from contextlib import redirect_stdout
+from token_cache import REFRESH_MARGIN, REFRESH_RETRY, LockedFileCacheHandler, TokenRefresher, _FileLock
+
+def _token(expires_at, access='access-1'):
+    return {'access_token': access, 'refresh_token': 'refresh-1', 'expires_at': expires_at,
+            'scope': 'user-read-playback-state'}
+
+def _cache_path():
+    return os.path.join(tempfile.mkdtemp(), '.spotify_cache')
+
+class MockAuthManager:
+    """Stands in for SpotifyOAuth.refresh_access_token"""
+    def __init__(self, cache, fail=False):
+        self.cache = cache
+        self.fail = fail
+        self.refreshes = 0
+
+    def refresh_access_token(self, refresh_token):
+        if self.fail:
+            raise ConnectionError("accounts.spotify.com unreachable")
+        self.refreshes += 1
+        token = _token(time.time() + 3600, access=f'access-{self.refreshes + 1}')
+        self.cache.save_token_to_cache(token)
+        return token
+
+def test_token_read_from_file_once():
+    path = _cache_path()
+    with open(path, 'w') as f:
+        json.dump(_token(2_000_000_000), f)
+    cache = LockedFileCacheHandler(path)
+    for _ in range(50):
+        assert cache.get_cached_token()['access_token'] == 'access-1'
+    assert cache.stats['file_reads'] == 1
+    # Served from memory even if the file goes away
+    os.remove(path)
+    assert cache.get_cached_token()['access_token'] == 'access-1'
+
+def test_token_written_elsewhere_is_picked_up():
+    path = _cache_path()
+    player = LockedFileCacheHandler(path)
+    auth = LockedFileCacheHandler(path)  # auth.py re-authenticating alongside the player
+    player.save_token_to_cache(_token(2_000_000_000))
+    assert player.get_cached_token()['access_token'] == 'access-1'
+    auth.save_token_to_cache(dict(_token(2_000_000_100, access='access-2'), refresh_token='refresh-2'))
+    assert player.get_cached_token()['refresh_token'] == 'refresh-2'
+    reads = player.stats['file_reads']
+    for _ in range(20):
+        player.get_cached_token()
+    assert player.stats['file_reads'] == reads  # unchanged file, no further reads
+
+def test_save_keeps_newer_token_from_elsewhere():
+    path = _cache_path()
+    player = LockedFileCacheHandler(path)
+    auth = LockedFileCacheHandler(path)
+    player.save_token_to_cache(_token(2_000_000_000))
+    auth.save_token_to_cache(dict(_token(2_000_000_100, access='access-2'), refresh_token='refresh-2'))
+    # The player saves a token refreshed from the stale one: the file keeps auth.py's
+    player.save_token_to_cache(_token(2_000_000_050, access='access-stale'))
+    with open(path) as f:
+        assert json.load(f)['refresh_token'] == 'refresh-2'
+    assert player.get_cached_token()['access_token'] == 'access-2'
+    assert player.stats['writes_skipped'] == 1
+    # A later refresh of its own is written as usual
+    player.save_token_to_cache(dict(_token(2_000_003_700, access='access-3'), refresh_token='refresh-2'))
+    assert auth.get_cached_token()['access_token'] == 'access-3'
+
+def test_writes_are_atomic_and_private():
+    path = _cache_path()
+    writers = [LockedFileCacheHandler(path) for _ in range(3)]  # player, auth.py, test.py
+    errors = []
+
+    def write(cache, index):
+        for n in range(30):
+            cache.save_token_to_cache(_token(2_000_000_000 + n, access=f'writer-{index}-{n}' * 20))
+
+    def read():
+        for _ in range(200):
+            try:
+                with open(path) as f:
+                    json.load(f)
+            except FileNotFoundError:
+                pass
+            except ValueError as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(cache, i)) for i, cache in enumerate(writers)]
+    threads.append(threading.Thread(target=read))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []  # never a torn file
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert [name for name in os.listdir(os.path.dirname(path)) if '.tmp' in name] == []
+
+def test_write_waits_for_lock_holder():
+    path = _cache_path()
+    cache = LockedFileCacheHandler(path)
+    with _FileLock(cache.lock_path, shared=False):
+        writer = threading.Thread(target=cache.save_token_to_cache, args=(_token(2_000_000_000),))
+        writer.start()
+        writer.join(0.2)
+        # auth.py holds the lock: the write has not happened yet
+        assert writer.is_alive() and not os.path.exists(path)
+    writer.join()
+    assert os.path.exists(path)
+
+def test_refreshes_before_expiry():
+    now = 1_800_000_000.0
+    cache = LockedFileCacheHandler(_cache_path())
+    cache.save_token_to_cache(_token(now + 3600))
+    auth = MockAuthManager(cache)
+    refresher = TokenRefresher(auth, cache)
+    with redirect_stdout(io.StringIO()):
+        # Plenty of time left: sleep until the margin
+        assert refresher.refresh_once(now) == 3600 - REFRESH_MARGIN
+        assert auth.refreshes == 0
+        # Inside the margin, well before spotipy would refresh mid-request
+        refresher.refresh_once(now + 3600 - REFRESH_MARGIN + 1)
+        assert auth.refreshes == 1
+        assert cache.get_cached_token()['access_token'] == 'access-2'
+        # A failed refresh is retried shortly, the old token kept
+        auth.fail = True
+        cache.save_token_to_cache(_token(now + 100))
+        assert refresher.refresh_once(now) == REFRESH_RETRY
+    assert refresher.stats == {'refreshes': 1, 'failures': 1}
+    assert cache.get_cached_token()['expires_at'] == now + 100
+
+if __name__ == "__main__":
+    print("🧪 Running token cache tests...")
+    test_token_read_from_file_once()
+    test_token_written_elsewhere_is_picked_up()
+    test_save_keeps_newer_token_from_elsewhere()
+    test_writes_are_atomic_and_private()
+    test_write_waits_for_lock_holder()
+    test_refreshes_before_expiry()
+    print("🎉 All token cache tests passed!")
@@ -0,0 +1,199 @@
+"""
+Token Cache Module
+In-memory Spotify token with locked, atomic cache file writes and proactive refresh
+"""
+
+import json
+import os
+import threading
+import time
+from spotipy.cache_handler import CacheHandler
+
+try:
+    import fcntl
+    FILE_LOCKS_AVAILABLE = True
+except ImportError:
+    # Not on Linux: writes are still atomic, just not locked against auth.py
+    FILE_LOCKS_AVAILABLE = False
+
+DEFAULT_CACHE_PATH = ".spotify_cache"
+
+# spotipy refreshes lazily (inside a request) once a token has under 60 s
+# left; refreshing well before that keeps the refresh off the request path
+REFRESH_MARGIN = 300      # seconds before expiry
+REFRESH_RETRY = 30        # seconds between attempts after a failed refresh
+
+class LockedFileCacheHandler(CacheHandler):
+    """spotipy cache handler that keeps the token in memory.
+
+    The cache file is read once, and again only when it changes on disk
+    (auth.py re-authenticating or rotating the refresh token), instead of
+    on every request; a stat() is enough to tell. Writes go to a temporary
+    file that replaces the cache in one rename, under an exclusive lock on
+    `<path>.lock`, so auth.py, test.py and the player never see or leave
+    half a token. Reads take the lock shared. A save never replaces a
+    token another process wrote since this one last looked, unless it
+    expires later.
+    """
+
+    def __init__(self, cache_path=DEFAULT_CACHE_PATH):
+        self.cache_path = cache_path
+        self.lock_path = f"{cache_path}.lock"
+        self._lock = threading.Lock()
+        self._token = None
+        self._file_stamp = None  # (inode, mtime, size) of the file as last read or written
+        self.stats = {'file_reads': 0, 'file_writes': 0, 'writes_skipped': 0}
+
+    def get_cached_token(self):
+        with self._lock:
+            if self._token is None or self._file_changed():
+                token = self._read()
+                # A vanished or unreadable file leaves the token in memory as it was
+                if token is not None:
+                    self._token = token
+            return self._token
+
+    def save_token_to_cache(self, token_info):
+        with self._lock:
+            try:
+                with self._file_lock(shared=False):
+                    newer = self._newer_token_in_file(token_info)
+                    if newer is not None:
+                        # Written by auth.py meanwhile: keep it rather than go back to ours
+                        self.stats['writes_skipped'] += 1
+                        self._token = newer
+                        return
+                    self._write(token_info)
+            except OSError as e:
+                # The token in memory still works; the file catches up next refresh
+                print(f"⚠️ Could not write token cache: {e}")
+            self._token = token_info
+
+    def _file_changed(self):
+        stamp = _stamp(self.cache_path)
+        return stamp is not None and stamp != self._file_stamp
+
+    def _newer_token_in_file(self, token_info):
+        """The file's token if someone else wrote it since we last looked and it lasts longer"""
+        if not self._file_changed():
+            return None
+        token = self._load()
+        if token is None or token.get('expires_at', 0) < token_info.get('expires_at', 0):
+            return None
+        return token
+
+    def _read(self):
+        if not os.path.exists(self.cache_path):
+            return None  # not authenticated yet (and no lock file to leave behind)
+        try:
+            with self._file_lock(shared=True):
+                return self._load()
+        except OSError:
+            return None
+
+    def _load(self):
+        """Parse the cache file (lock held) and remember which version was seen"""
+        try:
+            with open(self.cache_path) as f:
+                self._file_stamp = _stamp_of(os.fstat(f.fileno()))
+                self.stats['file_reads'] += 1
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, token_info):
+        """Replace the cache file in one rename (exclusive lock held)"""
+        tmp_path = f"{self.cache_path}.tmp.{os.getpid()}"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(token_info, f)
+            f.flush()
+            os.fsync(f.fileno())
+            stamp = _stamp_of(os.fstat(f.fileno()))
+        os.replace(tmp_path, self.cache_path)
+        self._file_stamp = stamp
+        self.stats['file_writes'] += 1
+
+    def _file_lock(self, shared):
+        return _FileLock(self.lock_path, shared)
+
+def _stamp_of(st):
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+def _stamp(path):
+    """Identity of the file's current version, or None if it is missing"""
+    try:
+        return _stamp_of(os.stat(path))
+    except OSError:
+        return None
+
+class _FileLock:
+    """flock() on a side file, so the lock survives the cache file being replaced"""
+
+    def __init__(self, path, shared):
+        self.path = path
+        self.shared = shared
+        self._fd = None
+
+    def __enter__(self):
+        if FILE_LOCKS_AVAILABLE:
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            fcntl.flock(self._fd, fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+class TokenRefresher:
+    """Background thread that refreshes the access token before it expires.
+
+    With the token refreshed REFRESH_MARGIN seconds early, spotipy always
+    finds a valid token in memory, so polls and button commands never
+    wait on the accounts service. If a refresh fails it is retried every
+    REFRESH_RETRY seconds; only if that keeps failing until the last
+    minute does spotipy fall back to refreshing inside a request.
+    """
+
+    def __init__(self, auth_manager, cache_handler, margin=REFRESH_MARGIN):
+        self.auth_manager = auth_manager
+        self.cache_handler = cache_handler
+        self.margin = margin
+        self.stats = {'refreshes': 0, 'failures': 0}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def refresh_once(self, now=None):
+        """Refresh if the token is due; returns seconds until the next check"""
+        now = time.time() if now is None else now  # expires_at is wall-clock time
+        token = self.cache_handler.get_cached_token()
+        if not token or 'refresh_token' not in token:
+            return REFRESH_RETRY  # not authenticated yet
+        due = token.get('expires_at', 0) - self.margin
+        if now < due:
+            return due - now
+        try:
+            self.auth_manager.refresh_access_token(token['refresh_token'])
+            self.stats['refreshes'] += 1
+            print("🔑 Spotify token refreshed ahead of expiry")
+            token = self.cache_handler.get_cached_token()
+            return max(REFRESH_RETRY, token.get('expires_at', 0) - self.margin - now)
+        except Exception as e:
+            self.stats['failures'] += 1
+            print(f"⚠️ Token refresh failed: {e}")
+            return REFRESH_RETRY
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='token-refresh', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._stop.wait(self.refresh_once())